@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+from datetime import date
 from functools import lru_cache
 from typing import Annotated, AsyncIterator, Optional
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 
+from app.core.cache import LRUCache
 from app.core.security import TokenPayload
 from app.services.auth import AdminAuthError, AdminTokenService
+from app.services.watermark import current_data_watermark
 from app.settings import Settings, get_settings
 from app.db import use_database
 
@@ -35,9 +39,17 @@ AuthHeader = Annotated[
 @lru_cache
 def _get_admin_token_service() -> AdminTokenService:
     settings = get_settings()
+    cache = (
+        LRUCache[str, TokenPayload](
+            "auth_tokens", max_entries=settings.auth_token_cache_max_entries
+        )
+        if settings.auth_token_cache_max_entries > 0
+        else None
+    )
     return AdminTokenService(
         secret=settings.auth_token_secret,
         ttl_seconds=settings.auth_token_ttl_seconds,
+        cache=cache,
     )
 
 
@@ -55,11 +67,67 @@ def require_admin_auth(authorization: AuthHeader = None) -> TokenPayload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
 
 
+def _build_etag(request: Request, watermark_token: str, settings: Settings) -> str:
+    # Помесячные диапазоны считаются от текущей даты, поэтому она входит в тег.
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    fingerprint = "|".join(
+        (
+            watermark_token,
+            settings.metrics_source,
+            date.today().isoformat(),
+            request.url.path,
+            query,
+        )
+    )
+    return '"' + hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    settings: SettingsDep,
+    _db: DatabaseSession,
+    _auth: TokenPayload = Depends(require_admin_auth),
+) -> str:
+    """Выставляет ETag отчёта и отвечает 304, если клиент прислал тот же тег.
+
+    Тег строится из водяного знака данных и параметров запроса, поэтому
+    проверка выполняется до запуска агрегирующих SQL-запросов.
+    """
+    watermark = await current_data_watermark()
+    etag = _build_etag(request, watermark.token, settings)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return etag
+
+
+ConditionalGet = Annotated[str, Depends(conditional_get)]
+
+
 __all__ = [
     "SettingsDep",
     "get_database_dsn",
     "DatabaseDsn",
     "DatabaseSession",
     "AuthHeader",
+    "ConditionalGet",
+    "conditional_get",
     "require_admin_auth",
 ]
@@ -0,0 +1,38 @@
+"""Быстрая сериализация ответов через orjson."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+
+class FastJSONResponse(Response):
+    """JSON-ответ, который кодирует словари и списки через orjson.
+
+    ``orjson`` сериализует ``date``, ``Enum`` и числа напрямую, поэтому ответ
+    собирается из данных репозитория без Pydantic-модели и ``jsonable_encoder``.
+    Модели из :mod:`app.schemas.responses` остаются контрактом: маршруты
+    указывают их в ``response_model`` для OpenAPI, а тесты сверяют структуру.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def fast_json(content: Any, response: Response) -> FastJSONResponse:
+    """Сериализует ``content``, сохранив заголовки, выставленные зависимостями.
+
+    Если обработчик возвращает готовый ``Response``, FastAPI не переносит в него
+    заголовки из параметра ``response`` (например, ``ETag``), поэтому копируем их.
+    """
+
+    fast_response = FastJSONResponse(content, status_code=response.status_code or 200)
+    fast_response.headers.update(response.headers)
+    return fast_response
+
+
+__all__ = ["FastJSONResponse", "fast_json"]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import ConditionalGet, DatabaseSession, require_admin_auth
+from app.core.security import TokenPayload
+from app.schemas.enums import DateField
+from app.schemas.responses import DashboardResponse
+from app.services.metrics import get_dashboard
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=DashboardResponse)
+async def dashboard(
+    _db: DatabaseSession,
+    _etag: ConditionalGet,
+    _auth: TokenPayload = Depends(require_admin_auth),
+    date_from: Optional[date] = Query(default=None),
+    date_to: Optional[date] = Query(default=None),
+    date_field: DateField = Query(default=DateField.created),
+    page_size: int = Query(50, ge=1, le=200),
+) -> DashboardResponse:
+    return await get_dashboard(
+        date_from=date_from,
+        date_to=date_to,
+        date_field=date_field,
+        page_size=page_size,
+    )
+
+
+__all__ = ["router"]
@@ -3,13 +3,38 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.api.dependencies import DatabaseSession, require_admin_auth
+from app.api.dependencies import (
+    ConditionalGet,
+    DatabaseDsn,
+    DatabaseSession,
+    require_admin_auth,
+)
+from app.api.responses import FastJSONResponse, fast_json
 from app.core.security import TokenPayload
-from app.schemas.enums import DateField, MonthlyMetric, MonthlyRange
-from app.schemas.responses import MetricsResponse, MonthlyMetricsResponse
-from app.services.metrics import get_metrics, get_monthly_metrics
+from app.schemas.enums import (
+    DateField,
+    ExportFormat,
+    MetricsCompare,
+    MonthlyMetric,
+    MonthlyRange,
+)
+from app.schemas.requests import MetricsBatchRequest
+from app.schemas.responses import (
+    MetricsBatchResponse,
+    MetricsResponse,
+    MonthlyMetricsBatchResponse,
+    MonthlyMetricsResponse,
+)
+from app.services.exports import EXPORT_MEDIA_TYPES, export_filename, export_monthly_metrics
+from app.services.metrics import (
+    get_metrics,
+    get_metrics_batch,
+    get_monthly_metrics_batch_payload,
+    get_monthly_metrics_payload,
+)
 
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 
@@ -17,31 +42,95 @@ router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 @router.get("", response_model=MetricsResponse)
 async def metrics(
     _db: DatabaseSession,
+    _etag: ConditionalGet,
     _auth: TokenPayload = Depends(require_admin_auth),
     date_from: Optional[date] = Query(default=None),
     date_to: Optional[date] = Query(default=None),
     date_field: DateField = Query(default=DateField.created),
+    compare: Optional[MetricsCompare] = Query(default=None),
 ) -> MetricsResponse:
-    return await get_metrics(
-        date_from=date_from,
-        date_to=date_to,
-        date_field=date_field,
+    try:
+        return await get_metrics(
+            date_from=date_from,
+            date_to=date_to,
+            date_field=date_field,
+            compare=compare,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@router.post("/batch", response_model=MetricsBatchResponse)
+async def metrics_batch(
+    body: MetricsBatchRequest,
+    _db: DatabaseSession,
+    _auth: TokenPayload = Depends(require_admin_auth),
+) -> MetricsBatchResponse:
+    return await get_metrics_batch(
+        ranges=[(item.date_from, item.date_to) for item in body.ranges],
+        date_field=body.date_field,
     )
 
 
-@router.get("/monthly", response_model=MonthlyMetricsResponse)
+@router.get(
+    "/monthly",
+    response_model=MonthlyMetricsResponse,
+    response_class=FastJSONResponse,
+)
 async def metrics_monthly(
     _db: DatabaseSession,
+    _etag: ConditionalGet,
+    response: Response,
     _auth: TokenPayload = Depends(require_admin_auth),
     metric: MonthlyMetric = Query(...),
     range_: MonthlyRange = Query(default=MonthlyRange.this_year, alias="range"),
     date_field: DateField = Query(default=DateField.created),
-) -> MonthlyMetricsResponse:
-    return await get_monthly_metrics(
+) -> FastJSONResponse:
+    payload = await get_monthly_metrics_payload(
         metric=metric,
         range_=range_,
         date_field=date_field,
     )
+    return fast_json(payload, response)
+
+
+@router.get(
+    "/monthly/batch",
+    response_model=MonthlyMetricsBatchResponse,
+    response_class=FastJSONResponse,
+)
+async def metrics_monthly_batch(
+    _db: DatabaseSession,
+    _etag: ConditionalGet,
+    response: Response,
+    _auth: TokenPayload = Depends(require_admin_auth),
+    metrics: list[MonthlyMetric] = Query(default=[]),
+    range_: MonthlyRange = Query(default=MonthlyRange.this_year, alias="range"),
+    date_field: DateField = Query(default=DateField.created),
+) -> FastJSONResponse:
+    payload = await get_monthly_metrics_batch_payload(
+        metrics=metrics,
+        range_=range_,
+        date_field=date_field,
+    )
+    return fast_json(payload, response)
+
+
+@router.get("/monthly/export", response_class=StreamingResponse)
+async def metrics_monthly_export(
+    dsn: DatabaseDsn,
+    _auth: TokenPayload = Depends(require_admin_auth),
+    range_: MonthlyRange = Query(default=MonthlyRange.this_year, alias="range"),
+    date_field: DateField = Query(default=DateField.created),
+    format_: ExportFormat = Query(default=ExportFormat.csv, alias="format"),
+) -> StreamingResponse:
+    # Поток читается уже после выхода из обработчика, поэтому DSN передаём явно.
+    filename = export_filename("metrics_monthly", format_, range_.value, date_field.value)
+    return StreamingResponse(
+        export_monthly_metrics(range_=range_, date_field=date_field, fmt=format_, dsn=dsn),
+        media_type=EXPORT_MEDIA_TYPES[format_],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 __all__ = ["router"]
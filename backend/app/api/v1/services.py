@@ -3,13 +3,22 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.api.dependencies import DatabaseSession, require_admin_auth
+from app.api.dependencies import (
+    ConditionalGet,
+    DatabaseDsn,
+    DatabaseSession,
+    require_admin_auth,
+)
+from app.api.responses import FastJSONResponse, fast_json
+from app.core.dates import normalize_date_range
 from app.core.security import TokenPayload
-from app.schemas.enums import MonthlyRange
+from app.schemas.enums import ExportFormat, MonthlyRange, ServicesExportGranularity
 from app.schemas.responses import MonthlyServiceResponse, ServicesResponse
-from app.services.metrics import get_monthly_services, get_services
+from app.services.exports import EXPORT_MEDIA_TYPES, export_filename, export_services
+from app.services.metrics import get_monthly_services_payload, get_services
 
 router = APIRouter(prefix="/api/services", tags=["services"])
 
@@ -17,31 +26,69 @@ router = APIRouter(prefix="/api/services", tags=["services"])
 @router.get("", response_model=ServicesResponse)
 async def services(
     _db: DatabaseSession,
+    _etag: ConditionalGet,
     _auth: TokenPayload = Depends(require_admin_auth),
     date_from: Optional[date] = Query(default=None),
     date_to: Optional[date] = Query(default=None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None, max_length=512),
 ) -> ServicesResponse:
-    return await get_services(
-        date_from=date_from,
-        date_to=date_to,
-        page=page,
-        page_size=page_size,
-    )
+    try:
+        return await get_services(
+            date_from=date_from,
+            date_to=date_to,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
 
 
-@router.get("/monthly", response_model=MonthlyServiceResponse)
+@router.get(
+    "/monthly",
+    response_model=MonthlyServiceResponse,
+    response_class=FastJSONResponse,
+)
 async def services_monthly(
     _db: DatabaseSession,
+    _etag: ConditionalGet,
+    response: Response,
     _auth: TokenPayload = Depends(require_admin_auth),
     service_type: str = Query(..., min_length=1),
     range_: MonthlyRange = Query(default=MonthlyRange.this_year, alias="range"),
-) -> MonthlyServiceResponse:
+) -> FastJSONResponse:
     try:
-        return await get_monthly_services(service_type=service_type, range_=range_)
+        payload = await get_monthly_services_payload(service_type=service_type, range_=range_)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return fast_json(payload, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def services_export(
+    dsn: DatabaseDsn,
+    _auth: TokenPayload = Depends(require_admin_auth),
+    date_from: Optional[date] = Query(default=None),
+    date_to: Optional[date] = Query(default=None),
+    granularity: ServicesExportGranularity = Query(default=ServicesExportGranularity.total),
+    format_: ExportFormat = Query(default=ExportFormat.csv, alias="format"),
+) -> StreamingResponse:
+    # Поток читается уже после выхода из обработчика, поэтому DSN передаём явно.
+    date_from, date_to = normalize_date_range(date_from, date_to)
+    filename = export_filename("services", format_, granularity.value, date_from, date_to)
+    return StreamingResponse(
+        export_services(
+            date_from=date_from,
+            date_to=date_to,
+            granularity=granularity,
+            fmt=format_,
+            dsn=dsn,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format_],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 __all__ = ["router"]
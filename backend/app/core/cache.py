@@ -0,0 +1,115 @@
+"""Ограниченные in-process кеши с метриками Prometheus."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+_CACHE_HITS = Counter("u4s_cache_hits_total", "Попадания в in-process кеш", ["cache"])
+_CACHE_MISSES = Counter("u4s_cache_misses_total", "Промахи in-process кеша", ["cache"])
+_CACHE_EVICTIONS = Counter(
+    "u4s_cache_evictions_total", "Записи, вытесненные из кеша по лимиту размера", ["cache"]
+)
+_CACHE_INVALIDATIONS = Counter(
+    "u4s_cache_invalidations_total", "Полные сбросы кеша при смене поколения данных", ["cache"]
+)
+_CACHE_ENTRIES = Gauge("u4s_cache_entries", "Текущее количество записей в кеше", ["cache"])
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """LRU-кеш с ограничением размера и необязательным сроком жизни записей.
+
+    Кеш не потокобезопасен и рассчитан на использование из одного event loop.
+    Поколение (``generation``) позволяет разом сбросить все записи, когда меняется
+    водяной знак данных, на основе которых они были посчитаны.
+    """
+
+    __slots__ = ("name", "max_entries", "_clock", "_entries", "_generation", "_metrics")
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.name = name
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[KeyT, tuple[ValueT, Optional[float]]] = OrderedDict()
+        self._generation: Optional[Hashable] = None
+        self._metrics = (
+            _CACHE_HITS.labels(name),
+            _CACHE_MISSES.labels(name),
+            _CACHE_EVICTIONS.labels(name),
+            _CACHE_INVALIDATIONS.labels(name),
+            _CACHE_ENTRIES.labels(name),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> Optional[Hashable]:
+        return self._generation
+
+    def get(self, key: KeyT) -> Optional[ValueT]:
+        hits, misses, *_ = self._metrics
+        entry = self._entries.get(key)
+        if entry is None:
+            misses.inc()
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            del self._entries[key]
+            self._metrics[4].set(len(self._entries))
+            misses.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        hits.inc()
+        return value
+
+    def set(self, key: KeyT, value: ValueT, *, expires_at: Optional[float] = None) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        evictions = self._metrics[2]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evictions.inc()
+        self._metrics[4].set(len(self._entries))
+
+    def keys(self) -> list[KeyT]:
+        """Снимок ключей от самого старого к самому свежему (без учёта срока жизни)."""
+        return list(self._entries)
+
+    def pop(self, key: KeyT) -> Optional[ValueT]:
+        entry = self._entries.pop(key, None)
+        self._metrics[4].set(len(self._entries))
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._metrics[4].set(0)
+
+    def sync_generation(self, generation: Hashable) -> None:
+        """Сбрасывает кеш, если поколение данных изменилось с прошлого вызова."""
+
+        if generation == self._generation:
+            return
+        if self._generation is not None and self._entries:
+            self._metrics[3].inc()
+        self._generation = generation
+        self.clear()
+
+
+__all__ = ["LRUCache"]
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from typing import Optional
 
 from psycopg import sql
 
-from app.schemas.enums import DateField, MonthlyRange
+from app.schemas.enums import DateField, MetricsCompare, MonthlyRange
 
 MIDNIGHT = time(hour=0, minute=0)
 
@@ -22,21 +23,23 @@ _DATE_FIELD_RESOLUTIONS = {
     DateField.created: DateFieldResolution("created_at", "created_at"),
 }
 CONSUMPTION_DATE_RESOLUTION = DateFieldResolution("consumption_date", "consumption_date")
+ROLLUP_DAY_RESOLUTION = DateFieldResolution("day", "day")
 
 
 def resolve_date_field(wanted: DateField) -> DateFieldResolution:
     return _DATE_FIELD_RESOLUTIONS.get(wanted, _DATE_FIELD_RESOLUTIONS[DateField.created])
 
 
-def build_filters(
+@lru_cache(maxsize=None)
+def build_filter_clause(
     resolution: DateFieldResolution,
-    date_from: Optional[date],
-    date_to: Optional[date],
     *,
+    has_from: bool,
+    has_to: bool,
     table_alias: Optional[str] = None,
-) -> tuple[sql.Composable, dict[str, datetime]]:
+) -> sql.Composable:
+    """Возвращает SQL-фрагмент фильтра; результат зависит только от набора границ."""
     clauses: list[sql.Composable] = []
-    params: dict[str, datetime] = {}
 
     if table_alias:
         column_sql = sql.SQL("{}.{}").format(
@@ -45,20 +48,55 @@ def build_filters(
     else:
         column_sql = sql.Identifier(resolution.column)
 
-    if date_from:
+    if has_from:
         clauses.append(sql.SQL("AND {} >= %(from)s").format(column_sql))
+
+    if has_to:
+        clauses.append(sql.SQL("AND {} < %(to)s").format(column_sql))
+
+    if clauses:
+        return sql.SQL("\n          ").join(clauses)
+    return sql.SQL("")
+
+
+def build_filter_params(
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> dict[str, datetime]:
+    params: dict[str, datetime] = {}
+
+    if date_from:
         params["from"] = datetime.combine(date_from, MIDNIGHT)
 
     if date_to:
-        clauses.append(sql.SQL("AND {} < %(to)s").format(column_sql))
         params["to"] = datetime.combine(date_to + timedelta(days=1), MIDNIGHT)
 
-    if clauses:
-        filters = sql.SQL("\n          ").join(clauses)
-    else:
-        filters = sql.SQL("")
+    return params
+
 
-    return filters, params
+def normalize_date_range(
+    date_from: Optional[date], date_to: Optional[date]
+) -> tuple[Optional[date], Optional[date]]:
+    """Меняет границы местами, если ``date_from`` позже ``date_to``."""
+    if date_from and date_to and date_from > date_to:
+        return date_to, date_from
+    return date_from, date_to
+
+
+def build_filters(
+    resolution: DateFieldResolution,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    *,
+    table_alias: Optional[str] = None,
+) -> tuple[sql.Composable, dict[str, datetime]]:
+    filters = build_filter_clause(
+        resolution,
+        has_from=bool(date_from),
+        has_to=bool(date_to),
+        table_alias=table_alias,
+    )
+    return filters, build_filter_params(date_from, date_to)
 
 
 def add_months(base: date, months: int) -> date:
@@ -84,13 +122,37 @@ def last_day_of_month(month_start: date) -> date:
     return next_month - timedelta(days=1)
 
 
+def comparison_range(date_from: date, date_to: date, mode: MetricsCompare) -> tuple[date, date]:
+    """Период, с которым сравнивается ``[date_from, date_to]`` (границы включительно).
+
+    ``yoy`` — те же даты годом раньше (29 февраля переходит в 28-е),
+    ``previous_period`` — столько же дней непосредственно перед ``date_from``.
+    """
+    if mode is MetricsCompare.yoy:
+        return _shift_years(date_from, -1), _shift_years(date_to, -1)
+    compare_to = date_from - timedelta(days=1)
+    return compare_to - (date_to - date_from), compare_to
+
+
+def _shift_years(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
 __all__ = [
     "CONSUMPTION_DATE_RESOLUTION",
     "DateFieldResolution",
     "MIDNIGHT",
+    "ROLLUP_DAY_RESOLUTION",
     "add_months",
+    "build_filter_clause",
+    "build_filter_params",
     "build_filters",
+    "comparison_range",
     "last_day_of_month",
     "month_range",
+    "normalize_date_range",
     "resolve_date_field",
 ]
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import FastAPI
-from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi import Limiter, _rate_limit_exceeded_handler, storage_from_url
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from slowapi.middleware import RateLimitMiddleware
 from slowapi.util import get_remote_address
 
+from app.settings import Settings, get_settings
+
 
 async def _compat_check_request(request):
     endpoint = request.scope.get("endpoint")
@@ -22,8 +26,10 @@ if not hasattr(limiter, "check_request"):
     limiter.check_request = _compat_check_request  # type: ignore[attr-defined]
 
 
-def configure_rate_limiting(app: FastAPI) -> None:
-    """Attach SlowAPI rate limiting middleware and handlers to the app."""
+def configure_rate_limiting(app: FastAPI, settings: Optional[Settings] = None) -> None:
+    """Attach the ASGI rate limiting middleware and handlers to the app."""
+    settings = settings or get_settings()
+    limiter.storage = storage_from_url(settings.rate_limit_storage_url)
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    app.add_middleware(SlowAPIMiddleware)
+    app.add_middleware(RateLimitMiddleware)
@@ -0,0 +1,82 @@
+"""Объединение одновременных одинаковых запросов (single-flight)."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+from prometheus_client import Counter
+
+ResultT = TypeVar("ResultT")
+
+_SINGLEFLIGHT_CALLS = Counter(
+    "u4s_singleflight_calls_total",
+    "Вызовы через single-flight: executed — реально выполнены, coalesced — дождались чужого",
+    ["operation", "outcome"],
+)
+
+
+class SingleFlight:
+    """Выполняет не более одной корутины на ключ одновременно.
+
+    Вызовы с тем же ключом, пришедшие, пока первая корутина ещё выполняется,
+    ждут её результат (или исключение) вместо повторного выполнения. Отмена
+    одного из ожидающих не отменяет общую задачу.
+    """
+
+    __slots__ = ("operation", "_inflight", "_executed", "_coalesced")
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._executed = _SINGLEFLIGHT_CALLS.labels(operation, "executed")
+        self._coalesced = _SINGLEFLIGHT_CALLS.labels(operation, "coalesced")
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[ResultT]]) -> ResultT:
+        future = self._inflight.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._forget, key))
+            self._executed.inc()
+        else:
+            self._coalesced.inc()
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Помечаем исключение как полученное, даже если все ожидающие отменены.
+            future.exception()
+
+
+def coalesce(
+    operation: str,
+    *,
+    scope: Optional[Callable[[], Hashable]] = None,
+) -> Callable[[Callable[..., Awaitable[ResultT]]], Callable[..., Awaitable[ResultT]]]:
+    """Декоратор single-flight для корутин, принимающих только именованные аргументы.
+
+    Ключ строится из значения ``scope()`` (например, текущего DSN) и аргументов.
+    """
+
+    flight = SingleFlight(operation)
+
+    def decorator(func: Callable[..., Awaitable[ResultT]]) -> Callable[..., Awaitable[ResultT]]:
+        @functools.wraps(func)
+        async def wrapper(**kwargs: Any) -> ResultT:
+            key = (scope() if scope else None, tuple(sorted(kwargs.items())))
+            return await flight.run(key, lambda: func(**kwargs))
+
+        wrapper.singleflight = flight  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+__all__ = ["SingleFlight", "coalesce"]
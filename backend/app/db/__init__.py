@@ -1,54 +1,230 @@
 from __future__ import annotations
 
 import asyncio
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, nullcontext
 from contextvars import ContextVar
 from types import MappingProxyType
-from typing import Any, AsyncIterator, Awaitable, Callable, Mapping, Optional, TypeVar, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
 import psycopg
-from psycopg.rows import dict_row
+from psycopg.conninfo import conninfo_to_dict
+from psycopg.rows import BaseRowFactory, dict_row
 from psycopg_pool import AsyncConnectionPool
 
+from app.db.pool_metrics import POOL_WAIT_SECONDS, register_pool_collector
+from app.db.query_loader import CompiledQuery, load_query
+from app.db.query_metrics import (
+    configure_slow_query_log,
+    drain_explain_tasks,
+    observe_query,
+    query_name,
+    record_retry,
+)
+from app.db.replicas import ReplicaSet
+
 __all__ = [
     "fetchone",
     "fetchall",
+    "stream",
+    "get_conn",
     "close_all_pools",
+    "configure_pool",
+    "open_pool",
     "use_database",
+    "current_dsn",
+    "configure_prepared_statements",
+    "configure_slow_query_log",
+    "configure_replicas",
+    "refresh_replicas",
+    "require_replica_lsn",
     "check_pool_ready",
 ]
 
 _pool_lock = asyncio.Lock()
 _pools: dict[str, AsyncConnectionPool] = {}
 
+# primary DSN -> its read replicas
+_replica_sets: dict[str, ReplicaSet] = {}
+
 _current_dsn: ContextVar[Optional[str]] = ContextVar("current_db_dsn", default=None)
 
-_POOL_CONFIG = {
+_pool_config: dict[str, Any] = {
     "min_size": 1,
     "max_size": 10,
     "timeout": 30,
+    "max_waiting": 0,
     "max_lifetime": 60 * 60,
     "max_idle": 5 * 60,
 }
 
+register_pool_collector(lambda: list(_pools.values()))
+
+
+def configure_pool(
+    *,
+    min_size: int,
+    max_size: int,
+    timeout: float,
+    max_waiting: int,
+    max_lifetime: float,
+    max_idle: float,
+) -> None:
+    """Set the options used for pools created after this call."""
+    if min_size < 0 or max_size < max(min_size, 1):
+        raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+    _pool_config.update(
+        min_size=min_size,
+        max_size=max_size,
+        timeout=timeout,
+        max_waiting=max_waiting,
+        max_lifetime=max_lifetime,
+        max_idle=max_idle,
+    )
+
+
+_prepare_compiled = True
+
+
+def configure_prepared_statements(enabled: bool) -> None:
+    """Toggle server-side prepared statements for precompiled queries.
+
+    Disable it when connecting through a transaction-pooling proxy (e.g.
+    PgBouncer in transaction mode) that cannot keep prepared statements.
+    """
+    global _prepare_compiled
+    _prepare_compiled = enabled
+
+
+def configure_replicas(
+    primary: str,
+    replicas: Sequence[str],
+    *,
+    max_lag: float,
+    check_interval: float,
+    check_timeout: float = 2.0,
+) -> Optional[ReplicaSet]:
+    """Route reads issued against ``primary`` across ``replicas``.
+
+    An empty ``replicas`` list removes the routing. Only ``fetchone``,
+    ``fetchall`` and ``stream`` are routed; callers that need the primary
+    (writes, ``pg_stat_*`` counters) pass ``replica=False``.
+    """
+    previous = _replica_sets.pop(primary, None)
+    if previous is not None:
+        previous.cancel_checks()
+    targets = [dsn for dsn in dict.fromkeys(replicas) if dsn and dsn != primary]
+    if not targets:
+        return None
+    replica_set = ReplicaSet(
+        primary,
+        targets,
+        probe=_probe_replica_lag,
+        max_lag=max_lag,
+        check_interval=check_interval,
+        check_timeout=check_timeout,
+        name=_pool_name,
+    )
+    _replica_sets[primary] = replica_set
+    return replica_set
+
+
+async def refresh_replicas() -> None:
+    """Run the replica health checks now instead of waiting for the interval."""
+    await asyncio.gather(*(replica_set.refresh() for replica_set in _replica_sets.values()))
+
+
+def require_replica_lsn(lsn: int, dsn: Optional[str] = None) -> None:
+    """Keep reads of ``dsn`` off replicas that have not replayed WAL up to ``lsn``.
+
+    Callers that key caches by data read on the primary pass the primary's
+    WAL position when that key changes, so a lagging replica cannot fill the
+    cache with older rows under the newer key.
+    """
+    replica_set = _replica_sets.get(dsn or _current_dsn.get() or "")
+    if replica_set is not None:
+        replica_set.require_lsn(lsn)
+
+
+async def _probe_replica_lag(dsn: str) -> tuple[Optional[float], Optional[int]]:
+    row = await fetchone(load_query("replica_lag.sql"), dsn=dsn, retries=0, replica=False)
+    lag = row.get("lag_seconds") if row else None
+    replay_lsn = row.get("replay_lsn") if row else None
+    return (
+        float(lag) if lag is not None else None,
+        int(replay_lsn) if replay_lsn is not None else None,
+    )
+
+
+def _route(dsn: str, replica: bool) -> tuple[str, ContextManager[None], Optional[ReplicaSet]]:
+    """Pick the DSN for a read and a context manager counting it in flight."""
+    replica_set = _replica_sets.get(dsn) if replica else None
+    if replica_set is None:
+        return dsn, nullcontext(), None
+    target = replica_set.choose()
+    return target, replica_set.track(target), replica_set
+
+
+def _pool_name(dsn: str) -> str:
+    """Build a metrics-friendly pool name without credentials."""
+    try:
+        params = conninfo_to_dict(dsn)
+    except psycopg.ProgrammingError:
+        return "default"
+    host = params.get("host") or "local"
+    port = params.get("port")
+    dbname = params.get("dbname") or "postgres"
+    return f"{host}:{port}/{dbname}" if port else f"{host}/{dbname}"
+
 
 def _create_pool(dsn: str) -> AsyncConnectionPool:
     """Instantiate an async connection pool configured to return dict rows."""
     return AsyncConnectionPool(
         conninfo=dsn,
         kwargs={"row_factory": dict_row},
-        **_POOL_CONFIG,
+        name=_pool_name(dsn),
+        open=False,
+        **_pool_config,
     )
 
 
-async def _get_or_create_pool(dsn: str) -> AsyncConnectionPool:
-    """Return a cached async connection pool, creating it if necessary."""
+async def _get_or_create_pool(
+    dsn: str, *, wait: bool = False, timeout: Optional[float] = None
+) -> AsyncConnectionPool:
+    """Return a cached async connection pool, creating it if necessary.
+
+    With ``wait=True`` a newly created pool is pre-filled to ``min_size``
+    before being returned.
+    """
     async with _pool_lock:
         pool = _pools.get(dsn)
         if pool is None:
             pool = _create_pool(dsn)
+            try:
+                await pool.open(
+                    wait=wait, timeout=timeout if timeout is not None else pool.timeout
+                )
+            except BaseException:
+                await pool.close()
+                raise
             _pools[dsn] = pool
-            await pool.open()
+    return pool
+
+
+async def open_pool(dsn: str, *, timeout: Optional[float] = None) -> AsyncConnectionPool:
+    """Open the pool for ``dsn`` and wait until ``min_size`` connections are ready."""
+    pool = await _get_or_create_pool(dsn, wait=True, timeout=timeout)
+    await pool.wait(timeout=timeout if timeout is not None else pool.timeout)
     return pool
 
 
@@ -67,6 +243,11 @@ def _resolve_dsn(dsn: Optional[str]) -> str:
     return current
 
 
+def current_dsn() -> Optional[str]:
+    """Return the DSN bound to the current context, if any."""
+    return _current_dsn.get()
+
+
 @asynccontextmanager
 async def use_database(dsn: str) -> AsyncIterator[None]:
     token = _current_dsn.set(dsn)
@@ -81,7 +262,9 @@ async def get_conn(dsn: Optional[str] = None) -> AsyncIterator[psycopg.AsyncConn
     """Yield a pooled async connection configured to return dict rows."""
     resolved_dsn = _resolve_dsn(dsn)
     pool = await _get_or_create_pool(resolved_dsn)
+    started = time.perf_counter()
     async with pool.connection() as conn:
+        POOL_WAIT_SECONDS.labels(pool.name).observe(time.perf_counter() - started)
         yield conn
 
 
@@ -91,67 +274,171 @@ _RETRYABLE_EXCEPTIONS = (psycopg.OperationalError, psycopg.InterfaceError)
 
 async def _run_with_retry(
     dsn: Optional[str],
-    operation: Callable[[psycopg.AsyncConnection], Awaitable[TResult]],
+    operation: Callable[[psycopg.AsyncConnection, str], Awaitable[TResult]],
     *,
     retries: int = 1,
+    name: str = "adhoc",
+    replica: bool = False,
 ) -> TResult:
-    """Execute the given operation, retrying once on transient connection errors."""
+    """Execute the given operation, retrying once on transient connection errors.
+
+    With ``replica=True`` each attempt is routed through the replica set of the
+    DSN; a replica that fails is taken out of rotation, so the retry goes to
+    another replica or to the primary. ``operation`` receives the connection
+    and the DSN it was routed to.
+    """
     resolved_dsn = _resolve_dsn(dsn)
     attempt = 0
     while True:
+        target, in_flight, replica_set = _route(resolved_dsn, replica)
         try:
-            async with get_conn(resolved_dsn) as conn:
-                return await operation(conn)
+            with in_flight:
+                async with get_conn(target) as conn:
+                    return await operation(conn, target)
         except _RETRYABLE_EXCEPTIONS:
             attempt += 1
+            if replica_set is not None:
+                replica_set.mark_failed(target)
             if attempt > retries:
                 raise
-            await _reset_pool(resolved_dsn)
+            record_retry(name)
+            await _reset_pool(target)
 
 
 RowMapping = Mapping[str, Any]
+QueryLike = CompiledQuery | psycopg.sql.Composable | str
 _EMPTY_PARAMS: Mapping[str, Any] = MappingProxyType({})
 
 
+def _cursor(
+    conn: psycopg.AsyncConnection, row_factory: Optional[BaseRowFactory[Any]]
+) -> psycopg.AsyncCursor[Any]:
+    """Open a cursor with the pool's ``dict_row`` or a caller-supplied row factory."""
+    if row_factory is None:
+        return conn.cursor()
+    return conn.cursor(row_factory=row_factory)
+
+
+def _prepare_query(query: QueryLike) -> tuple[psycopg.sql.Composable | str, Optional[bool]]:
+    """Unwrap precompiled queries and decide whether to prepare them server-side.
+
+    Precompiled queries have a fixed text per variant, so they are prepared on
+    first use; other queries fall back to psycopg's ``prepare_threshold``.
+    """
+    if isinstance(query, CompiledQuery):
+        return query.text, _prepare_compiled
+    return query, None
+
+
 async def fetchone(
-    query: psycopg.sql.Composable | str,
+    query: QueryLike,
     params: Optional[RowMapping] = None,
     *,
     dsn: Optional[str] = None,
     retries: int = 1,
-) -> Optional[RowMapping]:
-    """Execute a query and return the first row, retrying on connection failures."""
+    replica: bool = True,
+    row_factory: Optional[BaseRowFactory[Any]] = None,
+) -> Optional[Any]:
+    """Execute a query and return the first row, retrying on connection failures.
+
+    The read may be served by a replica of ``dsn`` (see ``configure_replicas``)
+    unless ``replica=False``. Rows are mappings unless ``row_factory`` (for
+    example ``psycopg.rows.args_row(Record)``) builds them directly.
+    """
     query_params = params if params is not None else _EMPTY_PARAMS
+    statement, prepare = _prepare_query(query)
+    name = query_name(query)
 
-    async def _operation(conn: psycopg.AsyncConnection) -> Optional[RowMapping]:
-        async with conn.cursor() as cur:
-            await cur.execute(query, query_params)
-            return cast(Optional[RowMapping], await cur.fetchone())
+    async def _operation(conn: psycopg.AsyncConnection, target: str) -> Optional[Any]:
+        async with _cursor(conn, row_factory) as cur:
+            started = time.perf_counter()
+            await cur.execute(statement, query_params, prepare=prepare)
+            row = await cur.fetchone()
+            _observe(name, statement, query_params, started, 0 if row is None else 1, target)
+            return row
 
-    return await _run_with_retry(dsn, _operation, retries=retries)
+    return await _run_with_retry(dsn, _operation, retries=retries, name=name, replica=replica)
 
 
 async def fetchall(
-    query: psycopg.sql.Composable | str,
+    query: QueryLike,
     params: Optional[RowMapping] = None,
     *,
     dsn: Optional[str] = None,
     retries: int = 1,
-) -> list[RowMapping]:
-    """Execute a query and return all rows, retrying on connection failures."""
+    replica: bool = True,
+    row_factory: Optional[BaseRowFactory[Any]] = None,
+) -> list[Any]:
+    """Execute a query and return all rows, retrying on connection failures.
+
+    The read may be served by a replica of ``dsn`` unless ``replica=False``.
+    ``row_factory`` replaces the default mapping rows, as in ``fetchone``.
+    """
     query_params = params if params is not None else _EMPTY_PARAMS
+    statement, prepare = _prepare_query(query)
+    name = query_name(query)
 
-    async def _operation(conn: psycopg.AsyncConnection) -> list[RowMapping]:
-        async with conn.cursor() as cur:
-            await cur.execute(query, query_params)
+    async def _operation(conn: psycopg.AsyncConnection, target: str) -> list[Any]:
+        async with _cursor(conn, row_factory) as cur:
+            started = time.perf_counter()
+            await cur.execute(statement, query_params, prepare=prepare)
             rows = await cur.fetchall()
-            return [cast(RowMapping, row) for row in rows] if rows else []
+            _observe(name, statement, query_params, started, len(rows), target)
+            return rows
+
+    return await _run_with_retry(dsn, _operation, retries=retries, name=name, replica=replica)
+
+
+def _observe(
+    name: str,
+    statement: psycopg.sql.Composable | str,
+    params: RowMapping,
+    started: float,
+    rows: int,
+    dsn: str,
+) -> None:
+    observe_query(
+        name,
+        statement,
+        params,
+        elapsed=time.perf_counter() - started,
+        rows=rows,
+        dsn=dsn,
+        connect=get_conn,
+    )
+
 
-    return await _run_with_retry(dsn, _operation, retries=retries)
+async def stream(
+    query: QueryLike,
+    params: Optional[RowMapping] = None,
+    *,
+    dsn: Optional[str] = None,
+    replica: bool = True,
+    row_factory: Optional[BaseRowFactory[Any]] = None,
+) -> AsyncIterator[Any]:
+    """Yield rows one by one as the server produces them.
+
+    Uses libpq single-row mode via ``cursor.stream()``, so memory usage does not
+    depend on the result size. The connection stays checked out until the
+    iterator is exhausted or closed; failures are not retried because rows
+    may already have been consumed. Like ``fetchall`` it may be served by a
+    replica unless ``replica=False`` and accepts a ``row_factory``.
+    """
+    query_params = params if params is not None else _EMPTY_PARAMS
+    statement, _ = _prepare_query(query)
+    target, in_flight, _ = _route(_resolve_dsn(dsn), replica)
+    with in_flight:
+        async with get_conn(target) as conn:
+            async with _cursor(conn, row_factory) as cur:
+                async for row in cur.stream(statement, query_params):
+                    yield row
 
 
 async def close_all_pools() -> None:
     """Close and clear all cached async connection pools."""
+    await drain_explain_tasks()
+    for replica_set in list(_replica_sets.values()):
+        await replica_set.aclose()
     async with _pool_lock:
         pools = list(_pools.items())
         _pools.clear()
@@ -19,7 +19,7 @@ async def check_database(dsn: str, *, timeout: float = _DEFAULT_TIMEOUT_SECONDS)
     зависнуть в случаях, когда база данных недоступна или не отвечает.
     """
     try:
-        await asyncio.wait_for(fetchone("SELECT 1", dsn=dsn), timeout=timeout)
+        await asyncio.wait_for(fetchone("SELECT 1", dsn=dsn, replica=False), timeout=timeout)
         return True, None
     except asyncio.TimeoutError:
         return False, "Timed out while connecting to the database"
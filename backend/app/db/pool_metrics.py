@@ -0,0 +1,77 @@
+"""Prometheus metrics for the psycopg connection pools."""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Iterator
+
+from prometheus_client import REGISTRY, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from psycopg_pool import AsyncConnectionPool
+
+POOL_WAIT_SECONDS = Histogram(
+    "u4s_db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# (stats key, metric suffix, help, scale)
+_GAUGES = (
+    ("pool_min", "min_size", "Configured minimum pool size", 1.0),
+    ("pool_max", "max_size", "Configured maximum pool size", 1.0),
+    ("pool_size", "size", "Connections currently managed by the pool", 1.0),
+    ("pool_available", "available", "Idle connections ready to be handed out", 1.0),
+    ("requests_waiting", "requests_waiting", "Clients waiting for a connection", 1.0),
+)
+_COUNTERS = (
+    ("requests_num", "requests", "Connection requests served by the pool", 1.0),
+    ("requests_queued", "requests_queued", "Connection requests that had to wait in the queue", 1.0),
+    ("requests_wait_ms", "requests_wait_seconds", "Total time clients spent waiting in the queue", 0.001),
+    ("requests_errors", "requests_errors", "Connection requests that failed or timed out", 1.0),
+    ("connections_num", "connections", "Connection attempts made to the server", 1.0),
+    ("connections_errors", "connection_errors", "Failed connection attempts", 1.0),
+    ("connections_lost", "connections_lost", "Connections found broken by the pool check", 1.0),
+    ("returns_bad", "returns_bad", "Connections returned to the pool in a bad state", 1.0),
+)
+
+
+class PoolStatsCollector(Collector):
+    """Publishes ``AsyncConnectionPool.get_stats()`` at scrape time."""
+
+    def __init__(self, pools: Callable[[], Iterable[AsyncConnectionPool]]) -> None:
+        self._pools = pools
+
+    def collect(self) -> Iterator[GaugeMetricFamily | CounterMetricFamily]:
+        gauges = {
+            key: GaugeMetricFamily(f"u4s_db_pool_{suffix}", help_text, labels=["pool"])
+            for key, suffix, help_text, _ in _GAUGES
+        }
+        in_use = GaugeMetricFamily(
+            "u4s_db_pool_in_use", "Connections currently checked out", labels=["pool"]
+        )
+        counters = {
+            key: CounterMetricFamily(f"u4s_db_pool_{suffix}", help_text, labels=["pool"])
+            for key, suffix, help_text, _ in _COUNTERS
+        }
+
+        for pool in self._pools():
+            stats = pool.get_stats()
+            for key, _, _, scale in _GAUGES:
+                gauges[key].add_metric([pool.name], stats.get(key, 0) * scale)
+            in_use.add_metric(
+                [pool.name], stats.get("pool_size", 0) - stats.get("pool_available", 0)
+            )
+            for key, _, _, scale in _COUNTERS:
+                counters[key].add_metric([pool.name], stats.get(key, 0) * scale)
+
+        yield from gauges.values()
+        yield in_use
+        yield from counters.values()
+
+
+def register_pool_collector(pools: Callable[[], Iterable[AsyncConnectionPool]]) -> None:
+    REGISTRY.register(PoolStatsCollector(pools))
+
+
+__all__ = ["POOL_WAIT_SECONDS", "PoolStatsCollector", "register_pool_collector"]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from functools import lru_cache
 from importlib import resources
 
@@ -33,5 +34,28 @@ def load_query(name: str) -> sql.SQL:
     return sql.SQL(text)
 
 
-__all__ = ["load_query"]
+@dataclass(frozen=True, slots=True)
+class CompiledQuery:
+    """Окончательный текст SQL-шаблона с подставленными фрагментами.
+
+    Текст вычисляется один раз, поэтому при выполнении не требуется повторная
+    сборка ``psycopg.sql``-объектов, а одинаковый текст позволяет переиспользовать
+    подготовленные выражения на стороне сервера.
+    """
+
+    name: str
+    text: str
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def compile_query(name: str, /, **parts: sql.Composable) -> CompiledQuery:
+    """Подставляет фрагменты в шаблон ``name`` и фиксирует итоговый текст запроса."""
+
+    composed = load_query(name).format(**parts)
+    return CompiledQuery(name=name, text=composed.as_string(None))
+
+
+__all__ = ["CompiledQuery", "compile_query", "load_query"]
 
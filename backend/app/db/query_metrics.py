@@ -0,0 +1,192 @@
+"""Per-template query metrics and the slow-query log."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+import psycopg
+from loguru import logger
+from prometheus_client import Counter, Histogram
+from psycopg import sql
+
+from app.db.query_loader import CompiledQuery
+
+ADHOC_QUERY_NAME = "adhoc"
+
+QUERY_SECONDS = Histogram(
+    "u4s_db_query_seconds",
+    "Query execution time (execute + fetch) by SQL template",
+    ["query"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+QUERY_ROWS = Histogram(
+    "u4s_db_query_rows",
+    "Rows returned by SQL template",
+    ["query"],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
+QUERY_RETRIES = Counter(
+    "u4s_db_query_retries_total",
+    "Query retries after transient connection errors by SQL template",
+    ["query"],
+)
+SLOW_QUERIES = Counter(
+    "u4s_db_slow_queries_total",
+    "Queries that exceeded the slow-query threshold by SQL template",
+    ["query"],
+)
+
+_log = logger.bind(component="db")
+
+
+@dataclass(slots=True)
+class SlowQueryConfig:
+    """Slow-query log options; ``threshold`` is in seconds, ``None`` disables the log."""
+
+    threshold: Optional[float] = None
+    explain: bool = True
+    explain_timeout: float = 30.0
+    explain_cooldown: float = 60.0
+
+
+_config = SlowQueryConfig()
+_explain_tasks: set[asyncio.Task[None]] = set()
+_last_explained: dict[str, float] = {}
+
+ConnectionFactory = Callable[[str], Any]
+
+
+def configure_slow_query_log(
+    *,
+    threshold: Optional[float],
+    explain: bool = True,
+    explain_timeout: float = 30.0,
+    explain_cooldown: float = 60.0,
+) -> None:
+    """Set the slow-query threshold and whether to capture ``EXPLAIN`` output."""
+    _config.threshold = threshold if threshold and threshold > 0 else None
+    _config.explain = explain
+    _config.explain_timeout = explain_timeout
+    _config.explain_cooldown = explain_cooldown
+    _last_explained.clear()
+
+
+def query_name(query: object) -> str:
+    """Metric label for a query: the template file name or ``adhoc``."""
+    if isinstance(query, CompiledQuery):
+        return query.name
+    return ADHOC_QUERY_NAME
+
+
+def record_retry(name: str) -> None:
+    QUERY_RETRIES.labels(name).inc()
+
+
+def observe_query(
+    name: str,
+    statement: sql.Composable | str,
+    params: Mapping[str, Any],
+    *,
+    elapsed: float,
+    rows: int,
+    dsn: str,
+    connect: ConnectionFactory,
+) -> None:
+    """Record timing and row count; log the query if it exceeded the threshold.
+
+    ``connect`` is an async context manager factory (``get_conn``) used to run
+    ``EXPLAIN (ANALYZE, BUFFERS)`` in a background task, so the caller never
+    waits for the plan.
+    """
+    QUERY_SECONDS.labels(name).observe(elapsed)
+    QUERY_ROWS.labels(name).observe(rows)
+
+    threshold = _config.threshold
+    if threshold is None or elapsed < threshold:
+        return
+
+    SLOW_QUERIES.labels(name).inc()
+    text = statement if isinstance(statement, str) else statement.as_string(None)
+    _log.warning(
+        "Медленный запрос",
+        query=name,
+        elapsed_ms=round(elapsed * 1000, 1),
+        rows=rows,
+        threshold_ms=round(threshold * 1000, 1),
+    )
+    if _config.explain and _should_explain(name, text):
+        _schedule(_explain(name, text, params, dsn=dsn, connect=connect))
+
+
+def _should_explain(name: str, text: str) -> bool:
+    # EXPLAIN ANALYZE executes the statement again, so only plain reads qualify.
+    if text.lstrip().split(None, 1)[0].upper() not in {"SELECT", "WITH"}:
+        return False
+    now = time.monotonic()
+    last = _last_explained.get(name)
+    if last is not None and now - last < _config.explain_cooldown:
+        return False
+    _last_explained[name] = now
+    return True
+
+
+def _schedule(coro: Awaitable[None]) -> None:
+    task = asyncio.ensure_future(coro)
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+async def _explain(
+    name: str,
+    text: str,
+    params: Mapping[str, Any],
+    *,
+    dsn: str,
+    connect: ConnectionFactory,
+) -> None:
+    try:
+        async with connect(dsn) as conn:
+            # force_rollback guards against side effects of volatile functions.
+            async with conn.transaction(force_rollback=True):
+                await conn.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    (str(int(_config.explain_timeout * 1000)),),
+                )
+                cursor = await conn.execute(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {text}", params, prepare=False
+                )
+                plan = "\n".join(_plan_line(row) for row in await cursor.fetchall())
+    except (psycopg.Error, OSError) as exc:
+        _log.warning("Не удалось получить план медленного запроса", query=name, error=str(exc))
+        return
+    _log.warning("План медленного запроса {query}:\n{plan}", query=name, plan=plan)
+
+
+def _plan_line(row: Mapping[str, Any] | tuple[Any, ...]) -> str:
+    if isinstance(row, Mapping):
+        return str(next(iter(row.values()), ""))
+    return str(row[0])
+
+
+async def drain_explain_tasks() -> None:
+    """Wait for pending ``EXPLAIN`` captures (used on shutdown and in tests)."""
+    if _explain_tasks:
+        await asyncio.gather(*list(_explain_tasks), return_exceptions=True)
+
+
+__all__ = [
+    "ADHOC_QUERY_NAME",
+    "QUERY_RETRIES",
+    "QUERY_ROWS",
+    "QUERY_SECONDS",
+    "SLOW_QUERIES",
+    "SlowQueryConfig",
+    "configure_slow_query_log",
+    "drain_explain_tasks",
+    "observe_query",
+    "query_name",
+    "record_retry",
+]
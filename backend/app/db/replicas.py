@@ -0,0 +1,191 @@
+"""Routing of report reads across read-only replicas."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterator, Optional, Sequence
+
+from prometheus_client import Counter, Gauge
+
+from app.core.logging import bind_logger
+
+REPLICA_LAG_SECONDS = Gauge(
+    "u4s_db_replica_lag_seconds", "Replication lag measured by the last health check", ["pool"]
+)
+REPLICA_HEALTHY = Gauge(
+    "u4s_db_replica_healthy", "1 if the replica currently receives reads, 0 otherwise", ["pool"]
+)
+ROUTED_READS = Counter(
+    "u4s_db_routed_reads_total", "Reads routed to a replica or to the primary", ["pool"]
+)
+
+_log = bind_logger(component="replicas")
+
+# Returns the replica's lag in seconds and the WAL position it has replayed
+# (bytes since ``0/0``); either is ``None`` if it cannot be determined.
+LagProbe = Callable[[str], Awaitable[tuple[Optional[float], Optional[int]]]]
+
+
+@dataclass(slots=True)
+class ReplicaState:
+    dsn: str
+    name: str
+    healthy: bool = False
+    lag: Optional[float] = None
+    replay_lsn: Optional[int] = None
+    outstanding: int = 0
+
+
+class ReplicaSet:
+    """Replicas of one primary and their health.
+
+    ``choose`` picks the healthy replica with the fewest reads in flight
+    (ties are rotated) and falls back to the primary when no replica is
+    healthy. Health is re-checked in the background at most every
+    ``check_interval`` seconds: a replica is healthy while ``probe`` answers
+    within ``check_timeout`` and reports a lag of at most ``max_lag`` seconds.
+    Replicas start unhealthy until the first check succeeds.
+
+    ``require_lsn`` raises the WAL position a replica must have replayed to
+    receive reads, so data cached under a watermark read on the primary is
+    never filled from a replica that has not caught up with it yet.
+    """
+
+    def __init__(
+        self,
+        primary: str,
+        replicas: Sequence[str],
+        *,
+        probe: LagProbe,
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float = 2.0,
+        name: Callable[[str], str] = str,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.primary = primary
+        self.replicas = tuple(ReplicaState(dsn=dsn, name=name(dsn)) for dsn in replicas)
+        self._primary_name = name(primary)
+        self._by_dsn = {state.dsn: state for state in self.replicas}
+        self._probe = probe
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        self._check_timeout = check_timeout
+        self._clock = clock
+        self._next_check = clock()
+        self._check_task: Optional[asyncio.Task[None]] = None
+        self._rotation = 0
+        self._min_lsn = 0
+        for state in self.replicas:
+            REPLICA_HEALTHY.labels(state.name).set(0)
+
+    def choose(self) -> str:
+        """Return the DSN the next read should go to."""
+        if self._clock() >= self._next_check and (
+            self._check_task is None or self._check_task.done()
+        ):
+            self._next_check = self._clock() + self._check_interval
+            self._check_task = asyncio.ensure_future(self.refresh())
+
+        best: Optional[ReplicaState] = None
+        count = len(self.replicas)
+        for offset in range(count):
+            state = self.replicas[(self._rotation + offset) % count]
+            if not (state.healthy and self._caught_up(state)):
+                continue
+            if best is None or state.outstanding < best.outstanding:
+                best = state
+        if best is None:
+            ROUTED_READS.labels(self._primary_name).inc()
+            return self.primary
+        self._rotation = (self._rotation + 1) % count
+        ROUTED_READS.labels(best.name).inc()
+        return best.dsn
+
+    def require_lsn(self, lsn: int) -> None:
+        """Route reads only to replicas that have replayed the primary's WAL up to ``lsn``.
+
+        Replicas behind ``lsn`` are checked again on the next ``choose``
+        instead of after ``check_interval``.
+        """
+        if lsn <= self._min_lsn:
+            return
+        self._min_lsn = lsn
+        if any(state.healthy and not self._caught_up(state) for state in self.replicas):
+            self._next_check = min(self._next_check, self._clock())
+
+    def _caught_up(self, state: ReplicaState) -> bool:
+        if self._min_lsn == 0:
+            return True
+        return state.replay_lsn is not None and state.replay_lsn >= self._min_lsn
+
+    @contextmanager
+    def track(self, dsn: str) -> Iterator[None]:
+        """Count a read in flight on ``dsn`` (no-op for the primary)."""
+        state = self._by_dsn.get(dsn)
+        if state is None:
+            yield
+            return
+        state.outstanding += 1
+        try:
+            yield
+        finally:
+            state.outstanding -= 1
+
+    def mark_failed(self, dsn: str) -> None:
+        """Stop routing to ``dsn`` until the next successful health check."""
+        state = self._by_dsn.get(dsn)
+        if state is not None and state.healthy:
+            _log.warning("Replica failed, reads fall back", replica=state.name)
+            self._set_health(state, healthy=False, lag=state.lag)
+
+    async def refresh(self) -> None:
+        """Probe all replicas concurrently and update their health."""
+        await asyncio.gather(*(self._check(state) for state in self.replicas))
+
+    def cancel_checks(self) -> Optional[asyncio.Task[None]]:
+        """Cancel a running health check and return its task, if any."""
+        task, self._check_task = self._check_task, None
+        if task is None or task.done():
+            return None
+        task.cancel()
+        return task
+
+    async def aclose(self) -> None:
+        task = self.cancel_checks()
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _check(self, state: ReplicaState) -> None:
+        try:
+            lag, replay_lsn = await asyncio.wait_for(self._probe(state.dsn), self._check_timeout)
+        except Exception as exc:
+            if state.healthy:
+                _log.warning("Replica health check failed", replica=state.name, error=str(exc))
+            self._set_health(state, healthy=False, lag=None)
+            return
+
+        healthy = lag is not None and lag <= self._max_lag
+        if state.healthy and not healthy:
+            _log.warning("Replica is lagging behind", replica=state.name, lag_seconds=lag)
+        elif healthy and not state.healthy:
+            _log.info("Replica receives reads", replica=state.name, lag_seconds=lag)
+        self._set_health(state, healthy=healthy, lag=lag)
+        state.replay_lsn = replay_lsn
+
+    @staticmethod
+    def _set_health(state: ReplicaState, *, healthy: bool, lag: Optional[float]) -> None:
+        state.healthy = healthy
+        state.lag = lag
+        REPLICA_HEALTHY.labels(state.name).set(1 if healthy else 0)
+        if lag is not None:
+            REPLICA_LAG_SECONDS.labels(state.name).set(lag)
+
+
+__all__ = ["LagProbe", "ReplicaSet", "ReplicaState"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 import re
 
@@ -8,18 +9,97 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import api_router
-from app.core.limiter import configure_rate_limiting
+from app.core.limiter import configure_rate_limiting, limiter
 from app.core.logging import configure_logging, logger
-from app.db import close_all_pools
+from app.db import (
+    close_all_pools,
+    configure_pool,
+    configure_prepared_statements,
+    configure_replicas,
+    configure_slow_query_log,
+    open_pool,
+    refresh_replicas,
+)
+from app.migrations import audit_indexes
+from app.repositories.metrics import precompile_queries
+from app.services.mv_refresh import start_mv_refresh, stop_mv_refresh
 from app.settings import Settings, get_settings
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    settings = get_settings()
+    db_logger = logger.bind(component="db")
+    configure_pool(
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout,
+        max_waiting=settings.db_pool_max_waiting,
+        max_lifetime=settings.db_pool_max_lifetime,
+        max_idle=settings.db_pool_max_idle,
+    )
+    configure_prepared_statements(settings.db_prepared_statements)
+    configure_slow_query_log(
+        threshold=settings.db_slow_query_ms / 1000,
+        explain=settings.db_slow_query_explain,
+        explain_timeout=settings.db_slow_query_explain_timeout,
+    )
+    replicas = configure_replicas(
+        settings.database_url,
+        settings.database_replicas,
+        max_lag=settings.db_replica_max_lag_seconds,
+        check_interval=settings.db_replica_check_interval,
+    )
+    variants = precompile_queries()
+    db_logger.info("SQL-шаблоны подготовлены", variants=variants)
+
+    if settings.db_pool_warmup:
+        try:
+            await open_pool(settings.database_url, timeout=settings.db_pool_warmup_timeout)
+        except Exception as exc:  # pragma: no cover - зависит от доступности БД
+            # Не блокируем старт: пул будет создан лениво при первом запросе.
+            db_logger.warning("Не удалось прогреть пул подключений", error=str(exc))
+        else:
+            db_logger.info("Пул подключений прогрет", min_size=settings.db_pool_min_size)
+
+    if settings.db_index_audit:
+        try:
+            problems = await asyncio.wait_for(
+                audit_indexes(dsn=settings.database_url),
+                timeout=settings.db_pool_warmup_timeout,
+            )
+        except Exception as exc:  # pragma: no cover - зависит от доступности БД
+            db_logger.warning("Не удалось проверить индексы", error=str(exc))
+        else:
+            for problem in problems:
+                db_logger.warning(
+                    problem.message,
+                    index=problem.requirement.describe(),
+                    existing=problem.index_name,
+                    hint=problem.hint,
+                )
+
+    if replicas is not None:
+        # Первая проверка сразу, чтобы чтения не ждали интервала на primary.
+        await refresh_replicas()
+        db_logger.info(
+            "Реплики для чтения настроены",
+            replicas=len(replicas.replicas),
+            healthy=sum(state.healthy for state in replicas.replicas),
+        )
+
+    if start_mv_refresh(settings.database_url, interval=settings.mv_refresh_interval_seconds):
+        db_logger.info(
+            "Обновление uslugi_daily_mv по расписанию",
+            interval=settings.mv_refresh_interval_seconds,
+        )
+
     try:
         yield
     finally:
+        await stop_mv_refresh()
         await close_all_pools()
+        await limiter.storage.aclose()
 
 
 def create_app() -> FastAPI:
@@ -28,7 +108,7 @@ def create_app() -> FastAPI:
     logger.bind(component="app").info("Запуск приложения", env=settings.app_env)
 
     application = FastAPI(title="U4S Revenue API", version="1.0.0", lifespan=lifespan)
-    configure_rate_limiting(application)
+    configure_rate_limiting(application, settings)
     _configure_cors(application, settings)
     application.include_router(api_router)
     return application
@@ -44,6 +124,7 @@ def _configure_cors(app: FastAPI, settings: Settings | None = None) -> None:
         allow_origin_regex=allow_origin_regex,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
         allow_credentials=False,
     )
 
@@ -0,0 +1,20 @@
+-- Покрывающие индексы под шаблоны app/sql. Фильтры build_filters сравнивают
+-- поле даты с границами периода, а агрегаты читают только перечисленные в
+-- INCLUDE колонки, поэтому сводки и помесячные ряды обходятся index-only scan.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS guests_created_at_covering_idx
+  ON guests (created_at)
+  INCLUDE (total_amount, loyalty_level, checkin_date, bonus_spent);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS guests_checkin_date_covering_idx
+  ON guests (checkin_date)
+  INCLUDE (total_amount, loyalty_level, created_at, bonus_spent);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS uslugi_daily_mv_consumption_date_covering_idx
+  ON uslugi_daily_mv (consumption_date)
+  INCLUDE (uslugi_type, total_amount);
+
+-- services_monthly.sql фильтрует по выражению с COALESCE, а не по колонке.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS uslugi_daily_mv_service_type_covering_idx
+  ON uslugi_daily_mv ((COALESCE(uslugi_type, 'Без категории')), consumption_date)
+  INCLUDE (total_amount);
@@ -0,0 +1,10 @@
+-- Шаблоны по услугам группируют и фильтруют по нормализованному типу:
+-- пустые и пробельные названия попадают в «Без категории». Индекс из 0001
+-- построен по прежнему выражению и фильтром services_monthly.sql больше не
+-- используется, поэтому он заменяется индексом по новому выражению.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS uslugi_daily_mv_service_type_normalized_idx
+  ON uslugi_daily_mv ((COALESCE(NULLIF(btrim(uslugi_type), ''), 'Без категории')), consumption_date)
+  INCLUDE (total_amount);
+
+DROP INDEX CONCURRENTLY IF EXISTS uslugi_daily_mv_service_type_covering_idx;
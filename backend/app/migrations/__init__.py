@@ -0,0 +1,35 @@
+"""SQL-миграции схемы и проверка индексов, на которые рассчитаны запросы.
+
+Применение и проверка из командной строки::
+
+    python -m app.migrations upgrade
+    python -m app.migrations audit
+"""
+
+from app.migrations.audit import (
+    REQUIRED_INDEXES,
+    IndexProblem,
+    IndexRequirement,
+    audit_indexes,
+    find_index_problems,
+)
+from app.migrations.runner import (
+    MIGRATIONS_TABLE,
+    Migration,
+    apply_migrations,
+    discover_migrations,
+    pending_migrations,
+)
+
+__all__ = [
+    "MIGRATIONS_TABLE",
+    "REQUIRED_INDEXES",
+    "IndexProblem",
+    "IndexRequirement",
+    "Migration",
+    "apply_migrations",
+    "audit_indexes",
+    "discover_migrations",
+    "find_index_problems",
+    "pending_migrations",
+]
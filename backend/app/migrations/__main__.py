@@ -0,0 +1,63 @@
+"""Командная строка миграций.
+
+``upgrade`` применяет недостающие миграции, ``status`` показывает их,
+``audit`` проверяет индексы и завершается с кодом 1, если чего-то не хватает::
+
+    python -m app.migrations upgrade
+    python -m app.migrations audit
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import Optional, Sequence
+
+from app.core.logging import bind_logger
+from app.db import close_all_pools
+from app.migrations.audit import audit_indexes
+from app.migrations.runner import apply_migrations, pending_migrations
+
+
+async def _main(argv: Optional[Sequence[str]] = None) -> int:
+    from app.settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Миграции схемы и проверка индексов")
+    parser.add_argument("command", choices=("upgrade", "status", "audit"))
+    args = parser.parse_args(argv)
+
+    dsn = get_settings().database_url
+    log = bind_logger(component="migrations")
+    if args.command == "upgrade":
+        applied = await apply_migrations(dsn)
+        for migration in applied:
+            log.info("Миграция применена", version=migration.version, name=migration.name)
+        if not applied:
+            log.info("Новых миграций нет")
+        return 0
+
+    if args.command == "status":
+        for migration in await pending_migrations(dsn):
+            log.info("Миграция не применена", version=migration.version, name=migration.name)
+        return 0
+
+    try:
+        problems = await audit_indexes(dsn=dsn)
+    finally:
+        await close_all_pools()
+    for problem in problems:
+        log.warning(
+            problem.message,
+            index=problem.requirement.describe(),
+            existing=problem.index_name,
+            hint=problem.hint,
+            queries=", ".join(problem.requirement.queries),
+        )
+    if not problems:
+        log.info("Все нужные индексы на месте")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,160 @@
+"""Проверка индексов, на которые рассчитаны шаблоны ``app/sql``.
+
+Индекс ищется по структуре, а не по имени: подходит любой валидный индекс
+таблицы без условия ``WHERE``, у которого ключ начинается с нужных колонок, а
+среди ключевых и ``INCLUDE``-колонок есть все покрываемые. Так проверка не
+ругается на индексы, созданные вручную под другими именами.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from app.db import fetchall
+from app.db.query_loader import load_query
+
+
+@dataclass(frozen=True, slots=True)
+class IndexRequirement:
+    table: str
+    columns: tuple[str, ...]
+    include: tuple[str, ...] = ()
+    queries: tuple[str, ...] = ()
+
+    def describe(self) -> str:
+        text = f"{self.table} ({', '.join(self.columns)})"
+        if self.include:
+            text += f" INCLUDE ({', '.join(self.include)})"
+        return text
+
+
+@dataclass(frozen=True, slots=True)
+class IndexProblem:
+    """Нарушенное требование: ``missing_table``, ``missing``, ``invalid`` или ``not_covering``."""
+
+    requirement: IndexRequirement
+    problem: str
+    index_name: Optional[str] = None
+
+    @property
+    def message(self) -> str:
+        return _PROBLEM_MESSAGES.get(self.problem, self.problem)
+
+    @property
+    def hint(self) -> str:
+        """Команда, которая устраняет проблему."""
+        if self.problem == "invalid" and self.index_name:
+            # Применённая миграция индекс не пересоздаст: IF NOT EXISTS его видит.
+            return f"REINDEX INDEX CONCURRENTLY {self.index_name}"
+        return "python -m app.migrations upgrade"
+
+
+_PROBLEM_MESSAGES = {
+    "missing_table": "таблица не найдена",
+    "missing": "индекс отсутствует",
+    "invalid": "индекс невалиден после прерванного CREATE INDEX CONCURRENTLY",
+    "not_covering": "в индексе нет INCLUDE-колонок, index-only scan невозможен",
+}
+
+# То же выражение, что фрагмент типа услуги в app.repositories.metrics, без алиаса.
+_SERVICE_TYPE = "COALESCE(NULLIF(btrim(uslugi_type), ''), 'Без категории')"
+
+REQUIRED_INDEXES: tuple[IndexRequirement, ...] = (
+    IndexRequirement(
+        "guests",
+        ("created_at",),
+        ("total_amount", "loyalty_level", "checkin_date", "bonus_spent"),
+        ("metrics_summary.sql", "metrics_monthly.sql", "data_watermark.sql"),
+    ),
+    IndexRequirement(
+        "guests",
+        ("checkin_date",),
+        ("total_amount", "loyalty_level", "created_at", "bonus_spent"),
+        ("metrics_summary.sql", "metrics_monthly.sql"),
+    ),
+    IndexRequirement(
+        "uslugi_daily_mv",
+        ("consumption_date",),
+        ("uslugi_type", "total_amount"),
+        ("services_listing.sql", "services_totals.sql", "services_export_daily.sql"),
+    ),
+    IndexRequirement(
+        "uslugi_daily_mv",
+        (_SERVICE_TYPE, "consumption_date"),
+        ("total_amount",),
+        ("services_monthly.sql",),
+    ),
+)
+
+
+def _normalize(column: str) -> str:
+    # pg_get_indexdef добавляет приведения типов и скобки вокруг выражений.
+    text = re.sub(r"\s+|::text|\"", "", column).lower()
+    while text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    return text
+
+
+def find_index_problems(
+    requirements: Iterable[IndexRequirement],
+    catalog: Sequence[Mapping[str, Any]],
+) -> list[IndexProblem]:
+    """Сопоставляет требования со строками ``index_catalog.sql``."""
+    tables = {row["table_name"] for row in catalog if row["table_exists"]}
+    problems: list[IndexProblem] = []
+    for requirement in requirements:
+        if requirement.table not in tables:
+            problems.append(IndexProblem(requirement, "missing_table"))
+            continue
+        columns = tuple(_normalize(column) for column in requirement.columns)
+        include = {_normalize(column) for column in requirement.include}
+        invalid: Optional[str] = None
+        partial: Optional[str] = None
+        satisfied = False
+        for row in catalog:
+            if row["table_name"] != requirement.table or row["index_name"] is None:
+                continue
+            index_columns = [_normalize(column) for column in row["columns"]]
+            keys = tuple(index_columns[: row["key_count"]])
+            if keys[: len(columns)] != columns:
+                continue
+            if not include <= set(index_columns):
+                partial = partial or row["index_name"]
+            elif row["is_valid"]:
+                satisfied = True
+                break
+            else:
+                invalid = invalid or row["index_name"]
+        if satisfied:
+            continue
+        if invalid is not None:
+            problems.append(IndexProblem(requirement, "invalid", invalid))
+        elif partial is not None:
+            problems.append(IndexProblem(requirement, "not_covering", partial))
+        else:
+            problems.append(IndexProblem(requirement, "missing"))
+    return problems
+
+
+async def audit_indexes(
+    *,
+    dsn: Optional[str] = None,
+    requirements: Sequence[IndexRequirement] = REQUIRED_INDEXES,
+) -> list[IndexProblem]:
+    """Читает каталог базы и возвращает нарушенные требования к индексам."""
+    tables = sorted({requirement.table for requirement in requirements})
+    catalog = await fetchall(
+        load_query("index_catalog.sql"), {"tables": tables}, dsn=dsn, replica=False
+    )
+    return find_index_problems(requirements, catalog)
+
+
+__all__ = [
+    "REQUIRED_INDEXES",
+    "IndexProblem",
+    "IndexRequirement",
+    "audit_indexes",
+    "find_index_problems",
+]
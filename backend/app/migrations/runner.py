@@ -0,0 +1,152 @@
+"""Применение SQL-миграций из пакета ``app.migrations``.
+
+Миграция — файл ``NNNN_описание.sql``; файлы применяются по возрастанию
+номера, применённые версии записываются в ``u4s_schema_migrations``.
+Операторы выполняются по одному вне транзакции, чтобы работал
+``CREATE INDEX CONCURRENTLY``, поэтому каждый оператор должен быть
+идемпотентным (``IF NOT EXISTS``), а ``;`` внутри строковых литералов не
+поддерживается. Параллельные запуски сериализуются advisory lock.
+
+Прерванный ``CREATE INDEX CONCURRENTLY`` оставляет невалидный индекс, который
+``IF NOT EXISTS`` пропустил бы навсегда, поэтому перед таким оператором
+одноимённый невалидный индекс удаляется.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from importlib import resources
+from typing import Optional, Sequence
+
+import psycopg
+from psycopg import sql
+
+MIGRATIONS_TABLE = "u4s_schema_migrations"
+_MIGRATION_FILE = re.compile(r"^(?P<version>\d{4})_(?P<name>[a-z0-9_]+)\.sql$")
+_LOCK_KEY = "u4s_schema_migrations"
+_CREATE_INDEX_CONCURRENTLY = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(?P<name>\w+)",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: str
+    name: str
+    text: str
+
+    @property
+    def statements(self) -> list[str]:
+        """Операторы миграции без комментариев ``--``."""
+        lines = [line for line in self.text.splitlines() if not line.lstrip().startswith("--")]
+        return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def discover_migrations(package: str = "app.migrations") -> list[Migration]:
+    """Миграции пакета ``package`` в порядке применения."""
+    migrations: list[Migration] = []
+    for entry in resources.files(package).iterdir():
+        match = _MIGRATION_FILE.match(entry.name)
+        if match is None:
+            continue
+        migrations.append(
+            Migration(
+                version=match["version"],
+                name=match["name"],
+                text=entry.read_text(encoding="utf-8"),
+            )
+        )
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Повторяющиеся номера миграций: {versions}")
+    return migrations
+
+
+async def _ensure_migrations_table(conn: psycopg.AsyncConnection) -> None:
+    await conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+          version text PRIMARY KEY,
+          name text NOT NULL,
+          applied_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+async def _drop_invalid_index(conn: psycopg.AsyncConnection, statement: str) -> None:
+    """Удаляет невалидный индекс, который собирается создать ``statement``."""
+    match = _CREATE_INDEX_CONCURRENTLY.match(statement)
+    if match is None:
+        return
+    cursor = await conn.execute(
+        """
+        SELECT n.nspname, c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = %s AND NOT i.indisvalid AND pg_table_is_visible(c.oid)
+        """,
+        (match["name"].lower(),),
+    )
+    row = await cursor.fetchone()
+    if row is not None:
+        await conn.execute(
+            sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(*row))
+        )
+
+
+async def applied_versions(conn: psycopg.AsyncConnection) -> set[str]:
+    """Версии, уже записанные в таблицу миграций."""
+    await _ensure_migrations_table(conn)
+    cursor = await conn.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+    return {row[0] for row in await cursor.fetchall()}
+
+
+async def pending_migrations(
+    dsn: str, migrations: Optional[Sequence[Migration]] = None
+) -> list[Migration]:
+    """Миграции, которые ещё не применены к базе ``dsn``."""
+    migrations = discover_migrations() if migrations is None else migrations
+    async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+        applied = await applied_versions(conn)
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+async def apply_migrations(
+    dsn: str, migrations: Optional[Sequence[Migration]] = None
+) -> list[Migration]:
+    """Применяет недостающие миграции и возвращает применённые."""
+    migrations = discover_migrations() if migrations is None else migrations
+    applied_now: list[Migration] = []
+    async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+        await conn.execute("SELECT pg_advisory_lock(hashtext(%s))", (_LOCK_KEY,))
+        try:
+            applied = await applied_versions(conn)
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                for statement in migration.statements:
+                    await _drop_invalid_index(conn, statement)
+                    await conn.execute(statement)
+                await conn.execute(
+                    f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (%s, %s)",
+                    (migration.version, migration.name),
+                )
+                applied_now.append(migration)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext(%s))", (_LOCK_KEY,))
+    return applied_now
+
+
+__all__ = [
+    "MIGRATIONS_TABLE",
+    "Migration",
+    "applied_versions",
+    "apply_migrations",
+    "discover_migrations",
+    "pending_migrations",
+]
@@ -4,22 +4,39 @@ from app.repositories.metrics import (
     MetricsSummaryRecord,
     MonthlyMetricRecord,
     MonthlyServiceRecord,
+    ServiceDailyUsageRecord,
     ServiceUsageRecord,
     ServicesListingResult,
+    fetch_metrics_summaries,
     fetch_metrics_summary,
+    fetch_metrics_summary_comparison,
     fetch_monthly_metric_rows,
     fetch_monthly_service_rows,
     fetch_services_listing,
+    fetch_services_totals,
+    invalidate_cached_months,
+    stream_monthly_metric_rows,
+    stream_services_usage,
 )
+from app.repositories.watermark import DataWatermark, fetch_data_watermark
 
 __all__ = [
+    "DataWatermark",
     "MetricsSummaryRecord",
     "MonthlyMetricRecord",
     "MonthlyServiceRecord",
+    "ServiceDailyUsageRecord",
     "ServiceUsageRecord",
     "ServicesListingResult",
+    "fetch_data_watermark",
+    "fetch_metrics_summaries",
     "fetch_metrics_summary",
+    "fetch_metrics_summary_comparison",
     "fetch_monthly_metric_rows",
     "fetch_monthly_service_rows",
     "fetch_services_listing",
+    "fetch_services_totals",
+    "invalidate_cached_months",
+    "stream_monthly_metric_rows",
+    "stream_services_usage",
 ]
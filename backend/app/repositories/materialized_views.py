@@ -0,0 +1,94 @@
+"""Обновление материализованных представлений, из которых читаются отчёты.
+
+``REFRESH MATERIALIZED VIEW CONCURRENTLY`` не блокирует чтение, но требует
+уникального индекса на представлении. Обновление выполняется под
+``pg_try_advisory_lock``: если представление уже обновляет другой воркер или
+оно обновлялось позже ``min_interval`` секунд назад (время берётся из базы,
+``u4s_mv_refresh_state``), вызов ничего не делает. Поэтому при нескольких
+воркерах представление обновляется один раз за интервал.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Mapping, Optional, cast
+
+import psycopg
+from psycopg import sql
+from psycopg.rows import dict_row
+
+from app.db.query_loader import load_query
+
+SERVICES_VIEW = "uslugi_daily_mv"
+
+
+@dataclass(frozen=True, slots=True)
+class ViewRefreshResult:
+    view: str
+    refreshed: bool
+    refreshed_at: Optional[datetime]
+    duration_seconds: Optional[float]
+
+
+async def _fetch_state(
+    conn: psycopg.AsyncConnection, view: str, min_interval: float
+) -> Mapping[str, Any]:
+    cursor = await conn.execute(
+        load_query("mv_refresh_state.sql"), {"view": view, "min_interval": min_interval}
+    )
+    return cast(Optional[Mapping[str, Any]], await cursor.fetchone()) or {}
+
+
+async def refresh_materialized_view(
+    view: str = SERVICES_VIEW,
+    *,
+    dsn: str,
+    min_interval: float = 0.0,
+    concurrently: bool = True,
+) -> ViewRefreshResult:
+    """Обновляет ``view``, если его не обновили за последние ``min_interval`` секунд.
+
+    Соединение открывается отдельно от пула: обновление может идти минутами и не
+    должно занимать подключения, нужные запросам.
+    """
+
+    lock_key = f"mv_refresh:{view}"
+    refresh = sql.SQL("REFRESH MATERIALIZED VIEW {concurrently}{view}").format(
+        concurrently=sql.SQL("CONCURRENTLY " if concurrently else ""),
+        view=sql.Identifier(view),
+    )
+    async with await psycopg.AsyncConnection.connect(
+        dsn, autocommit=True, row_factory=dict_row
+    ) as conn:
+        cursor = await conn.execute(
+            "SELECT pg_try_advisory_lock(hashtext(%s)) AS locked", (lock_key,)
+        )
+        if not cast(Mapping[str, Any], await cursor.fetchone())["locked"]:
+            try:
+                state = await _fetch_state(conn, view, min_interval)
+            except psycopg.errors.UndefinedTable:
+                # Первое обновление ещё идёт и таблица состояния не создана.
+                state = {}
+            return ViewRefreshResult(view, False, state.get("refreshed_at"), None)
+        try:
+            await conn.execute(load_query("mv_refresh_state_schema.sql"))
+            state = await _fetch_state(conn, view, min_interval)
+            if state.get("is_fresh"):
+                return ViewRefreshResult(view, False, state.get("refreshed_at"), None)
+
+            started = time.perf_counter()
+            await conn.execute(refresh)
+            duration = time.perf_counter() - started
+            cursor = await conn.execute(
+                load_query("mv_refresh_state_upsert.sql"),
+                {"view": view, "duration_seconds": duration},
+            )
+            row = cast(Mapping[str, Any], await cursor.fetchone())
+            return ViewRefreshResult(view, True, row["refreshed_at"], duration)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext(%s))", (lock_key,))
+
+
+__all__ = ["SERVICES_VIEW", "ViewRefreshResult", "refresh_materialized_view"]
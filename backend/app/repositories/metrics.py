@@ -1,24 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from datetime import date, datetime
-from decimal import Decimal
-from typing import Any, Mapping, Optional, Sequence, cast
+from datetime import date
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
 
 from psycopg import sql
+from psycopg.rows import args_row, tuple_row
 
 from app.core.dates import (
     CONSUMPTION_DATE_RESOLUTION,
+    ROLLUP_DAY_RESOLUTION,
     DateFieldResolution,
-    build_filters,
+    add_months,
+    build_filter_clause,
+    build_filter_params,
     last_day_of_month,
     month_range,
     resolve_date_field,
 )
-from app.core.numbers import as_float
-from app.db import fetchall, fetchone
-from app.db.query_loader import load_query
-from app.schemas.enums import DateField, MonthlyRange
+from app.core.singleflight import coalesce
+from app.db import current_dsn, fetchall, fetchone, stream
+from app.db.query_loader import CompiledQuery, compile_query
+from app.repositories.month_cache import ClosedMonthCache
+from app.schemas.enums import DateField, MonthlyRange, ServicesExportGranularity
+from app.settings import get_settings
 
 
 @dataclass(frozen=True, slots=True)
@@ -40,11 +47,20 @@ class ServiceUsageRecord:
     total_amount: float
 
 
+@dataclass(frozen=True, slots=True)
+class ServiceDailyUsageRecord:
+    consumption_date: date
+    service_type: str
+    total_amount: float
+
+
 @dataclass(frozen=True, slots=True)
 class ServicesListingResult:
     items: Sequence[ServiceUsageRecord]
     total_items: int
     total_amount: float
+    # Сколько услуг в общем порядке стоит перед первым элементом ``items``.
+    offset: int = 0
 
 
 @dataclass(frozen=True, slots=True)
@@ -67,55 +83,270 @@ class MonthlyServiceRecord:
     total_amount: float
 
 
-NumericInput = int | float | Decimal | str | None
+# Шаблоны отдают колонки в порядке полей записей и уже приведёнными к float8/int4,
+# поэтому строки собираются позиционно, без словарей и приведения типов в Python.
+_SUMMARY_ROW = args_row(MetricsSummaryRecord)
+_SERVICE_USAGE_ROW = args_row(ServiceUsageRecord)
+_SERVICE_DAILY_USAGE_ROW = args_row(ServiceDailyUsageRecord)
+_MONTHLY_METRIC_ROW = args_row(MonthlyMetricRecord)
+_MONTHLY_SERVICE_ROW = args_row(MonthlyServiceRecord)
+
+_EMPTY_SUMMARY = MetricsSummaryRecord(
+    bookings_count=0,
+    lvl2p=0,
+    avg_check=0.0,
+    min_booking=0.0,
+    max_booking=0.0,
+    avg_stay_days=0.0,
+    bonus_spent_sum=0.0,
+    revenue=0.0,
+    services_amount=0.0,
+)
+
 
+def _use_rollups() -> bool:
+    """Читать агрегаты по гостям из ``guests_daily_rollup`` вместо ``guests``."""
+    return get_settings().metrics_source == "rollup"
 
-def _normalize_numeric(value: NumericInput) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float, Decimal)):
-        return float(value)
-    if isinstance(value, str):
-        stripped = value.strip()
-        if not stripped:
-            return None
-        try:
-            return float(stripped)
-        except ValueError:
-            return None
-    return None
-
-
-def _as_int(value: NumericInput) -> int:
-    numeric = _normalize_numeric(value)
-    if numeric is None:
-        return 0
-    return int(numeric)
-
-
-def _as_optional_float(value: NumericInput) -> Optional[float]:
-    return _normalize_numeric(value)
-
-
-def _coerce_date(value: date | datetime | None) -> Optional[date]:
-    """Convert value to date, handling datetime objects."""
-    if isinstance(value, datetime):
-        return value.date()
-    if isinstance(value, date):
-        return value
-    if value is None:
+
+def _guest_filter_clause(
+    resolution: DateFieldResolution,
+    *,
+    has_from: bool,
+    has_to: bool,
+    rollup: bool,
+    table_alias: Optional[str] = None,
+) -> sql.Composable:
+    """Фильтр по дате бронирования для сырой таблицы или для роллапа."""
+    if rollup:
+        return build_filter_clause(
+            ROLLUP_DAY_RESOLUTION, has_from=has_from, has_to=has_to, table_alias="r"
+        )
+    return build_filter_clause(
+        resolution, has_from=has_from, has_to=has_to, table_alias=table_alias
+    )
+
+
+# Тип услуги в отчётах: пустые и пробельные названия попадают в «Без категории».
+# Один фрагмент на все шаблоны, чтобы группировка и фильтр по типу не расходились.
+_SERVICE_TYPE = sql.SQL("COALESCE(NULLIF(btrim(u.uslugi_type), ''), 'Без категории')")
+
+
+def _services_filter_clause(*, has_from: bool, has_to: bool) -> sql.Composable:
+    return build_filter_clause(
+        CONSUMPTION_DATE_RESOLUTION, has_from=has_from, has_to=has_to, table_alias="u"
+    )
+
+
+def _guest_params(
+    resolution: DateFieldResolution,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    *,
+    rollup: bool,
+) -> dict[str, Any]:
+    params: dict[str, Any] = dict(build_filter_params(date_from, date_to))
+    if rollup:
+        params["rollup_field"] = resolution.column
+    return params
+
+
+@lru_cache
+def _monthly_metrics_cache() -> Optional[ClosedMonthCache[MonthlyMetricRecord]]:
+    return _build_month_cache("monthly_metric_rows")
+
+
+@lru_cache
+def _monthly_services_cache() -> Optional[ClosedMonthCache[MonthlyServiceRecord]]:
+    return _build_month_cache("monthly_service_rows")
+
+
+def _build_month_cache(name: str) -> Optional[ClosedMonthCache[Any]]:
+    settings = get_settings()
+    if settings.monthly_cache_max_entries <= 0:
         return None
-    if hasattr(value, "date") and callable(value.date):
-        result = value.date()  # type: ignore[call-arg]
-        return result if isinstance(result, date) else None
-    return None
+    return ClosedMonthCache(
+        name,
+        max_entries=settings.monthly_cache_max_entries,
+        ttl_seconds=settings.monthly_cache_ttl_seconds,
+        grace_days=settings.monthly_cache_grace_days,
+    )
+
+
+def invalidate_cached_months(months: Optional[Iterable[date]] = None) -> int:
+    """Сбрасывает закешированные месяцы помесячных рядов (все, если ``months`` не задан)."""
+    dropped = 0
+    for cache in (_monthly_metrics_cache(), _monthly_services_cache()):
+        if cache is not None:
+            dropped += cache.invalidate(months)
+    return dropped
+
+
+def _series_months(start_month: date, end_month: date) -> list[date]:
+    months: list[date] = []
+    month = start_month
+    while month <= end_month:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+@lru_cache(maxsize=None)
+def _summary_query(
+    resolution: DateFieldResolution, has_from: bool, has_to: bool, rollup: bool
+) -> CompiledQuery:
+    return compile_query(
+        "metrics_summary_rollup.sql" if rollup else "metrics_summary.sql",
+        filters=_guest_filter_clause(
+            resolution, has_from=has_from, has_to=has_to, rollup=rollup
+        ),
+        services_filters=_services_filter_clause(has_from=has_from, has_to=has_to),
+    )
+
+
+@lru_cache(maxsize=None)
+def _summary_guests_query(
+    resolution: DateFieldResolution, has_from: bool, has_to: bool, rollup: bool
+) -> CompiledQuery:
+    return compile_query(
+        "metrics_summary_guests_rollup.sql" if rollup else "metrics_summary_guests.sql",
+        filters=_guest_filter_clause(
+            resolution, has_from=has_from, has_to=has_to, rollup=rollup, table_alias="g"
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def _summary_compare_query(resolution: DateFieldResolution, rollup: bool) -> CompiledQuery:
+    # Сравнение всегда строится по двум закрытым периодам.
+    if rollup:
+        return compile_query("metrics_summary_compare_rollup.sql")
+    return compile_query(
+        "metrics_summary_compare.sql", date_column=sql.Identifier(resolution.column)
+    )
+
+
+@lru_cache(maxsize=None)
+def _summary_batch_query(resolution: DateFieldResolution, rollup: bool) -> CompiledQuery:
+    if rollup:
+        return compile_query("metrics_summary_batch_rollup.sql")
+    return compile_query(
+        "metrics_summary_batch.sql", date_column=sql.Identifier(resolution.column)
+    )
+
+
+@lru_cache(maxsize=None)
+def _services_summary_query(has_from: bool, has_to: bool) -> CompiledQuery:
+    return compile_query(
+        "services_summary.sql",
+        filters=_services_filter_clause(has_from=has_from, has_to=has_to),
+    )
+
+
+# Позиция страницы: номером через ``offset`` или по ключу последней услуги
+# предыдущей страницы. Ключ сравнивается в том же порядке, что и ``ROW_NUMBER``:
+# ``total_amount DESC, service_type COLLATE "C"``.
+_LISTING_OFFSET = sql.SQL("%(offset)s::int8")
+_LISTING_KEYSET = sql.SQL(
+    """(
+    SELECT COUNT(*)
+    FROM ranked
+    WHERE total_amount > %(after_amount)s::float8
+      OR (total_amount = %(after_amount)s::float8
+          AND service_type COLLATE "C" <= %(after_type)s::text)
+  )"""
+)
+
+
+@lru_cache(maxsize=None)
+def _services_listing_query(has_from: bool, has_to: bool, keyset: bool) -> CompiledQuery:
+    return compile_query(
+        "services_listing.sql",
+        filters=_services_filter_clause(has_from=has_from, has_to=has_to),
+        service_type=_SERVICE_TYPE,
+        offset=_LISTING_KEYSET if keyset else _LISTING_OFFSET,
+    )
+
+
+@lru_cache(maxsize=None)
+def _services_totals_query(has_from: bool, has_to: bool) -> CompiledQuery:
+    return compile_query(
+        "services_totals.sql",
+        filters=_services_filter_clause(has_from=has_from, has_to=has_to),
+        service_type=_SERVICE_TYPE,
+    )
+
+
+@lru_cache(maxsize=None)
+def _services_export_query(
+    granularity: ServicesExportGranularity, has_from: bool, has_to: bool
+) -> CompiledQuery:
+    template = (
+        "services_export_daily.sql"
+        if granularity is ServicesExportGranularity.daily
+        else "services_export_totals.sql"
+    )
+    return compile_query(
+        template,
+        filters=_services_filter_clause(has_from=has_from, has_to=has_to),
+        service_type=_SERVICE_TYPE,
+    )
+
+
+@lru_cache(maxsize=None)
+def _monthly_metrics_query(resolution: DateFieldResolution, rollup: bool) -> CompiledQuery:
+    # Помесячные ряды всегда ограничены с обеих сторон диапазоном месяцев.
+    return compile_query(
+        "metrics_monthly_rollup.sql" if rollup else "metrics_monthly.sql",
+        date_column=sql.Identifier(resolution.column),
+        filters=_guest_filter_clause(
+            resolution, has_from=True, has_to=True, rollup=rollup, table_alias="g"
+        ),
+        services_filters=_services_filter_clause(has_from=True, has_to=True),
+    )
 
 
-def _normalize_service_type(raw: str | None) -> str:
-    value = str(raw or "").strip()
-    return value or "Без категории"
+@lru_cache(maxsize=None)
+def _monthly_services_query() -> CompiledQuery:
+    return compile_query(
+        "services_monthly.sql",
+        filters=_services_filter_clause(has_from=True, has_to=True),
+        service_filter=sql.SQL("\n          AND {} = %(service_type)s").format(_SERVICE_TYPE),
+    )
+
+
+def precompile_queries() -> int:
+    """Заранее собирает все варианты SQL-шаблонов для текущего источника данных.
+
+    Возвращает количество подготовленных вариантов. Вызывается при старте
+    приложения, чтобы первый запрос не тратил время на сборку текста.
+    """
+    rollup = _use_rollups()
+    bounds = [(has_from, has_to) for has_from in (False, True) for has_to in (False, True)]
+    variants: set[CompiledQuery] = set()
 
+    for date_field in DateField:
+        resolution = resolve_date_field(date_field)
+        variants.add(_monthly_metrics_query(resolution, rollup))
+        variants.add(_summary_compare_query(resolution, rollup))
+        variants.add(_summary_batch_query(resolution, rollup))
+        for has_from, has_to in bounds:
+            variants.add(_summary_query(resolution, has_from, has_to, rollup))
+            variants.add(_summary_guests_query(resolution, has_from, has_to, rollup))
 
+    for has_from, has_to in bounds:
+        variants.add(_services_summary_query(has_from, has_to))
+        for keyset in (False, True):
+            variants.add(_services_listing_query(has_from, has_to, keyset))
+        variants.add(_services_totals_query(has_from, has_to))
+        for granularity in ServicesExportGranularity:
+            variants.add(_services_export_query(granularity, has_from, has_to))
+    variants.add(_monthly_services_query())
+
+    return len(variants)
+
+
+@coalesce("metrics_summary", scope=current_dsn)
 async def fetch_metrics_summary(
     *,
     date_from: Optional[date],
@@ -123,178 +354,284 @@ async def fetch_metrics_summary(
     date_field: DateField,
 ) -> MetricsSummaryRecord:
     resolution = resolve_date_field(date_field)
-    filters, params = build_filters(resolution, date_from, date_to)
-    services_filters, services_params = build_filters(
-        CONSUMPTION_DATE_RESOLUTION, date_from, date_to, table_alias="u"
-    )
-    params.update(services_params)
+    rollup = _use_rollups()
+    params = _guest_params(resolution, date_from, date_to, rollup=rollup)
+
+    if get_settings().metrics_summary_strategy == "parallel":
+        # Агрегаты по гостям и по услугам считаются на двух соединениях пула
+        # одновременно, а не последовательно внутри одного запроса.
+        # Колонки гостевого запроса идут в порядке первых полей записи,
+        # сумма по услугам — последним полем.
+        guests_row, services_row = await asyncio.gather(
+            fetchone(
+                _summary_guests_query(resolution, bool(date_from), bool(date_to), rollup),
+                params,
+                row_factory=tuple_row,
+            ),
+            fetchone(
+                _services_summary_query(bool(date_from), bool(date_to)),
+                build_filter_params(date_from, date_to),
+                row_factory=tuple_row,
+            ),
+        )
+        if guests_row is None or services_row is None:
+            return _EMPTY_SUMMARY
+        return MetricsSummaryRecord(*guests_row, *services_row)
+
+    query = _summary_query(resolution, bool(date_from), bool(date_to), rollup)
+    return await fetchone(query, params, row_factory=_SUMMARY_ROW) or _EMPTY_SUMMARY
+
+
+@coalesce("metrics_summary_comparison", scope=current_dsn)
+async def fetch_metrics_summary_comparison(
+    *,
+    date_from: date,
+    date_to: date,
+    compare_from: date,
+    compare_to: date,
+    date_field: DateField,
+) -> tuple[MetricsSummaryRecord, MetricsSummaryRecord]:
+    """Сводки за период и за период сравнения одним запросом.
 
-    query = load_query("metrics_summary.sql").format(
-        filters=filters,
-        services_filters=services_filters,
-    )
+    Строки обоих диапазонов читаются за один проход, а агрегаты каждого
+    периода отделяются через ``FILTER``. Периоды могут пересекаться: строка
+    из пересечения учитывается в обоих.
+    """
+    resolution = resolve_date_field(date_field)
+    rollup = _use_rollups()
+    params = _guest_params(resolution, date_from, date_to, rollup=rollup)
+    for key, value in build_filter_params(compare_from, compare_to).items():
+        params[f"compare_{key}"] = value
+
+    row = await fetchone(_summary_compare_query(resolution, rollup), params, row_factory=tuple_row)
+    if row is None:
+        return _EMPTY_SUMMARY, _EMPTY_SUMMARY
+    width = len(row) // 2
+    return MetricsSummaryRecord(*row[:width]), MetricsSummaryRecord(*row[width:])
+
+
+@coalesce("metrics_summary_batch", scope=current_dsn)
+async def fetch_metrics_summaries(
+    *,
+    ranges: tuple[tuple[date, date], ...],
+    date_field: DateField,
+) -> list[MetricsSummaryRecord]:
+    """Сводки по нескольким периодам ``(date_from, date_to)`` одним запросом.
+
+    Границы передаются массивами и разворачиваются через ``unnest``, каждый
+    период присоединяется к ``guests`` и ``uslugi_daily_mv`` своим диапазоном.
+    Записи возвращаются в порядке ``ranges``.
+    """
+    if not ranges:
+        return []
+    resolution = resolve_date_field(date_field)
+    rollup = _use_rollups()
+    bounds = [build_filter_params(date_from, date_to) for date_from, date_to in ranges]
+    params: dict[str, Any] = {
+        "range_from": [item["from"] for item in bounds],
+        "range_to": [item["to"] for item in bounds],
+    }
+    if rollup:
+        params["rollup_field"] = resolution.column
 
-    row = cast(Mapping[str, Any], await fetchone(query, params) or {})
-    return MetricsSummaryRecord(
-        bookings_count=_as_int(row.get("bookings_count")),
-        lvl2p=_as_int(row.get("lvl2p")),
-        avg_check=as_float(row.get("avg_check")),
-        min_booking=as_float(row.get("min_booking")),
-        max_booking=as_float(row.get("max_booking")),
-        avg_stay_days=as_float(row.get("avg_stay_days")),
-        bonus_spent_sum=as_float(row.get("bonus_spent_sum")),
-        revenue=as_float(row.get("revenue")),
-        services_amount=as_float(row.get("services_amount")),
+    return await fetchall(
+        _summary_batch_query(resolution, rollup), params, row_factory=_SUMMARY_ROW
     )
 
 
+@coalesce("services_listing", scope=current_dsn)
 async def fetch_services_listing(
     *,
     date_from: Optional[date],
     date_to: Optional[date],
-    page: int,
     page_size: int,
+    page: int = 1,
+    after: Optional[tuple[float, str]] = None,
 ) -> ServicesListingResult:
-    filters, params = build_filters(
-        CONSUMPTION_DATE_RESOLUTION, date_from, date_to, table_alias="u"
-    )
-    offset = (page - 1) * page_size
-    query = load_query("services_listing.sql").format(filters=filters)
-    query_params = {**params, "limit": page_size, "offset": offset}
-    rows = await fetchall(query, query_params)
+    """Страница услуг по номеру ``page`` или после ключа ``after``.
+
+    ``after`` — пара ``(total_amount, service_type)`` последней услуги
+    предыдущей страницы; тогда ``page`` не используется, а позиция первой
+    услуги возвращается в ``offset``.
+    """
+    query = _services_listing_query(bool(date_from), bool(date_to), after is not None)
+    query_params: dict[str, Any] = {
+        **build_filter_params(date_from, date_to),
+        "limit": page_size,
+    }
+    if after is None:
+        query_params["offset"] = (page - 1) * page_size
+    else:
+        query_params["after_amount"], query_params["after_type"] = after
+    rows = await fetchall(query, query_params, row_factory=tuple_row)
 
-    summary_row: Mapping[str, Any] | None = None
     items: list[ServiceUsageRecord] = []
-    for row in rows:
-        if row.get("is_summary"):
-            summary_row = row
+    total_items, total_amount, offset = 0, 0.0, 0
+    for service_type, amount, row_total_items, overall_amount, is_summary, page_offset in rows:
+        if is_summary:
+            total_items, total_amount, offset = row_total_items, overall_amount, page_offset
         else:
-            items.append(
-                ServiceUsageRecord(
-                    service_type=_normalize_service_type(row.get("service_type")),
-                    total_amount=as_float(row.get("total_amount")),
-                )
-            )
+            items.append(ServiceUsageRecord(service_type, amount))
 
-    total_items = _as_int(summary_row.get("total_items")) if summary_row else 0
-    total_amount = as_float(summary_row.get("overall_amount")) if summary_row else 0.0
+    return ServicesListingResult(
+        items=items, total_items=total_items, total_amount=total_amount, offset=offset
+    )
 
-    return ServicesListingResult(items=items, total_items=total_items, total_amount=total_amount)
+
+@coalesce("services_totals", scope=current_dsn)
+async def fetch_services_totals(
+    *,
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> ServicesListingResult:
+    """Выручка по всем типам услуг за период одним агрегатом, без оконных функций.
+
+    Порядок элементов не определён; страницы из результата нарезает вызывающий код.
+    """
+    items: list[ServiceUsageRecord] = await fetchall(
+        _services_totals_query(bool(date_from), bool(date_to)),
+        build_filter_params(date_from, date_to),
+        row_factory=_SERVICE_USAGE_ROW,
+    )
+    return ServicesListingResult(
+        items=items,
+        total_items=len(items),
+        total_amount=sum(item.total_amount for item in items),
+    )
 
 
+@coalesce("monthly_metric_rows", scope=current_dsn)
 async def fetch_monthly_metric_rows(
     *,
     range_: MonthlyRange,
     date_field: DateField,
 ) -> Sequence[MonthlyMetricRecord]:
     start_month, end_month = month_range(range_)
-    end_date = last_day_of_month(end_month)
+    cache = _monthly_metrics_cache()
+    if cache is None:
+        return await _query_monthly_metric_rows(start_month, end_month, date_field)
+
+    months = _series_months(start_month, end_month)
+    scope = (current_dsn(), date_field, _use_rollups())
+    cached, query_from = cache.lookup(scope, months)
+    if query_from is None:
+        return [cached[month] for month in months]
+
+    fresh = await _query_monthly_metric_rows(query_from, end_month, date_field)
+    cache.store(scope, fresh)
+    return [*cached.values(), *fresh]
+
+
+async def _query_monthly_metric_rows(
+    start_month: date, end_month: date, date_field: DateField
+) -> list[MonthlyMetricRecord]:
+    query, query_params = _monthly_metrics_request(
+        start_month=start_month, end_month=end_month, date_field=date_field
+    )
+    return await fetchall(query, query_params, row_factory=_MONTHLY_METRIC_ROW)
 
-    resolution = resolve_date_field(date_field)
-    filters, params = build_filters(
-        resolution,
-        date_from=start_month,
-        date_to=end_date,
-        table_alias="g",
+
+async def stream_monthly_metric_rows(
+    *,
+    range_: MonthlyRange,
+    date_field: DateField,
+    dsn: Optional[str] = None,
+) -> AsyncIterator[MonthlyMetricRecord]:
+    """Потоково отдаёт помесячные строки без накопления результата в памяти."""
+    start_month, end_month = month_range(range_)
+    query, params = _monthly_metrics_request(
+        start_month=start_month, end_month=end_month, date_field=date_field
     )
-    services_filters, services_params = build_filters(
-        CONSUMPTION_DATE_RESOLUTION,
-        date_from=start_month,
-        date_to=end_date,
-        table_alias="u",
+    async for record in stream(query, params, dsn=dsn, row_factory=_MONTHLY_METRIC_ROW):
+        yield record
+
+
+async def stream_services_usage(
+    *,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    granularity: ServicesExportGranularity,
+    dsn: Optional[str] = None,
+) -> AsyncIterator[ServiceUsageRecord | ServiceDailyUsageRecord]:
+    """Потоково отдаёт выручку по услугам (итогом или по дням) для выгрузки."""
+    query = _services_export_query(granularity, bool(date_from), bool(date_to))
+    params = build_filter_params(date_from, date_to)
+    row_factory = (
+        _SERVICE_DAILY_USAGE_ROW
+        if granularity is ServicesExportGranularity.daily
+        else _SERVICE_USAGE_ROW
     )
-    params.update(services_params)
+    async for record in stream(query, params, dsn=dsn, row_factory=row_factory):
+        yield record
+
+
+def _monthly_metrics_request(
+    *, start_month: date, end_month: date, date_field: DateField
+) -> tuple[CompiledQuery, dict[str, Any]]:
+    end_date = last_day_of_month(end_month)
 
+    resolution = resolve_date_field(date_field)
+    rollup = _use_rollups()
     query_params = {
-        **params,
+        **_guest_params(resolution, start_month, end_date, rollup=rollup),
         "series_start": start_month,
         "series_end": end_month,
     }
-
-    query = load_query("metrics_monthly.sql").format(
-        date_column=sql.Identifier(resolution.column),
-        filters=filters,
-        services_filters=services_filters,
-    )
-
-    rows = await fetchall(query, query_params)
-    result: list[MonthlyMetricRecord] = []
-    for row in rows:
-        month_start = _coerce_date(row.get("month_start"))
-        if month_start:
-            result.append(
-                MonthlyMetricRecord(
-                    month=month_start,
-                    revenue=as_float(row.get("revenue")),
-                    bookings_count=_as_int(row.get("bookings_count")),
-                    lvl2p=_as_int(row.get("lvl2p")),
-                    min_booking=_as_optional_float(row.get("min_booking")),
-                    max_booking=_as_optional_float(row.get("max_booking")),
-                    avg_check=as_float(row.get("avg_check")),
-                    avg_stay_days=as_float(row.get("avg_stay_days")),
-                    bonus_spent_sum=as_float(row.get("bonus_spent_sum")),
-                    services_amount=as_float(row.get("services_amount")),
-                )
-            )
-
-    return result
+    return _monthly_metrics_query(resolution, rollup), query_params
 
 
+@coalesce("monthly_service_rows", scope=current_dsn)
 async def fetch_monthly_service_rows(
     *,
     service_type: str,
     range_: MonthlyRange,
 ) -> Sequence[MonthlyServiceRecord]:
     start_month, end_month = month_range(range_)
-    end_date = last_day_of_month(end_month)
+    cache = _monthly_services_cache()
+    if cache is None:
+        return await _query_monthly_service_rows(start_month, end_month, service_type)
 
-    filters, params = build_filters(
-        CONSUMPTION_DATE_RESOLUTION,
-        date_from=start_month,
-        date_to=end_date,
-        table_alias="u",
-    )
+    months = _series_months(start_month, end_month)
+    scope = (current_dsn(), service_type)
+    cached, query_from = cache.lookup(scope, months)
+    if query_from is None:
+        return [cached[month] for month in months]
 
-    params.update(
-        {
-            "series_start": start_month,
-            "series_end": end_month,
-            "service_type": service_type,
-        }
-    )
+    fresh = await _query_monthly_service_rows(query_from, end_month, service_type)
+    cache.store(scope, fresh)
+    return [*cached.values(), *fresh]
 
-    service_clause = sql.SQL(
-        "\n          AND COALESCE(u.uslugi_type, 'Без категории') = %(service_type)s"
-    )
-
-    query = load_query("services_monthly.sql").format(
-        filters=filters,
-        service_filter=service_clause,
-    )
 
-    rows = await fetchall(query, params)
-    result: list[MonthlyServiceRecord] = []
-    for row in rows:
-        month_start = _coerce_date(row.get("month_start"))
-        if month_start:
-            result.append(
-                MonthlyServiceRecord(
-                    month=month_start,
-                    total_amount=as_float(row.get("total_amount")),
-                )
-            )
+async def _query_monthly_service_rows(
+    start_month: date, end_month: date, service_type: str
+) -> list[MonthlyServiceRecord]:
+    end_date = last_day_of_month(end_month)
+    params: dict[str, Any] = {
+        **build_filter_params(start_month, end_date),
+        "series_start": start_month,
+        "series_end": end_month,
+        "service_type": service_type,
+    }
 
-    return result
+    return await fetchall(_monthly_services_query(), params, row_factory=_MONTHLY_SERVICE_ROW)
 
 
 __all__ = [
     "MetricsSummaryRecord",
     "MonthlyMetricRecord",
     "MonthlyServiceRecord",
+    "ServiceDailyUsageRecord",
     "ServiceUsageRecord",
     "ServicesListingResult",
+    "fetch_metrics_summaries",
     "fetch_metrics_summary",
+    "fetch_metrics_summary_comparison",
     "fetch_monthly_metric_rows",
     "fetch_monthly_service_rows",
     "fetch_services_listing",
+    "fetch_services_totals",
+    "invalidate_cached_months",
+    "precompile_queries",
+    "stream_monthly_metric_rows",
+    "stream_services_usage",
 ]
@@ -0,0 +1,110 @@
+"""Кеш закрытых месяцев для помесячных рядов.
+
+Помесячный ряд ``this_year``/``last_12_months`` почти целиком состоит из
+прошедших месяцев, данные которых уже не меняются. Кеш хранит готовые записи
+таких месяцев, а в базу уходит только хвост ряда, начиная с первого месяца,
+которого нет в кеше (обычно — текущий открытый месяц).
+
+Месяц считается закрытым, когда после его последнего дня прошло больше
+``grace_days`` дней: в это окно ещё попадают запоздалые правки, которые
+инкрементальный роллап пересчитывает по ``lookback_days``. Правки более старых
+данных (полный пересчёт роллапа, загрузка истории) подхватываются по истечении
+``ttl_seconds`` или сразу после :meth:`ClosedMonthCache.invalidate` (его
+вызывают обновление ``uslugi_daily_mv`` и полный пересчёт роллапа). Водяной
+знак данных кеш не учитывает: он меняется от любой вставки в открытый месяц и
+сбрасывал бы весь ряд.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import date, timedelta
+from typing import Callable, Generic, Hashable, Iterable, Optional, Protocol, Sequence, TypeVar
+
+from app.core.cache import LRUCache
+from app.core.dates import last_day_of_month
+
+
+class _MonthRecord(Protocol):
+    @property
+    def month(self) -> date: ...
+
+
+RecordT = TypeVar("RecordT", bound=_MonthRecord)
+MonthCacheKey = tuple[Hashable, date]
+
+
+class ClosedMonthCache(Generic[RecordT]):
+    """Записи закрытых месяцев по ключу ``(scope, month)``.
+
+    ``scope`` описывает всё, от чего зависит запись, кроме месяца: DSN, поле
+    даты, тип услуги и т. п.
+    """
+
+    __slots__ = ("_entries", "_ttl_seconds", "_grace", "_clock", "_today")
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        grace_days: int,
+        clock: Callable[[], float] = time.time,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        self._entries: LRUCache[MonthCacheKey, RecordT] = LRUCache(
+            name, max_entries=max_entries, clock=clock
+        )
+        self._ttl_seconds = ttl_seconds
+        self._grace = timedelta(days=max(grace_days, 0))
+        self._clock = clock
+        self._today = today
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_closed(self, month: date) -> bool:
+        return last_day_of_month(month) + self._grace < self._today()
+
+    def lookup(
+        self, scope: Hashable, months: Sequence[date]
+    ) -> tuple[dict[date, RecordT], Optional[date]]:
+        """Возвращает найденные записи и первый месяц, с которого нужен запрос.
+
+        Второй элемент равен ``None``, если весь ряд есть в кеше.
+        """
+        found: dict[date, RecordT] = {}
+        query_from: Optional[date] = None
+        for month in months:
+            record = self._entries.get((scope, month)) if self.is_closed(month) else None
+            if record is None:
+                query_from = month
+                break
+            found[month] = record
+        return found, query_from
+
+    def store(self, scope: Hashable, records: Iterable[RecordT]) -> None:
+        """Сохраняет записи закрытых месяцев; открытые месяцы пропускаются."""
+        expires_at = self._clock() + self._ttl_seconds if self._ttl_seconds > 0 else None
+        for record in records:
+            if self.is_closed(record.month):
+                self._entries.set((scope, record.month), record, expires_at=expires_at)
+
+    def invalidate(self, months: Optional[Iterable[date]] = None) -> int:
+        """Сбрасывает указанные месяцы во всех scope (или весь кеш); возвращает число записей."""
+        if months is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+
+        targets = {date(month.year, month.month, 1) for month in months}
+        dropped = 0
+        for key in self._entries.keys():
+            if key[1] in targets:
+                self._entries.pop(key)
+                dropped += 1
+        return dropped
+
+
+__all__ = ["ClosedMonthCache"]
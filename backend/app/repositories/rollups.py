@@ -0,0 +1,215 @@
+"""Поддержка дневных роллапов ``guests_daily_rollup``.
+
+Роллап хранит по одной строке на день для каждого поля даты (``created_at`` и
+``checkin_date``), поэтому сводные и помесячные запросы суммируют сотни строк
+вместо сканирования всей истории бронирований.
+
+Инкрементальное обновление пересчитывает дни, затронутые бронированиями,
+созданными после прошлого прогона, и скользящее окно последних
+``lookback_days`` дней (на случай правок недавних броней). Исправления более
+старых записей требуют полного пересчёта (``--full``); после него
+закешированные закрытые месяцы помесячных рядов сбрасываются.
+
+Запуск вручную или из cron::
+
+    python -m app.repositories.rollups [--full]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Mapping, Optional, Sequence
+
+import psycopg
+from psycopg import sql
+
+from app.core.dates import resolve_date_field
+from app.core.logging import bind_logger
+from app.db import close_all_pools, get_conn
+from app.db.query_loader import load_query
+from app.repositories.metrics import invalidate_cached_months
+from app.schemas.enums import DateField
+
+ROLLUP_DATE_FIELDS: tuple[DateField, ...] = (DateField.created, DateField.checkin)
+
+
+@dataclass(frozen=True, slots=True)
+class RollupRefreshResult:
+    date_field: str
+    full: bool
+    days_refreshed: int
+    high_watermark: Optional[datetime]
+
+
+async def ensure_rollup_schema(*, dsn: Optional[str] = None) -> None:
+    """Создаёт таблицы роллапа, если их ещё нет."""
+
+    async with get_conn(dsn) as conn:
+        async with conn.transaction():
+            await conn.execute(load_query("guests_daily_rollup_schema.sql"))
+
+
+async def refresh_daily_rollups(
+    *,
+    dsn: Optional[str] = None,
+    full: bool = False,
+    lookback_days: int = 3,
+) -> Sequence[RollupRefreshResult]:
+    """Обновляет роллап для всех поддерживаемых полей даты."""
+
+    results: list[RollupRefreshResult] = []
+    async with get_conn(dsn) as conn:
+        for date_field in ROLLUP_DATE_FIELDS:
+            results.append(
+                await _refresh_date_field(
+                    conn, date_field, full=full, lookback_days=lookback_days
+                )
+            )
+    if full:
+        # Инкрементальный прогон трогает только дни в окне grace_days кеша месяцев.
+        invalidate_cached_months()
+    return results
+
+
+async def _refresh_date_field(
+    conn: psycopg.AsyncConnection,
+    date_field: DateField,
+    *,
+    full: bool,
+    lookback_days: int,
+) -> RollupRefreshResult:
+    column = resolve_date_field(date_field).column
+    date_column = sql.Identifier(column)
+
+    async with conn.transaction():
+        # Сериализуем параллельные обновления одного и того же поля.
+        await conn.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%(key)s))",
+            {"key": f"guests_daily_rollup:{column}"},
+        )
+        since = await _fetch_value(
+            conn,
+            "SELECT high_watermark FROM guests_daily_rollup_state WHERE date_field = %(date_field)s",
+            {"date_field": column},
+        )
+        high_watermark = await _fetch_value(conn, "SELECT MAX(created_at) FROM guests", {})
+        full = full or since is None
+
+        params: dict[str, Any] = {"date_field": column}
+        if full:
+            day_filter: sql.Composable = sql.SQL("")
+            days_refreshed = -1
+        else:
+            cursor = await conn.execute(
+                load_query("guests_daily_rollup_affected_days.sql").format(
+                    date_column=date_column
+                ),
+                {"since": since, "lookback_days": lookback_days},
+            )
+            days = [_row_value(row) for row in await cursor.fetchall()]
+            day_filter, day_params = _build_day_filter(days)
+            params.update(day_params)
+            days_refreshed = len(days)
+
+        await conn.execute(
+            load_query("guests_daily_rollup_delete.sql").format(
+                day_filter=day_filter.format(column=sql.Identifier("r", "day"))
+            ),
+            params,
+        )
+        await conn.execute(
+            load_query("guests_daily_rollup_insert.sql").format(
+                date_column=date_column,
+                day_filter=day_filter.format(
+                    column=sql.SQL("{}::date").format(sql.Identifier("g", column))
+                ),
+            ),
+            params,
+        )
+        await conn.execute(
+            load_query("guests_daily_rollup_state.sql"),
+            {"date_field": column, "high_watermark": high_watermark},
+        )
+
+    return RollupRefreshResult(
+        date_field=column,
+        full=full,
+        days_refreshed=days_refreshed,
+        high_watermark=high_watermark,
+    )
+
+
+def _build_day_filter(days: Sequence[Optional[date]]) -> tuple[sql.SQL, dict[str, Any]]:
+    """Строит фильтр по списку дней; ``{column}`` подставляется вызывающим кодом."""
+
+    concrete_days = [day for day in days if day is not None]
+    clauses = ["{column} = ANY(%(days)s::date[])"]
+    if len(concrete_days) != len(days):
+        clauses.append("{column} IS NULL")
+    return sql.SQL("AND (" + " OR ".join(clauses) + ")"), {"days": concrete_days}
+
+
+def _row_value(row: Mapping[str, Any] | Sequence[Any] | None) -> Any:
+    if row is None:
+        return None
+    if isinstance(row, Mapping):
+        return next(iter(row.values()), None)
+    return row[0] if row else None
+
+
+async def _fetch_value(
+    conn: psycopg.AsyncConnection, query: str, params: Mapping[str, Any]
+) -> Any:
+    cursor = await conn.execute(query, params)
+    return _row_value(await cursor.fetchone())
+
+
+async def _main(argv: Optional[Sequence[str]] = None) -> None:
+    from app.settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Обновление дневных роллапов guests_daily_rollup")
+    parser.add_argument("--full", action="store_true", help="пересчитать роллап целиком")
+    parser.add_argument(
+        "--lookback-days",
+        type=int,
+        default=None,
+        help="сколько последних дней пересчитывать всегда (по умолчанию из настроек)",
+    )
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    lookback_days = (
+        args.lookback_days if args.lookback_days is not None else settings.rollup_lookback_days
+    )
+    log = bind_logger(component="rollups")
+    try:
+        await ensure_rollup_schema(dsn=settings.database_url)
+        results = await refresh_daily_rollups(
+            dsn=settings.database_url, full=args.full, lookback_days=lookback_days
+        )
+    finally:
+        await close_all_pools()
+
+    for result in results:
+        log.info(
+            "Роллап обновлён",
+            date_field=result.date_field,
+            full=result.full,
+            days=result.days_refreshed,
+            high_watermark=str(result.high_watermark),
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    asyncio.run(_main())
+
+
+__all__ = [
+    "ROLLUP_DATE_FIELDS",
+    "RollupRefreshResult",
+    "ensure_rollup_schema",
+    "refresh_daily_rollups",
+]
@@ -0,0 +1,70 @@
+"""Дешёвый «водяной знак» данных для инвалидации кешей отчётов."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, cast
+
+from app.core.singleflight import coalesce
+from app.db import current_dsn, fetchone
+from app.db.query_loader import compile_query
+
+
+@dataclass(frozen=True, slots=True)
+class DataWatermark:
+    """Снимок признаков изменения исходных таблиц.
+
+    ``guests_changes`` и ``services_changes`` — накопительные счётчики
+    вставок/обновлений/удалений из ``pg_stat_user_tables``; ``services_filenode``
+    меняется при каждом неконкурентном ``REFRESH MATERIALIZED VIEW``, а
+    ``CONCURRENTLY`` изменённые строки попадают в ``services_changes``;
+    ``rollup_changes`` отражает обновления ``guests_daily_rollup``.
+
+    ``wal_lsn`` — позиция WAL primary в момент чтения. В токен она не входит
+    (растёт от любой записи); по ней реплики догоняют изменение, которое
+    сменило токен (см. :func:`app.services.watermark.current_data_watermark`).
+    """
+
+    guests_max_created_at: Optional[str]
+    guests_changes: int
+    services_filenode: int
+    services_changes: int
+    rollup_changes: int = 0
+    wal_lsn: int = 0
+
+    @property
+    def token(self) -> str:
+        return ":".join(
+            (
+                self.guests_max_created_at or "-",
+                str(self.guests_changes),
+                str(self.services_filenode),
+                str(self.services_changes),
+                str(self.rollup_changes),
+            )
+        )
+
+
+_WATERMARK_QUERY = compile_query("data_watermark.sql")
+
+
+def _as_counter(value: Any) -> int:
+    return int(value) if value is not None else 0
+
+
+@coalesce("data_watermark", scope=current_dsn)
+async def fetch_data_watermark() -> DataWatermark:
+    # Счётчики pg_stat_user_tables у реплики свои, поэтому водяной знак читается с primary.
+    row = cast(Mapping[str, Any], await fetchone(_WATERMARK_QUERY, replica=False) or {})
+    max_created_at = row.get("guests_max_created_at")
+    return DataWatermark(
+        guests_max_created_at=str(max_created_at) if max_created_at is not None else None,
+        guests_changes=_as_counter(row.get("guests_changes")),
+        services_filenode=_as_counter(row.get("services_filenode")),
+        services_changes=_as_counter(row.get("services_changes")),
+        rollup_changes=_as_counter(row.get("rollup_changes")),
+        wal_lsn=_as_counter(row.get("wal_lsn")),
+    )
+
+
+__all__ = ["DataWatermark", "fetch_data_watermark"]
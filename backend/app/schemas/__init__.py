@@ -1,9 +1,24 @@
 """Pydantic schemas and enumerations used by the API."""
 
-from app.schemas.enums import DateField, MonthlyMetric, MonthlyRange
+from app.schemas.enums import (
+    DateField,
+    ExportFormat,
+    MetricsCompare,
+    MonthlyMetric,
+    MonthlyRange,
+    ServicesExportGranularity,
+)
+from app.schemas.requests import DateRange, MetricsBatchRequest
 from app.schemas.responses import (
+    DashboardResponse,
+    MetricDelta,
+    MetricsBatchResponse,
+    MetricsComparison,
     MetricsResponse,
+    MetricsValues,
     MonthlyMetricPoint,
+    MonthlyMetricSeries,
+    MonthlyMetricsBatchResponse,
     MonthlyMetricsResponse,
     MonthlyServicePoint,
     MonthlyServiceResponse,
@@ -13,15 +28,27 @@ from app.schemas.responses import (
 )
 
 __all__ = [
+    "DashboardResponse",
     "DateField",
+    "DateRange",
+    "ExportFormat",
+    "MetricDelta",
+    "MetricsBatchRequest",
+    "MetricsBatchResponse",
+    "MetricsCompare",
+    "MetricsComparison",
     "MetricsResponse",
+    "MetricsValues",
     "MonthlyMetric",
     "MonthlyMetricPoint",
+    "MonthlyMetricSeries",
+    "MonthlyMetricsBatchResponse",
     "MonthlyMetricsResponse",
     "MonthlyRange",
     "MonthlyServicePoint",
     "MonthlyServiceResponse",
     "PaginationInfo",
     "ServiceItem",
+    "ServicesExportGranularity",
     "ServicesResponse",
 ]
@@ -25,8 +25,26 @@ class MonthlyMetric(str, Enum):
     services_share = "services_share"
 
 
+class MetricsCompare(str, Enum):
+    yoy = "yoy"
+    previous_period = "previous_period"
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class ServicesExportGranularity(str, Enum):
+    total = "total"
+    daily = "daily"
+
+
 __all__ = [
     "DateField",
+    "ExportFormat",
+    "MetricsCompare",
     "MonthlyRange",
     "MonthlyMetric",
+    "ServicesExportGranularity",
 ]
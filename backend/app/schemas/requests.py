@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from app.schemas.enums import DateField
+
+# Год по дням — самый частый крупный отчёт.
+MAX_BATCH_RANGES = 366
+
+
+class DateRange(BaseModel):
+    date_from: date
+    date_to: date
+
+
+class MetricsBatchRequest(BaseModel):
+    ranges: list[DateRange] = Field(min_length=1, max_length=MAX_BATCH_RANGES)
+    date_field: DateField = DateField.created
+
+
+__all__ = ["DateRange", "MAX_BATCH_RANGES", "MetricsBatchRequest"]
@@ -5,7 +5,32 @@ from typing import Optional
 
 from pydantic import BaseModel
 
-from app.schemas.enums import MonthlyMetric, MonthlyRange
+from app.schemas.enums import MetricsCompare, MonthlyMetric, MonthlyRange
+
+
+class MetricsValues(BaseModel):
+    revenue: float
+    avg_check: float
+    bookings_count: int
+    level2plus_share: float
+    min_booking: float
+    max_booking: float
+    avg_stay_days: float
+    bonus_payment_share: float
+    services_share: float
+
+
+class MetricDelta(BaseModel):
+    absolute: float
+    relative: Optional[float] = None
+
+
+class MetricsComparison(BaseModel):
+    mode: MetricsCompare
+    date_from: date
+    date_to: date
+    values: MetricsValues
+    deltas: dict[MonthlyMetric, MetricDelta]
 
 
 class MetricsResponse(BaseModel):
@@ -22,6 +47,11 @@ class MetricsResponse(BaseModel):
     avg_stay_days: float
     bonus_payment_share: float
     services_share: float
+    comparison: Optional[MetricsComparison] = None
+
+
+class MetricsBatchResponse(BaseModel):
+    items: list[MetricsResponse]
 
 
 class ServiceItem(BaseModel):
@@ -34,6 +64,7 @@ class PaginationInfo(BaseModel):
     page: int
     page_size: int
     total_items: int
+    next_cursor: Optional[str] = None
 
 
 class ServicesResponse(BaseModel):
@@ -46,6 +77,11 @@ class ServicesResponse(BaseModel):
     pagination: PaginationInfo
 
 
+class DashboardResponse(BaseModel):
+    metrics: MetricsResponse
+    services: ServicesResponse
+
+
 class MonthlyMetricPoint(BaseModel):
     month: date
     value: float
@@ -59,6 +95,18 @@ class MonthlyMetricsResponse(BaseModel):
     aggregate: Optional[float] = None
 
 
+class MonthlyMetricSeries(BaseModel):
+    metric: MonthlyMetric
+    points: list[MonthlyMetricPoint]
+    aggregate: Optional[float] = None
+
+
+class MonthlyMetricsBatchResponse(BaseModel):
+    range: MonthlyRange
+    date_field: str
+    series: list[MonthlyMetricSeries]
+
+
 class MonthlyServicePoint(BaseModel):
     month: date
     value: float
@@ -72,8 +120,15 @@ class MonthlyServiceResponse(BaseModel):
 
 
 __all__ = [
+    "DashboardResponse",
+    "MetricDelta",
+    "MetricsBatchResponse",
+    "MetricsComparison",
     "MetricsResponse",
+    "MetricsValues",
     "MonthlyMetricPoint",
+    "MonthlyMetricSeries",
+    "MonthlyMetricsBatchResponse",
     "MonthlyMetricsResponse",
     "MonthlyServicePoint",
     "MonthlyServiceResponse",
@@ -1,15 +1,25 @@
 """Domain services that encapsulate data access and business rules."""
 
 from app.services.metrics import (
+    get_dashboard,
     get_metrics,
     get_monthly_metrics,
+    get_monthly_metrics_batch,
+    get_monthly_metrics_batch_payload,
+    get_monthly_metrics_payload,
     get_monthly_services,
+    get_monthly_services_payload,
     get_services,
 )
 
 __all__ = [
+    "get_dashboard",
     "get_metrics",
     "get_monthly_metrics",
+    "get_monthly_metrics_batch",
+    "get_monthly_metrics_batch_payload",
+    "get_monthly_metrics_payload",
     "get_monthly_services",
+    "get_monthly_services_payload",
     "get_services",
 ]
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 
+from app.core.cache import LRUCache
 from app.core.security import TokenError, TokenPayload, verify_access_token
 
 
@@ -11,10 +13,17 @@ class AdminAuthError(Exception):
 
 @dataclass(slots=True)
 class AdminTokenService:
-    """Централизованный сервис для проверки и выпуска административных токенов."""
+    """Централизованный сервис для проверки и выпуска административных токенов.
+
+    Если передан ``cache``, успешно проверенные токены запоминаются до их
+    ``exp``: повторная проверка того же токена сводится к поиску в словаре.
+    Недействительные токены не кешируются, чтобы поток мусорных заголовков не
+    вытеснял настоящие сессии.
+    """
 
     secret: str
     ttl_seconds: int
+    cache: Optional[LRUCache[str, TokenPayload]] = None
 
     def verify_bearer(self, authorization_header: str) -> TokenPayload:
         scheme, _, token = authorization_header.partition(" ")
@@ -22,10 +31,20 @@ class AdminTokenService:
         if scheme.lower() != "bearer" or not token_value:
             raise AdminAuthError("Invalid authorization scheme")
 
+        cache = self.cache
+        if cache is not None:
+            cached = cache.get(token_value)
+            if cached is not None:
+                return cached
+
         try:
-            return verify_access_token(token=token_value, secret=self.secret)
+            payload = verify_access_token(token=token_value, secret=self.secret)
         except TokenError as exc:
             raise AdminAuthError(str(exc)) from exc
 
+        if cache is not None:
+            cache.set(token_value, payload, expires_at=payload.expires_at or None)
+        return payload
+
 
 __all__ = ["AdminAuthError", "AdminTokenService"]
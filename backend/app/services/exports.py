@@ -0,0 +1,137 @@
+"""Потоковые выгрузки отчётов в CSV и NDJSON."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+
+from app.core.dates import normalize_date_range, resolve_date_field
+from app.repositories.metrics import (
+    ServiceDailyUsageRecord,
+    stream_monthly_metric_rows,
+    stream_services_usage,
+)
+from app.schemas.enums import (
+    DateField,
+    ExportFormat,
+    MonthlyMetric,
+    MonthlyRange,
+    ServicesExportGranularity,
+)
+from app.services.metrics import resolve_monthly_value
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+# Сколько байт копить перед отправкой очередного фрагмента ответа.
+_CHUNK_SIZE = 64 * 1024
+
+
+def export_filename(prefix: str, fmt: ExportFormat, *parts: object) -> str:
+    suffix = "_".join(str(part) for part in parts if part is not None)
+    name = f"{prefix}_{suffix}" if suffix else prefix
+    return f"{name}.{fmt.value}"
+
+
+async def export_services(
+    *,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    granularity: ServicesExportGranularity,
+    fmt: ExportFormat,
+    dsn: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    date_from, date_to = normalize_date_range(date_from, date_to)
+    columns = ["service_type", "total_amount"]
+    if granularity is ServicesExportGranularity.daily:
+        columns.insert(0, "consumption_date")
+
+    async def rows() -> AsyncIterator[Sequence[Any]]:
+        async for record in stream_services_usage(
+            date_from=date_from, date_to=date_to, granularity=granularity, dsn=dsn
+        ):
+            if isinstance(record, ServiceDailyUsageRecord):
+                yield (record.consumption_date, record.service_type, record.total_amount)
+            else:
+                yield (record.service_type, record.total_amount)
+
+    async for chunk in _encode(columns, rows(), fmt):
+        yield chunk
+
+
+async def export_monthly_metrics(
+    *,
+    range_: MonthlyRange,
+    date_field: DateField,
+    fmt: ExportFormat,
+    dsn: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    metrics = list(MonthlyMetric)
+    columns = ["month", "date_field", *(metric.value for metric in metrics)]
+    date_column = resolve_date_field(date_field).column
+
+    async def rows() -> AsyncIterator[Sequence[Any]]:
+        async for record in stream_monthly_metric_rows(
+            range_=range_, date_field=date_field, dsn=dsn
+        ):
+            yield (
+                record.month,
+                date_column,
+                *(resolve_monthly_value(metric, record) for metric in metrics),
+            )
+
+    async for chunk in _encode(columns, rows(), fmt):
+        yield chunk
+
+
+async def _encode(
+    columns: Sequence[str],
+    rows: AsyncIterator[Sequence[Any]],
+    fmt: ExportFormat,
+) -> AsyncIterator[bytes]:
+    if fmt is ExportFormat.csv:
+        # Заголовок отправляем сразу, не дожидаясь первой строки из базы.
+        yield _csv_line(columns)
+
+    buffer: list[bytes] = []
+    buffered = 0
+    async for values in rows:
+        line = _csv_line(values) if fmt is ExportFormat.csv else _ndjson_line(columns, values)
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= _CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer.clear()
+            buffered = 0
+
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _csv_line(values: Iterable[Any]) -> bytes:
+    output = io.StringIO()
+    csv.writer(output, lineterminator="\n").writerow(
+        value.isoformat() if isinstance(value, date) else value for value in values
+    )
+    return output.getvalue().encode("utf-8")
+
+
+def _ndjson_line(columns: Sequence[str], values: Sequence[Any]) -> bytes:
+    payload = {
+        column: value.isoformat() if isinstance(value, date) else value
+        for column, value in zip(columns, values)
+    }
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+__all__ = [
+    "EXPORT_MEDIA_TYPES",
+    "export_filename",
+    "export_monthly_metrics",
+    "export_services",
+]
@@ -1,29 +1,72 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional, Sequence
+from functools import lru_cache
+from typing import Any, Optional, Sequence
 
-from app.core.dates import CONSUMPTION_DATE_RESOLUTION, resolve_date_field
+import orjson
+
+from app.core.cache import LRUCache
+from app.core.dates import (
+    CONSUMPTION_DATE_RESOLUTION,
+    comparison_range,
+    normalize_date_range,
+    resolve_date_field,
+)
 from app.repositories.metrics import (
     MonthlyMetricRecord,
     ServicesListingResult,
+    ServiceUsageRecord,
+    MetricsSummaryRecord,
+    fetch_metrics_summaries,
     fetch_metrics_summary,
+    fetch_metrics_summary_comparison,
     fetch_monthly_metric_rows,
     fetch_monthly_service_rows,
     fetch_services_listing,
+    fetch_services_totals,
 )
-from app.schemas.enums import DateField, MonthlyMetric, MonthlyRange
+from app.schemas.enums import DateField, MetricsCompare, MonthlyMetric, MonthlyRange
 from app.schemas.responses import (
+    DashboardResponse,
+    MetricDelta,
+    MetricsBatchResponse,
+    MetricsComparison,
     MetricsResponse,
-    MonthlyMetricPoint,
+    MetricsValues,
+    MonthlyMetricsBatchResponse,
     MonthlyMetricsResponse,
-    MonthlyServicePoint,
     MonthlyServiceResponse,
     PaginationInfo,
     ServiceItem,
     ServicesResponse,
 )
+from app.services.watermark import current_data_watermark
+from app.settings import get_settings
+
+MetricsCacheKey = tuple[Optional[date], Optional[date], DateField, Optional[MetricsCompare]]
+ServicesCacheKey = tuple[Optional[date], Optional[date]]
+JsonObject = dict[str, Any]
+
+
+@lru_cache
+def _get_metrics_cache() -> Optional[LRUCache[MetricsCacheKey, MetricsResponse]]:
+    max_entries = get_settings().metrics_cache_max_entries
+    if max_entries <= 0:
+        return None
+    return LRUCache("metrics_summary", max_entries=max_entries)
+
+
+@lru_cache
+def _get_services_cache() -> Optional[LRUCache[ServicesCacheKey, ServicesListingResult]]:
+    max_entries = get_settings().services_cache_max_entries
+    if max_entries <= 0:
+        return None
+    return LRUCache("services_totals", max_entries=max_entries)
 
 
 async def get_metrics(
@@ -31,50 +74,198 @@ async def get_metrics(
     date_from: Optional[date],
     date_to: Optional[date],
     date_field: DateField,
+    compare: Optional[MetricsCompare] = None,
 ) -> MetricsResponse:
-    date_from, date_to = _normalize_date_range(date_from, date_to)
-    summary = await fetch_metrics_summary(
-        date_from=date_from,
-        date_to=date_to,
-        date_field=date_field,
+    """Сводка за период; с ``compare`` — ещё и период сравнения с разницей метрик.
+
+    Оба периода считаются одним запросом. Для сравнения нужны обе границы
+    периода, иначе :class:`ValueError`.
+    """
+    date_from, date_to = normalize_date_range(date_from, date_to)
+    if compare is not None and (date_from is None or date_to is None):
+        raise ValueError("Для сравнения периодов нужны обе границы: date_from и date_to")
+    cache = _get_metrics_cache()
+    if cache is None:
+        return await _compute_metrics(
+            date_from=date_from, date_to=date_to, date_field=date_field, compare=compare
+        )
+
+    watermark = await current_data_watermark()
+    cache.sync_generation(watermark.token)
+    key: MetricsCacheKey = (date_from, date_to, date_field, compare)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    response = await _compute_metrics(
+        date_from=date_from, date_to=date_to, date_field=date_field, compare=compare
     )
+    # Пока считался ответ, другой запрос мог увидеть новый водяной знак и сбросить
+    # кеш — тогда результат относится к старому поколению и не сохраняется.
+    if cache.generation == watermark.token:
+        cache.set(key, response)
+    return response
 
-    resolution = resolve_date_field(date_field)
-    share = _calculate_share(summary.lvl2p, summary.bookings_count)
-    revenue_total = summary.revenue
 
+async def _compute_metrics(
+    *,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    date_field: DateField,
+    compare: Optional[MetricsCompare] = None,
+) -> MetricsResponse:
+    comparison: Optional[MetricsComparison] = None
+    if compare is None or date_from is None or date_to is None:
+        summary = await fetch_metrics_summary(
+            date_from=date_from,
+            date_to=date_to,
+            date_field=date_field,
+        )
+        values = _summary_values(summary)
+    else:
+        compare_from, compare_to = comparison_range(date_from, date_to, compare)
+        summary, previous = await fetch_metrics_summary_comparison(
+            date_from=date_from,
+            date_to=date_to,
+            compare_from=compare_from,
+            compare_to=compare_to,
+            date_field=date_field,
+        )
+        values = _summary_values(summary)
+        previous_values = _summary_values(previous)
+        comparison = MetricsComparison(
+            mode=compare,
+            date_from=compare_from,
+            date_to=compare_to,
+            values=MetricsValues(**previous_values),
+            deltas={
+                MonthlyMetric(name): _metric_delta(value, previous_values[name])
+                for name, value in values.items()
+            },
+        )
+
+    resolution = resolve_date_field(date_field)
     return MetricsResponse(
         used_field=resolution.column,
         used_reason=resolution.reason,
         date_from=date_from,
         date_to=date_to,
-        revenue=revenue_total,
-        avg_check=summary.avg_check,
-        bookings_count=summary.bookings_count,
-        level2plus_share=share,
-        min_booking=summary.min_booking,
-        max_booking=summary.max_booking,
-        avg_stay_days=summary.avg_stay_days,
-        bonus_payment_share=_calculate_share(summary.bonus_spent_sum, revenue_total),
-        services_share=_calculate_share(summary.services_amount, revenue_total),
+        comparison=comparison,
+        **values,
     )
 
 
+async def get_metrics_batch(
+    *,
+    ranges: Sequence[tuple[date, date]],
+    date_field: DateField,
+) -> MetricsBatchResponse:
+    """Сводки по списку периодов в порядке запроса.
+
+    Периоды, которые уже лежат в кеше ``/api/metrics``, берутся из него,
+    остальные считаются одним запросом к базе и тоже попадают в кеш.
+    """
+    normalized = [(min(bounds), max(bounds)) for bounds in ranges]
+    cache = _get_metrics_cache()
+    watermark = await current_data_watermark() if cache is not None else None
+    responses: dict[tuple[date, date], MetricsResponse] = {}
+    if cache is not None and watermark is not None:
+        cache.sync_generation(watermark.token)
+        for date_from, date_to in normalized:
+            cached = cache.get((date_from, date_to, date_field, None))
+            if cached is not None:
+                responses[(date_from, date_to)] = cached
+
+    missing = tuple(dict.fromkeys(bounds for bounds in normalized if bounds not in responses))
+    if missing:
+        resolution = resolve_date_field(date_field)
+        summaries = await fetch_metrics_summaries(ranges=missing, date_field=date_field)
+        for (date_from, date_to), summary in zip(missing, summaries):
+            response = MetricsResponse(
+                used_field=resolution.column,
+                used_reason=resolution.reason,
+                date_from=date_from,
+                date_to=date_to,
+                **_summary_values(summary),
+            )
+            responses[(date_from, date_to)] = response
+            if cache is not None and watermark is not None and cache.generation == watermark.token:
+                cache.set((date_from, date_to, date_field, None), response)
+
+    return MetricsBatchResponse(items=[responses[bounds] for bounds in normalized])
+
+
+def _summary_values(summary: MetricsSummaryRecord) -> dict[str, Any]:
+    """Метрики сводки; ключи совпадают со значениями :class:`MonthlyMetric`."""
+    revenue_total = summary.revenue
+    return {
+        "revenue": revenue_total,
+        "avg_check": summary.avg_check,
+        "bookings_count": summary.bookings_count,
+        "level2plus_share": _calculate_share(summary.lvl2p, summary.bookings_count),
+        "min_booking": summary.min_booking,
+        "max_booking": summary.max_booking,
+        "avg_stay_days": summary.avg_stay_days,
+        "bonus_payment_share": _calculate_share(summary.bonus_spent_sum, revenue_total),
+        "services_share": _calculate_share(summary.services_amount, revenue_total),
+    }
+
+
+def _metric_delta(current: float, previous: float) -> MetricDelta:
+    """Разница с периодом сравнения; относительная — ``None`` при нулевой базе."""
+    absolute = current - previous
+    return MetricDelta(absolute=absolute, relative=absolute / previous if previous else None)
+
+
 async def get_services(
     *,
     date_from: Optional[date],
     date_to: Optional[date],
     page: int,
     page_size: int,
+    cursor: Optional[str] = None,
 ) -> ServicesResponse:
-    date_from, date_to = _normalize_date_range(date_from, date_to)
-    listing = await fetch_services_listing(
-        date_from=date_from,
-        date_to=date_to,
-        page=page,
-        page_size=page_size,
-    )
+    """Страница выручки по услугам, по номеру ``page`` или после ``cursor``.
+
+    Услуги упорядочены по ``(total_amount DESC, service_type)``, названия
+    сравниваются по кодовым точкам (``COLLATE "C"`` в SQL), поэтому номерные
+    и курсорные страницы совпадают. Курсор — ключ последнего элемента
+    предыдущей страницы. Агрегат за период вместе с ``total_items`` и
+    ``overall_amount`` кешируется до смены водяного знака, и страницы
+    нарезаются из памяти. Без кеша страница запрашивается у базы: по номеру
+    через ``OFFSET``, по курсору — сравнением с ключом в SQL.
+
+    Некорректный ``cursor`` приводит к :class:`ValueError`.
+    """
+    date_from, date_to = normalize_date_range(date_from, date_to)
+    after = _decode_services_cursor(cursor) if cursor else None
+    cache = _get_services_cache()
+
+    if cache is None:
+        listing = await fetch_services_listing(
+            date_from=date_from,
+            date_to=date_to,
+            page_size=page_size,
+            page=page,
+            after=(-after[0], after[1]) if after is not None else None,
+        )
+        start = listing.offset
+    else:
+        totals = await _get_services_totals(date_from=date_from, date_to=date_to, cache=cache)
+        if after is not None:
+            start = bisect_right(totals.items, after, key=_services_sort_key)
+        else:
+            start = (page - 1) * page_size
+        listing = ServicesListingResult(
+            items=totals.items[start : start + page_size],
+            total_items=totals.total_items,
+            total_amount=totals.total_amount,
+            offset=start,
+        )
+    if after is not None:
+        page = start // page_size + 1
 
+    has_more = start + len(listing.items) < listing.total_items
     items = _convert_services(listing)
     return ServicesResponse(
         used_field=CONSUMPTION_DATE_RESOLUTION.column,
@@ -87,50 +278,149 @@ async def get_services(
             page=page,
             page_size=page_size,
             total_items=listing.total_items,
+            next_cursor=(
+                _encode_services_cursor(listing.items[-1])
+                if has_more and listing.items
+                else None
+            ),
         ),
     )
 
 
+async def _get_services_totals(
+    *,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    cache: LRUCache[ServicesCacheKey, ServicesListingResult],
+) -> ServicesListingResult:
+    watermark = await current_data_watermark()
+    cache.sync_generation(watermark.token)
+    key: ServicesCacheKey = (date_from, date_to)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    totals = _sorted_services(await fetch_services_totals(date_from=date_from, date_to=date_to))
+    if cache.generation == watermark.token:
+        cache.set(key, totals)
+    return totals
+
+
+async def get_dashboard(
+    *,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    date_field: DateField,
+    page_size: int,
+) -> DashboardResponse:
+    """Сводка и первая страница услуг для первичной отрисовки дашборда.
+
+    Оба запроса выполняются параллельно на разных подключениях пула, поэтому
+    время ответа определяется более медленным из них.
+    """
+    metrics, services = await asyncio.gather(
+        get_metrics(date_from=date_from, date_to=date_to, date_field=date_field),
+        get_services(date_from=date_from, date_to=date_to, page=1, page_size=page_size),
+    )
+    return DashboardResponse(metrics=metrics, services=services)
+
+
 async def get_monthly_metrics(
     *,
     metric: MonthlyMetric,
     range_: MonthlyRange,
     date_field: DateField,
 ) -> MonthlyMetricsResponse:
+    return MonthlyMetricsResponse.model_validate(
+        await get_monthly_metrics_payload(metric=metric, range_=range_, date_field=date_field)
+    )
+
+
+async def get_monthly_metrics_payload(
+    *,
+    metric: MonthlyMetric,
+    range_: MonthlyRange,
+    date_field: DateField,
+) -> JsonObject:
+    """Помесячный ряд в виде словаря со структурой :class:`MonthlyMetricsResponse`.
+
+    Словарь собирается прямо из записей репозитория и сериализуется без
+    промежуточной Pydantic-модели (см. :mod:`app.api.responses`).
+    """
     rows = await fetch_monthly_metric_rows(
         range_=range_,
         date_field=date_field,
     )
 
     resolution = resolve_date_field(date_field)
-    aggregation = MonthlyAggregation()
-    points: list[MonthlyMetricPoint] = []
+    aggregation = _aggregate_monthly(rows)
+    series = _monthly_series_payload(metric, rows, aggregation)
 
-    for record in rows:
-        aggregation.update(record)
-        points.append(
-            MonthlyMetricPoint(
-                month=record.month,
-                value=_resolve_monthly_value(metric, record),
-            )
+    return {
+        "metric": metric.value,
+        "range": range_.value,
+        "date_field": resolution.column,
+        "points": series["points"],
+        "aggregate": series["aggregate"],
+    }
+
+
+async def get_monthly_metrics_batch(
+    *,
+    metrics: Sequence[MonthlyMetric],
+    range_: MonthlyRange,
+    date_field: DateField,
+) -> MonthlyMetricsBatchResponse:
+    return MonthlyMetricsBatchResponse.model_validate(
+        await get_monthly_metrics_batch_payload(
+            metrics=metrics, range_=range_, date_field=date_field
         )
+    )
+
 
-    aggregate_value = aggregation.finalize(metric, has_points=bool(points))
+async def get_monthly_metrics_batch_payload(
+    *,
+    metrics: Sequence[MonthlyMetric],
+    range_: MonthlyRange,
+    date_field: DateField,
+) -> JsonObject:
+    """Возвращает несколько помесячных рядов по одному запросу к базе.
 
-    return MonthlyMetricsResponse(
-        metric=metric,
-        range=range_,
-        date_field=resolution.column,
-        points=points,
-        aggregate=aggregate_value,
+    Пустой список ``metrics`` означает все значения :class:`MonthlyMetric`.
+    Структура совпадает с :class:`MonthlyMetricsBatchResponse`.
+    """
+    requested = list(dict.fromkeys(metrics)) or list(MonthlyMetric)
+    rows = await fetch_monthly_metric_rows(
+        range_=range_,
+        date_field=date_field,
     )
 
+    resolution = resolve_date_field(date_field)
+    aggregation = _aggregate_monthly(rows)
+
+    return {
+        "range": range_.value,
+        "date_field": resolution.column,
+        "series": [_monthly_series_payload(metric, rows, aggregation) for metric in requested],
+    }
+
 
 async def get_monthly_services(
     *,
     service_type: str,
     range_: MonthlyRange,
 ) -> MonthlyServiceResponse:
+    return MonthlyServiceResponse.model_validate(
+        await get_monthly_services_payload(service_type=service_type, range_=range_)
+    )
+
+
+async def get_monthly_services_payload(
+    *,
+    service_type: str,
+    range_: MonthlyRange,
+) -> JsonObject:
+    """Помесячная выручка услуги; структура совпадает с :class:`MonthlyServiceResponse`."""
     normalized_service = service_type.strip()
     if not normalized_service:
         raise ValueError("service_type must be provided")
@@ -140,31 +430,53 @@ async def get_monthly_services(
         range_=range_,
     )
 
-    points = [
-        MonthlyServicePoint(month=record.month, value=record.total_amount)
-        for record in rows
-    ]
+    return {
+        "service_type": normalized_service,
+        "range": range_.value,
+        "points": [{"month": record.month, "value": record.total_amount} for record in rows],
+        "aggregate": sum(record.total_amount for record in rows),
+    }
 
-    return MonthlyServiceResponse(
-        service_type=normalized_service,
-        range=range_,
-        points=points,
-        aggregate=sum(record.total_amount for record in rows),
+
+def _calculate_share(numerator: float, denominator: float) -> float:
+    """Calculate share as numerator/denominator, returning 0.0 if denominator is zero."""
+    return float(numerator / denominator) if denominator else 0.0
+
+
+ServicesSortKey = tuple[float, str]
+
+
+def _services_sort_key(item: ServiceUsageRecord) -> ServicesSortKey:
+    """Порядок ``services_listing.sql``: сумма по убыванию, затем ``COLLATE "C"``.
+
+    Сравнение строк Python по кодовым точкам совпадает с побайтовым ``"C"`` для UTF-8.
+    """
+    return -item.total_amount, item.service_type
+
+
+def _sorted_services(listing: ServicesListingResult) -> ServicesListingResult:
+    return ServicesListingResult(
+        items=tuple(sorted(listing.items, key=_services_sort_key)),
+        total_items=listing.total_items,
+        total_amount=listing.total_amount,
     )
 
 
-def _normalize_date_range(
-    date_from: Optional[date], date_to: Optional[date]
-) -> tuple[Optional[date], Optional[date]]:
-    """Normalize date range by swapping dates if from > to."""
-    if date_from and date_to and date_from > date_to:
-        return date_to, date_from
-    return date_from, date_to
+def _encode_services_cursor(item: ServiceUsageRecord) -> str:
+    raw = orjson.dumps([item.total_amount, item.service_type])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
 
 
-def _calculate_share(numerator: float, denominator: float) -> float:
-    """Calculate share as numerator/denominator, returning 0.0 if denominator is zero."""
-    return float(numerator / denominator) if denominator else 0.0
+def _decode_services_cursor(cursor: str) -> ServicesSortKey:
+    """Ключ сортировки из курсора; ``ValueError``, если курсор повреждён."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        total_amount, service_type = orjson.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Некорректный курсор пагинации") from exc
+    if not isinstance(total_amount, (int, float)) or not isinstance(service_type, str):
+        raise ValueError("Некорректный курсор пагинации")
+    return -float(total_amount), service_type
 
 
 def _convert_services(listing: ServicesListingResult) -> Sequence[ServiceItem]:
@@ -179,7 +491,32 @@ def _convert_services(listing: ServicesListingResult) -> Sequence[ServiceItem]:
     ]
 
 
-def _resolve_monthly_value(metric: MonthlyMetric, record: MonthlyMetricRecord) -> float:
+def _aggregate_monthly(rows: Sequence[MonthlyMetricRecord]) -> MonthlyAggregation:
+    aggregation = MonthlyAggregation()
+    for record in rows:
+        aggregation.update(record)
+    return aggregation
+
+
+def _monthly_series_payload(
+    metric: MonthlyMetric,
+    rows: Sequence[MonthlyMetricRecord],
+    aggregation: MonthlyAggregation,
+) -> JsonObject:
+    """Ряд одной метрики со структурой :class:`MonthlyMetricSeries`."""
+    points = [
+        {"month": record.month, "value": resolve_monthly_value(metric, record)}
+        for record in rows
+    ]
+    return {
+        "metric": metric.value,
+        "points": points,
+        "aggregate": aggregation.finalize(metric, has_points=bool(points)),
+    }
+
+
+def resolve_monthly_value(metric: MonthlyMetric, record: MonthlyMetricRecord) -> float:
+    """Значение метрики ``metric`` за месяц ``record`` (точка ряда и колонка выгрузки)."""
     match metric:
         case MonthlyMetric.revenue:
             return record.revenue
@@ -296,8 +633,15 @@ class MonthlyAggregation:
 
 
 __all__ = [
+    "get_dashboard",
     "get_metrics",
+    "get_metrics_batch",
     "get_services",
     "get_monthly_metrics",
+    "get_monthly_metrics_batch",
+    "get_monthly_metrics_batch_payload",
+    "get_monthly_metrics_payload",
     "get_monthly_services",
+    "get_monthly_services_payload",
+    "resolve_monthly_value",
 ]
@@ -0,0 +1,166 @@
+"""Фоновое обновление ``uslugi_daily_mv`` по расписанию.
+
+Каждый воркер раз в ``interval`` секунд вызывает
+:func:`~app.repositories.materialized_views.refresh_materialized_view`; advisory
+lock и отметка в ``u4s_mv_refresh_state`` гарантируют, что представление
+обновит только один из них. Остальные видят новую отметку времени и, как и
+обновивший воркер, сбрасывают водяной знак данных и кеш закрытых месяцев, чтобы
+отчёты перечитали услуги, не дожидаясь ``DATA_WATERMARK_TTL_SECONDS`` и
+``MONTHLY_CACHE_TTL_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.logging import bind_logger
+from app.repositories.materialized_views import (
+    SERVICES_VIEW,
+    ViewRefreshResult,
+    refresh_materialized_view,
+)
+from app.repositories.metrics import invalidate_cached_months
+from app.services.watermark import reset_data_watermark
+
+REFRESH_SECONDS = Histogram(
+    "u4s_mv_refresh_seconds",
+    "Duration of REFRESH MATERIALIZED VIEW by view",
+    ["view"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+REFRESH_RUNS = Counter(
+    "u4s_mv_refresh_runs_total",
+    "Scheduled refresh attempts by view and outcome (refreshed, skipped, error)",
+    ["view", "outcome"],
+)
+LAST_REFRESH = Gauge(
+    "u4s_mv_last_refresh_timestamp_seconds",
+    "Unix time of the last successful refresh seen by this worker",
+    ["view"],
+)
+STALENESS = Gauge(
+    "u4s_mv_staleness_seconds",
+    "Seconds since the last successful refresh seen by this worker",
+    ["view"],
+)
+
+RefreshFunc = Callable[..., Awaitable[ViewRefreshResult]]
+
+
+class MaterializedViewRefresher:
+    """Периодически обновляет представление и следит за его свежестью."""
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        interval: float,
+        view: str = SERVICES_VIEW,
+        refresh: RefreshFunc = refresh_materialized_view,
+    ) -> None:
+        self.dsn = dsn
+        self.interval = interval
+        self.view = view
+        self.last_refreshed_at: Optional[datetime] = None
+        self._refresh = refresh
+        self._task: Optional[asyncio.Task[None]] = None
+        self._log = bind_logger(component="mv_refresh", view=view)
+        STALENESS.labels(view).set_function(self._staleness)
+
+    def _staleness(self) -> float:
+        if self.last_refreshed_at is None:
+            return math.nan
+        return max(0.0, time.time() - self.last_refreshed_at.timestamp())
+
+    async def run_once(self) -> ViewRefreshResult:
+        """Одна попытка обновления; отметку времени учитывает и при пропуске."""
+        result = await self._refresh(self.view, dsn=self.dsn, min_interval=self.interval * 0.9)
+        if result.refreshed:
+            REFRESH_RUNS.labels(self.view, "refreshed").inc()
+            if result.duration_seconds is not None:
+                REFRESH_SECONDS.labels(self.view).observe(result.duration_seconds)
+            self._log.info(
+                "Представление обновлено",
+                duration=round(result.duration_seconds or 0.0, 3),
+            )
+        else:
+            REFRESH_RUNS.labels(self.view, "skipped").inc()
+
+        refreshed_at = result.refreshed_at
+        if refreshed_at is not None and (
+            self.last_refreshed_at is None or refreshed_at > self.last_refreshed_at
+        ):
+            if self.last_refreshed_at is not None or result.refreshed:
+                reset_data_watermark()
+                invalidate_cached_months()
+            self.last_refreshed_at = refreshed_at
+            LAST_REFRESH.labels(self.view).set(refreshed_at.timestamp())
+        return result
+
+    async def _run(self) -> None:
+        # Случайный сдвиг, чтобы воркеры, стартовавшие вместе, не спорили за lock.
+        await asyncio.sleep(random.uniform(0, min(self.interval, 60.0) * 0.1))
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                REFRESH_RUNS.labels(self.view, "error").inc()
+                self._log.warning("Не удалось обновить представление", error=str(exc))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def aclose(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+_refresher: Optional[MaterializedViewRefresher] = None
+
+
+def start_mv_refresh(dsn: str, *, interval: float) -> Optional[MaterializedViewRefresher]:
+    """Запускает фоновое обновление; ``interval <= 0`` отключает его."""
+    global _refresher
+    if interval <= 0:
+        return None
+    if _refresher is None:
+        _refresher = MaterializedViewRefresher(dsn, interval=interval)
+    _refresher.start()
+    return _refresher
+
+
+async def stop_mv_refresh() -> None:
+    global _refresher
+    refresher, _refresher = _refresher, None
+    if refresher is not None:
+        await refresher.aclose()
+
+
+def last_mv_refresh() -> Optional[datetime]:
+    """Время последнего обновления ``uslugi_daily_mv``, известное этому воркеру."""
+    return _refresher.last_refreshed_at if _refresher is not None else None
+
+
+__all__ = [
+    "MaterializedViewRefresher",
+    "last_mv_refresh",
+    "start_mv_refresh",
+    "stop_mv_refresh",
+]
@@ -0,0 +1,45 @@
+"""Кешированный доступ к водяному знаку данных."""
+
+from __future__ import annotations
+
+import time
+
+from app.db import current_dsn, require_replica_lsn
+from app.repositories.watermark import DataWatermark, fetch_data_watermark
+from app.settings import get_settings
+
+_watermarks: dict[str | None, tuple[float, DataWatermark]] = {}
+
+
+async def current_data_watermark() -> DataWatermark:
+    """Возвращает водяной знак, перечитывая его из базы не чаще раза в TTL.
+
+    Между перечитываниями ответы из кешей считаются актуальными, поэтому TTL
+    ограничивает задержку, с которой новые данные попадают в отчёт.
+
+    Когда токен меняется, чтения уходят только на реплики, проигравшие WAL до
+    позиции этого чтения: иначе отстающая реплика сохранила бы в кеши старые
+    строки под новым токеном. Пока токен прежний, реплики не ограничиваются.
+    """
+
+    dsn = current_dsn()
+    now = time.monotonic()
+    cached = _watermarks.get(dsn)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    watermark = await fetch_data_watermark()
+    if cached is None or cached[1].token != watermark.token:
+        require_replica_lsn(watermark.wal_lsn, dsn)
+    ttl = get_settings().data_watermark_ttl_seconds
+    _watermarks[dsn] = (time.monotonic() + ttl, watermark)
+    return watermark
+
+
+def reset_data_watermark() -> None:
+    """Забывает закешированные водяные знаки (для тестов и ручной инвалидации)."""
+
+    _watermarks.clear()
+
+
+__all__ = ["current_data_watermark", "reset_data_watermark"]
@@ -0,0 +1,22 @@
+SELECT
+  (SELECT MAX(g.created_at) FROM guests AS g)::text AS guests_max_created_at,
+  (
+    SELECT COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)
+    FROM pg_stat_user_tables AS s
+    WHERE s.relid = to_regclass('guests')
+  )::bigint AS guests_changes,
+  pg_relation_filenode(to_regclass('uslugi_daily_mv'))::bigint AS services_filenode,
+  (
+    SELECT COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)
+    FROM pg_stat_user_tables AS s
+    WHERE s.relid = to_regclass('uslugi_daily_mv')
+  )::bigint AS services_changes,
+  (
+    SELECT COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)
+    FROM pg_stat_user_tables AS s
+    WHERE s.relid = to_regclass('guests_daily_rollup')
+  )::bigint AS rollup_changes,
+  (
+    CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END
+    - '0/0'::pg_lsn
+  )::bigint AS wal_lsn
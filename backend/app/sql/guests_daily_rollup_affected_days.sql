@@ -0,0 +1,9 @@
+SELECT DISTINCT g.{date_column}::date AS day
+FROM guests AS g
+WHERE g.created_at > %(since)s
+UNION
+SELECT generate_series(
+  CURRENT_DATE - %(lookback_days)s::int,
+  CURRENT_DATE,
+  interval '1 day'
+)::date AS day
@@ -0,0 +1,3 @@
+DELETE FROM guests_daily_rollup AS r
+WHERE r.date_field = %(date_field)s
+  {day_filter}
@@ -0,0 +1,29 @@
+INSERT INTO guests_daily_rollup (
+  date_field,
+  day,
+  bookings_count,
+  amount_count,
+  revenue,
+  min_booking,
+  max_booking,
+  lvl2p,
+  stay_days_sum,
+  stay_days_count,
+  bonus_spent_sum
+)
+SELECT
+  %(date_field)s AS date_field,
+  g.{date_column}::date AS day,
+  COUNT(*)::int AS bookings_count,
+  COUNT(g.total_amount)::int AS amount_count,
+  COALESCE(SUM(g.total_amount), 0)::numeric AS revenue,
+  MIN(g.total_amount)::numeric AS min_booking,
+  MAX(g.total_amount)::numeric AS max_booking,
+  COALESCE(SUM(CASE WHEN g.loyalty_level IN ('2 СЕЗОНА','3 СЕЗОНА','4 СЕЗОНА') THEN 1 ELSE 0 END), 0)::int AS lvl2p,
+  COALESCE(SUM((g.created_at::date - g.checkin_date)::numeric), 0)::numeric AS stay_days_sum,
+  COUNT(g.created_at::date - g.checkin_date)::int AS stay_days_count,
+  COALESCE(SUM(g.bonus_spent), 0)::numeric AS bonus_spent_sum
+FROM guests AS g
+WHERE 1=1
+  {day_filter}
+GROUP BY g.{date_column}::date
@@ -0,0 +1,22 @@
+CREATE TABLE IF NOT EXISTS guests_daily_rollup (
+  date_field text NOT NULL CHECK (date_field IN ('created_at', 'checkin_date')),
+  day date,
+  bookings_count integer NOT NULL,
+  amount_count integer NOT NULL,
+  revenue numeric NOT NULL,
+  min_booking numeric,
+  max_booking numeric,
+  lvl2p integer NOT NULL,
+  stay_days_sum numeric NOT NULL,
+  stay_days_count integer NOT NULL,
+  bonus_spent_sum numeric NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS guests_daily_rollup_field_day_idx
+  ON guests_daily_rollup (date_field, day);
+
+CREATE TABLE IF NOT EXISTS guests_daily_rollup_state (
+  date_field text PRIMARY KEY,
+  high_watermark timestamptz,
+  refreshed_at timestamptz NOT NULL DEFAULT now()
+);
@@ -0,0 +1,5 @@
+INSERT INTO guests_daily_rollup_state (date_field, high_watermark, refreshed_at)
+VALUES (%(date_field)s, %(high_watermark)s, now())
+ON CONFLICT (date_field) DO UPDATE
+SET high_watermark = EXCLUDED.high_watermark,
+    refreshed_at = EXCLUDED.refreshed_at
@@ -0,0 +1,17 @@
+SELECT
+  t.name AS table_name,
+  to_regclass(t.name) IS NOT NULL AS table_exists,
+  i.relname AS index_name,
+  ix.indisvalid AS is_valid,
+  ix.indnkeyatts AS key_count,
+  ARRAY(
+    SELECT pg_get_indexdef(ix.indexrelid, k, true)
+    FROM generate_series(1, ix.indnatts) AS k
+    ORDER BY k
+  ) AS columns
+FROM unnest(%(tables)s::text[]) AS t(name)
+LEFT JOIN pg_index AS ix
+  ON ix.indrelid = to_regclass(t.name)
+  AND ix.indpred IS NULL
+LEFT JOIN pg_class AS i ON i.oid = ix.indexrelid
+ORDER BY t.name, i.relname
@@ -38,15 +38,15 @@ services_agg AS (
 )
 SELECT
   m.month_start,
-  COALESCE(g.bookings_count, 0)::int AS bookings_count,
-  COALESCE(g.revenue, 0)::numeric AS revenue,
-  COALESCE(g.min_booking, 0)::numeric AS min_booking,
-  COALESCE(g.max_booking, 0)::numeric AS max_booking,
-  COALESCE(g.avg_check, 0)::numeric AS avg_check,
-  COALESCE(g.lvl2p, 0)::int AS lvl2p,
-  COALESCE(g.avg_stay_days, 0)::numeric AS avg_stay_days,
-  COALESCE(g.bonus_spent_sum, 0)::numeric AS bonus_spent_sum,
-  COALESCE(s.services_amount, 0)::numeric AS services_amount
+  COALESCE(g.revenue, 0)::float8 AS revenue,
+  COALESCE(g.bookings_count, 0)::int4 AS bookings_count,
+  COALESCE(g.lvl2p, 0)::int4 AS lvl2p,
+  COALESCE(g.min_booking, 0)::float8 AS min_booking,
+  COALESCE(g.max_booking, 0)::float8 AS max_booking,
+  COALESCE(g.avg_check, 0)::float8 AS avg_check,
+  COALESCE(g.avg_stay_days, 0)::float8 AS avg_stay_days,
+  COALESCE(g.bonus_spent_sum, 0)::float8 AS bonus_spent_sum,
+  COALESCE(s.services_amount, 0)::float8 AS services_amount
 FROM months AS m
 LEFT JOIN guests_agg AS g ON g.month_start = m.month_start
 LEFT JOIN services_agg AS s ON s.month_start = m.month_start
@@ -0,0 +1,43 @@
+WITH months AS (
+  SELECT generate_series(%(series_start)s::date, %(series_end)s::date, interval '1 month')::date AS month_start
+),
+guests_agg AS (
+  SELECT
+    DATE_TRUNC('month', r.day)::date AS month_start,
+    SUM(r.bookings_count)::int AS bookings_count,
+    COALESCE(SUM(r.revenue), 0)::numeric AS revenue,
+    COALESCE(MIN(r.min_booking), 0)::numeric AS min_booking,
+    COALESCE(MAX(r.max_booking), 0)::numeric AS max_booking,
+    COALESCE(SUM(r.revenue) / NULLIF(SUM(r.amount_count), 0), 0)::numeric AS avg_check,
+    COALESCE(SUM(r.lvl2p), 0)::int AS lvl2p,
+    COALESCE(SUM(r.stay_days_sum) / NULLIF(SUM(r.stay_days_count), 0), 0)::numeric AS avg_stay_days,
+    COALESCE(SUM(r.bonus_spent_sum), 0)::numeric AS bonus_spent_sum
+  FROM guests_daily_rollup AS r
+  WHERE r.date_field = %(rollup_field)s
+    {filters}
+  GROUP BY DATE_TRUNC('month', r.day)
+),
+services_agg AS (
+  SELECT
+    DATE_TRUNC('month', u.consumption_date)::date AS month_start,
+    COALESCE(SUM(u.total_amount), 0)::numeric AS services_amount
+  FROM uslugi_daily_mv AS u
+  WHERE 1=1
+    {services_filters}
+  GROUP BY DATE_TRUNC('month', u.consumption_date)
+)
+SELECT
+  m.month_start,
+  COALESCE(g.revenue, 0)::float8 AS revenue,
+  COALESCE(g.bookings_count, 0)::int4 AS bookings_count,
+  COALESCE(g.lvl2p, 0)::int4 AS lvl2p,
+  COALESCE(g.min_booking, 0)::float8 AS min_booking,
+  COALESCE(g.max_booking, 0)::float8 AS max_booking,
+  COALESCE(g.avg_check, 0)::float8 AS avg_check,
+  COALESCE(g.avg_stay_days, 0)::float8 AS avg_stay_days,
+  COALESCE(g.bonus_spent_sum, 0)::float8 AS bonus_spent_sum,
+  COALESCE(s.services_amount, 0)::float8 AS services_amount
+FROM months AS m
+LEFT JOIN guests_agg AS g ON g.month_start = m.month_start
+LEFT JOIN services_agg AS s ON s.month_start = m.month_start
+ORDER BY m.month_start
@@ -16,14 +16,14 @@ services AS (
     {services_filters}
 )
 SELECT
-  COUNT(*)::int AS bookings_count,
-  COALESCE(SUM(total_amount), 0)::numeric AS revenue,
-  COALESCE(MIN(total_amount), 0)::numeric AS min_booking,
-  COALESCE(MAX(total_amount), 0)::numeric AS max_booking,
-  COALESCE(AVG(total_amount), 0)::numeric AS avg_check,
-  COALESCE(SUM(CASE WHEN loyalty_level IN ('2 СЕЗОНА','3 СЕЗОНА','4 СЕЗОНА') THEN 1 ELSE 0 END), 0)::int AS lvl2p,
-  COALESCE(AVG((created_at::date - checkin_date)::numeric), 0)::numeric AS avg_stay_days,
-  COALESCE(SUM(bonus_spent), 0)::numeric AS bonus_spent_sum,
-  MAX(services.services_amount) AS services_amount
+  COUNT(*)::int4 AS bookings_count,
+  COALESCE(SUM(CASE WHEN loyalty_level IN ('2 СЕЗОНА','3 СЕЗОНА','4 СЕЗОНА') THEN 1 ELSE 0 END), 0)::int4 AS lvl2p,
+  COALESCE(AVG(total_amount), 0)::float8 AS avg_check,
+  COALESCE(MIN(total_amount), 0)::float8 AS min_booking,
+  COALESCE(MAX(total_amount), 0)::float8 AS max_booking,
+  COALESCE(AVG((created_at::date - checkin_date)::numeric), 0)::float8 AS avg_stay_days,
+  COALESCE(SUM(bonus_spent), 0)::float8 AS bonus_spent_sum,
+  COALESCE(SUM(total_amount), 0)::float8 AS revenue,
+  COALESCE(MAX(services.services_amount), 0)::float8 AS services_amount
 FROM base
 CROSS JOIN services
@@ -0,0 +1,43 @@
+WITH ranges AS (
+  SELECT r.position, r.range_from, r.range_to
+  FROM unnest(%(range_from)s::timestamp[], %(range_to)s::timestamp[])
+    WITH ORDINALITY AS r(range_from, range_to, position)
+),
+guests_agg AS (
+  SELECT
+    ranges.position,
+    COUNT(g.{date_column}) AS bookings_count,
+    COUNT(*) FILTER (WHERE g.loyalty_level IN ('2 СЕЗОНА','3 СЕЗОНА','4 СЕЗОНА')) AS lvl2p,
+    AVG(g.total_amount) AS avg_check,
+    MIN(g.total_amount) AS min_booking,
+    MAX(g.total_amount) AS max_booking,
+    AVG((g.created_at::date - g.checkin_date)::numeric) AS avg_stay_days,
+    SUM(g.bonus_spent) AS bonus_spent_sum,
+    SUM(g.total_amount) AS revenue
+  FROM ranges
+  LEFT JOIN guests AS g
+    ON g.{date_column} >= ranges.range_from
+   AND g.{date_column} < ranges.range_to
+  GROUP BY ranges.position
+),
+services_agg AS (
+  SELECT ranges.position, SUM(u.total_amount) AS services_amount
+  FROM ranges
+  LEFT JOIN uslugi_daily_mv AS u
+    ON u.consumption_date >= ranges.range_from
+   AND u.consumption_date < ranges.range_to
+  GROUP BY ranges.position
+)
+SELECT
+  g.bookings_count::int4 AS bookings_count,
+  g.lvl2p::int4 AS lvl2p,
+  COALESCE(g.avg_check, 0)::float8 AS avg_check,
+  COALESCE(g.min_booking, 0)::float8 AS min_booking,
+  COALESCE(g.max_booking, 0)::float8 AS max_booking,
+  COALESCE(g.avg_stay_days, 0)::float8 AS avg_stay_days,
+  COALESCE(g.bonus_spent_sum, 0)::float8 AS bonus_spent_sum,
+  COALESCE(g.revenue, 0)::float8 AS revenue,
+  COALESCE(s.services_amount, 0)::float8 AS services_amount
+FROM guests_agg AS g
+JOIN services_agg AS s ON s.position = g.position
+ORDER BY g.position
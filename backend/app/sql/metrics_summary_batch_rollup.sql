@@ -0,0 +1,44 @@
+WITH ranges AS (
+  SELECT r.position, r.range_from, r.range_to
+  FROM unnest(%(range_from)s::timestamp[], %(range_to)s::timestamp[])
+    WITH ORDINALITY AS r(range_from, range_to, position)
+),
+guests_agg AS (
+  SELECT
+    ranges.position,
+    SUM(r.bookings_count) AS bookings_count,
+    SUM(r.lvl2p) AS lvl2p,
+    SUM(r.revenue) / NULLIF(SUM(r.amount_count), 0) AS avg_check,
+    MIN(r.min_booking) AS min_booking,
+    MAX(r.max_booking) AS max_booking,
+    SUM(r.stay_days_sum) / NULLIF(SUM(r.stay_days_count), 0) AS avg_stay_days,
+    SUM(r.bonus_spent_sum) AS bonus_spent_sum,
+    SUM(r.revenue) AS revenue
+  FROM ranges
+  LEFT JOIN guests_daily_rollup AS r
+    ON r.date_field = %(rollup_field)s
+   AND r.day >= ranges.range_from
+   AND r.day < ranges.range_to
+  GROUP BY ranges.position
+),
+services_agg AS (
+  SELECT ranges.position, SUM(u.total_amount) AS services_amount
+  FROM ranges
+  LEFT JOIN uslugi_daily_mv AS u
+    ON u.consumption_date >= ranges.range_from
+   AND u.consumption_date < ranges.range_to
+  GROUP BY ranges.position
+)
+SELECT
+  COALESCE(g.bookings_count, 0)::int4 AS bookings_count,
+  COALESCE(g.lvl2p, 0)::int4 AS lvl2p,
+  COALESCE(g.avg_check, 0)::float8 AS avg_check,
+  COALESCE(g.min_booking, 0)::float8 AS min_booking,
+  COALESCE(g.max_booking, 0)::float8 AS max_booking,
+  COALESCE(g.avg_stay_days, 0)::float8 AS avg_stay_days,
+  COALESCE(g.bonus_spent_sum, 0)::float8 AS bonus_spent_sum,
+  COALESCE(g.revenue, 0)::float8 AS revenue,
+  COALESCE(s.services_amount, 0)::float8 AS services_amount
+FROM guests_agg AS g
+JOIN services_agg AS s ON s.position = g.position
+ORDER BY g.position
@@ -0,0 +1,45 @@
+WITH base AS (
+  SELECT
+    (g.{date_column} >= %(from)s AND g.{date_column} < %(to)s) AS in_current,
+    (g.{date_column} >= %(compare_from)s AND g.{date_column} < %(compare_to)s) AS in_compare,
+    g.total_amount,
+    g.loyalty_level IN ('2 СЕЗОНА','3 СЕЗОНА','4 СЕЗОНА') AS is_lvl2p,
+    (g.created_at::date - g.checkin_date)::numeric AS stay_days,
+    g.bonus_spent
+  FROM guests AS g
+  WHERE (g.{date_column} >= %(from)s AND g.{date_column} < %(to)s)
+     OR (g.{date_column} >= %(compare_from)s AND g.{date_column} < %(compare_to)s)
+),
+services AS (
+  SELECT
+    COALESCE(SUM(u.total_amount) FILTER (
+      WHERE u.consumption_date >= %(from)s AND u.consumption_date < %(to)s
+    ), 0)::numeric AS services_amount,
+    COALESCE(SUM(u.total_amount) FILTER (
+      WHERE u.consumption_date >= %(compare_from)s AND u.consumption_date < %(compare_to)s
+    ), 0)::numeric AS compare_services_amount
+  FROM uslugi_daily_mv AS u
+  WHERE (u.consumption_date >= %(from)s AND u.consumption_date < %(to)s)
+     OR (u.consumption_date >= %(compare_from)s AND u.consumption_date < %(compare_to)s)
+)
+SELECT
+  (COUNT(*) FILTER (WHERE in_current))::int4 AS bookings_count,
+  (COUNT(*) FILTER (WHERE in_current AND is_lvl2p))::int4 AS lvl2p,
+  COALESCE(AVG(total_amount) FILTER (WHERE in_current), 0)::float8 AS avg_check,
+  COALESCE(MIN(total_amount) FILTER (WHERE in_current), 0)::float8 AS min_booking,
+  COALESCE(MAX(total_amount) FILTER (WHERE in_current), 0)::float8 AS max_booking,
+  COALESCE(AVG(stay_days) FILTER (WHERE in_current), 0)::float8 AS avg_stay_days,
+  COALESCE(SUM(bonus_spent) FILTER (WHERE in_current), 0)::float8 AS bonus_spent_sum,
+  COALESCE(SUM(total_amount) FILTER (WHERE in_current), 0)::float8 AS revenue,
+  COALESCE(MAX(services.services_amount), 0)::float8 AS services_amount,
+  (COUNT(*) FILTER (WHERE in_compare))::int4 AS compare_bookings_count,
+  (COUNT(*) FILTER (WHERE in_compare AND is_lvl2p))::int4 AS compare_lvl2p,
+  COALESCE(AVG(total_amount) FILTER (WHERE in_compare), 0)::float8 AS compare_avg_check,
+  COALESCE(MIN(total_amount) FILTER (WHERE in_compare), 0)::float8 AS compare_min_booking,
+  COALESCE(MAX(total_amount) FILTER (WHERE in_compare), 0)::float8 AS compare_max_booking,
+  COALESCE(AVG(stay_days) FILTER (WHERE in_compare), 0)::float8 AS compare_avg_stay_days,
+  COALESCE(SUM(bonus_spent) FILTER (WHERE in_compare), 0)::float8 AS compare_bonus_spent_sum,
+  COALESCE(SUM(total_amount) FILTER (WHERE in_compare), 0)::float8 AS compare_revenue,
+  COALESCE(MAX(services.compare_services_amount), 0)::float8 AS compare_services_amount
+FROM base
+CROSS JOIN services
@@ -0,0 +1,69 @@
+WITH base AS (
+  SELECT
+    (r.day >= %(from)s AND r.day < %(to)s) AS in_current,
+    (r.day >= %(compare_from)s AND r.day < %(compare_to)s) AS in_compare,
+    r.bookings_count,
+    r.amount_count,
+    r.revenue,
+    r.min_booking,
+    r.max_booking,
+    r.lvl2p,
+    r.stay_days_sum,
+    r.stay_days_count,
+    r.bonus_spent_sum
+  FROM guests_daily_rollup AS r
+  WHERE r.date_field = %(rollup_field)s
+    AND (
+      (r.day >= %(from)s AND r.day < %(to)s)
+      OR (r.day >= %(compare_from)s AND r.day < %(compare_to)s)
+    )
+),
+services AS (
+  SELECT
+    COALESCE(SUM(u.total_amount) FILTER (
+      WHERE u.consumption_date >= %(from)s AND u.consumption_date < %(to)s
+    ), 0)::numeric AS services_amount,
+    COALESCE(SUM(u.total_amount) FILTER (
+      WHERE u.consumption_date >= %(compare_from)s AND u.consumption_date < %(compare_to)s
+    ), 0)::numeric AS compare_services_amount
+  FROM uslugi_daily_mv AS u
+  WHERE (u.consumption_date >= %(from)s AND u.consumption_date < %(to)s)
+     OR (u.consumption_date >= %(compare_from)s AND u.consumption_date < %(compare_to)s)
+)
+SELECT
+  COALESCE(SUM(bookings_count) FILTER (WHERE in_current), 0)::int4 AS bookings_count,
+  COALESCE(SUM(lvl2p) FILTER (WHERE in_current), 0)::int4 AS lvl2p,
+  COALESCE(
+    SUM(revenue) FILTER (WHERE in_current)
+      / NULLIF(SUM(amount_count) FILTER (WHERE in_current), 0),
+    0
+  )::float8 AS avg_check,
+  COALESCE(MIN(min_booking) FILTER (WHERE in_current), 0)::float8 AS min_booking,
+  COALESCE(MAX(max_booking) FILTER (WHERE in_current), 0)::float8 AS max_booking,
+  COALESCE(
+    SUM(stay_days_sum) FILTER (WHERE in_current)
+      / NULLIF(SUM(stay_days_count) FILTER (WHERE in_current), 0),
+    0
+  )::float8 AS avg_stay_days,
+  COALESCE(SUM(bonus_spent_sum) FILTER (WHERE in_current), 0)::float8 AS bonus_spent_sum,
+  COALESCE(SUM(revenue) FILTER (WHERE in_current), 0)::float8 AS revenue,
+  COALESCE(MAX(services.services_amount), 0)::float8 AS services_amount,
+  COALESCE(SUM(bookings_count) FILTER (WHERE in_compare), 0)::int4 AS compare_bookings_count,
+  COALESCE(SUM(lvl2p) FILTER (WHERE in_compare), 0)::int4 AS compare_lvl2p,
+  COALESCE(
+    SUM(revenue) FILTER (WHERE in_compare)
+      / NULLIF(SUM(amount_count) FILTER (WHERE in_compare), 0),
+    0
+  )::float8 AS compare_avg_check,
+  COALESCE(MIN(min_booking) FILTER (WHERE in_compare), 0)::float8 AS compare_min_booking,
+  COALESCE(MAX(max_booking) FILTER (WHERE in_compare), 0)::float8 AS compare_max_booking,
+  COALESCE(
+    SUM(stay_days_sum) FILTER (WHERE in_compare)
+      / NULLIF(SUM(stay_days_count) FILTER (WHERE in_compare), 0),
+    0
+  )::float8 AS compare_avg_stay_days,
+  COALESCE(SUM(bonus_spent_sum) FILTER (WHERE in_compare), 0)::float8 AS compare_bonus_spent_sum,
+  COALESCE(SUM(revenue) FILTER (WHERE in_compare), 0)::float8 AS compare_revenue,
+  COALESCE(MAX(services.compare_services_amount), 0)::float8 AS compare_services_amount
+FROM base
+CROSS JOIN services
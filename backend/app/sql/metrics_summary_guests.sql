@@ -0,0 +1,12 @@
+SELECT
+  COUNT(*)::int4 AS bookings_count,
+  COALESCE(SUM(CASE WHEN g.loyalty_level IN ('2 СЕЗОНА','3 СЕЗОНА','4 СЕЗОНА') THEN 1 ELSE 0 END), 0)::int4 AS lvl2p,
+  COALESCE(AVG(g.total_amount), 0)::float8 AS avg_check,
+  COALESCE(MIN(g.total_amount), 0)::float8 AS min_booking,
+  COALESCE(MAX(g.total_amount), 0)::float8 AS max_booking,
+  COALESCE(AVG((g.created_at::date - g.checkin_date)::numeric), 0)::float8 AS avg_stay_days,
+  COALESCE(SUM(g.bonus_spent), 0)::float8 AS bonus_spent_sum,
+  COALESCE(SUM(g.total_amount), 0)::float8 AS revenue
+FROM guests AS g
+WHERE 1=1
+  {filters}
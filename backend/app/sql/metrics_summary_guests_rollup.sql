@@ -0,0 +1,12 @@
+SELECT
+  COALESCE(SUM(r.bookings_count), 0)::int4 AS bookings_count,
+  COALESCE(SUM(r.lvl2p), 0)::int4 AS lvl2p,
+  COALESCE(SUM(r.revenue) / NULLIF(SUM(r.amount_count), 0), 0)::float8 AS avg_check,
+  COALESCE(MIN(r.min_booking), 0)::float8 AS min_booking,
+  COALESCE(MAX(r.max_booking), 0)::float8 AS max_booking,
+  COALESCE(SUM(r.stay_days_sum) / NULLIF(SUM(r.stay_days_count), 0), 0)::float8 AS avg_stay_days,
+  COALESCE(SUM(r.bonus_spent_sum), 0)::float8 AS bonus_spent_sum,
+  COALESCE(SUM(r.revenue), 0)::float8 AS revenue
+FROM guests_daily_rollup AS r
+WHERE r.date_field = %(rollup_field)s
+  {filters}
@@ -0,0 +1,33 @@
+WITH base AS (
+  SELECT
+    r.bookings_count,
+    r.amount_count,
+    r.revenue,
+    r.min_booking,
+    r.max_booking,
+    r.lvl2p,
+    r.stay_days_sum,
+    r.stay_days_count,
+    r.bonus_spent_sum
+  FROM guests_daily_rollup AS r
+  WHERE r.date_field = %(rollup_field)s
+    {filters}
+),
+services AS (
+  SELECT COALESCE(SUM(u.total_amount), 0)::numeric AS services_amount
+  FROM uslugi_daily_mv AS u
+  WHERE 1=1
+    {services_filters}
+)
+SELECT
+  COALESCE(SUM(bookings_count), 0)::int4 AS bookings_count,
+  COALESCE(SUM(lvl2p), 0)::int4 AS lvl2p,
+  COALESCE(SUM(revenue) / NULLIF(SUM(amount_count), 0), 0)::float8 AS avg_check,
+  COALESCE(MIN(min_booking), 0)::float8 AS min_booking,
+  COALESCE(MAX(max_booking), 0)::float8 AS max_booking,
+  COALESCE(SUM(stay_days_sum) / NULLIF(SUM(stay_days_count), 0), 0)::float8 AS avg_stay_days,
+  COALESCE(SUM(bonus_spent_sum), 0)::float8 AS bonus_spent_sum,
+  COALESCE(SUM(revenue), 0)::float8 AS revenue,
+  COALESCE(MAX(services.services_amount), 0)::float8 AS services_amount
+FROM base
+CROSS JOIN services
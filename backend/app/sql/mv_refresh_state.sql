@@ -0,0 +1,6 @@
+SELECT
+  s.refreshed_at,
+  s.duration_seconds,
+  s.refreshed_at > now() - make_interval(secs => %(min_interval)s) AS is_fresh
+FROM u4s_mv_refresh_state AS s
+WHERE s.view_name = %(view)s
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS u4s_mv_refresh_state (
+  view_name text PRIMARY KEY,
+  refreshed_at timestamptz NOT NULL,
+  duration_seconds double precision NOT NULL
+);
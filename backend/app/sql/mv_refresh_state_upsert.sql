@@ -0,0 +1,6 @@
+INSERT INTO u4s_mv_refresh_state (view_name, refreshed_at, duration_seconds)
+VALUES (%(view)s, now(), %(duration_seconds)s)
+ON CONFLICT (view_name) DO UPDATE
+SET refreshed_at = EXCLUDED.refreshed_at,
+    duration_seconds = EXCLUDED.duration_seconds
+RETURNING refreshed_at
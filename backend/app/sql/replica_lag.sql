@@ -0,0 +1,7 @@
+SELECT
+  CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+  END::float8 AS lag_seconds,
+  (pg_last_wal_replay_lsn() - '0/0'::pg_lsn)::bigint AS replay_lsn
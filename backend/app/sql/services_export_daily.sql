@@ -0,0 +1,9 @@
+SELECT
+  u.consumption_date::date AS consumption_date,
+  {service_type} AS service_type,
+  COALESCE(SUM(u.total_amount), 0)::float8 AS total_amount
+FROM uslugi_daily_mv AS u
+WHERE u.consumption_date IS NOT NULL
+  {filters}
+GROUP BY u.consumption_date::date, {service_type}
+ORDER BY consumption_date, service_type
@@ -0,0 +1,8 @@
+SELECT
+  {service_type} AS service_type,
+  COALESCE(SUM(u.total_amount), 0)::float8 AS total_amount
+FROM uslugi_daily_mv AS u
+WHERE 1=1
+  {filters}
+GROUP BY {service_type}
+ORDER BY total_amount DESC, service_type COLLATE "C"
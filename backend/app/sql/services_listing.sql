@@ -1,42 +1,49 @@
 WITH aggregated AS (
   SELECT
-    COALESCE(u.uslugi_type, 'Без категории') AS service_type,
-    COALESCE(SUM(u.total_amount), 0)::numeric AS total_amount
+    {service_type} AS service_type,
+    COALESCE(SUM(u.total_amount), 0)::float8 AS total_amount
   FROM uslugi_daily_mv AS u
   WHERE 1=1
     {filters}
-  GROUP BY COALESCE(u.uslugi_type, 'Без категории')
+  GROUP BY {service_type}
 ),
 ranked AS (
   SELECT
     service_type,
     total_amount,
-    ROW_NUMBER() OVER (ORDER BY total_amount DESC, service_type) AS row_number,
+    ROW_NUMBER() OVER (ORDER BY total_amount DESC, service_type COLLATE "C") AS row_number,
     COUNT(*) OVER () AS total_items,
-    COALESCE(SUM(total_amount) OVER (), 0)::numeric AS overall_amount
+    COALESCE(SUM(total_amount) OVER (), 0)::float8 AS overall_amount
   FROM aggregated
 ),
+page_start AS (
+  SELECT {offset} AS page_offset
+),
 limited AS (
   SELECT
-    service_type,
-    total_amount,
-    total_items,
-    overall_amount,
+    r.service_type,
+    r.total_amount,
+    r.total_items,
+    r.overall_amount,
     FALSE AS is_summary,
-    row_number AS sort_order
-  FROM ranked
-  WHERE row_number > %(offset)s
-    AND row_number <= %(offset)s + %(limit)s
+    p.page_offset,
+    r.row_number AS sort_order
+  FROM ranked AS r
+  CROSS JOIN page_start AS p
+  WHERE r.row_number > p.page_offset
+    AND r.row_number <= p.page_offset + %(limit)s
 ),
 summary AS (
   SELECT
     NULL::text AS service_type,
-    NULL::numeric AS total_amount,
-    COALESCE(MAX(total_items), 0)::int AS total_items,
-    COALESCE(MAX(overall_amount), 0)::numeric AS overall_amount,
+    NULL::float8 AS total_amount,
+    COALESCE(MAX(r.total_items), 0) AS total_items,
+    COALESCE(MAX(r.overall_amount), 0)::float8 AS overall_amount,
     TRUE AS is_summary,
-    (%(offset)s + %(limit)s + 1) AS sort_order
-  FROM ranked
+    MAX(p.page_offset) AS page_offset,
+    NULL::bigint AS sort_order
+  FROM page_start AS p
+  LEFT JOIN ranked AS r ON TRUE
 ),
 combined AS (
   SELECT * FROM limited
@@ -46,8 +53,9 @@ combined AS (
 SELECT
   service_type,
   total_amount,
-  total_items,
+  total_items::int4 AS total_items,
   overall_amount,
-  is_summary
+  is_summary,
+  page_offset::int4 AS page_offset
 FROM combined
-ORDER BY sort_order
+ORDER BY is_summary, sort_order
@@ -19,7 +19,7 @@ services_agg AS (
 )
 SELECT
   m.month_start,
-  COALESCE(s.total_amount, 0)::numeric AS total_amount
+  COALESCE(s.total_amount, 0)::float8 AS total_amount
 FROM months AS m
 LEFT JOIN services_agg AS s ON s.month_start = m.month_start
 ORDER BY m.month_start
@@ -0,0 +1,4 @@
+SELECT COALESCE(SUM(u.total_amount), 0)::float8 AS services_amount
+FROM uslugi_daily_mv AS u
+WHERE 1=1
+  {filters}
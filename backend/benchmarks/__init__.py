@@ -0,0 +1 @@
+"""Микробенчмарки и нагрузочные сценарии backend-а (запуск: ``python -m benchmarks.<имя>``)."""
@@ -0,0 +1,53 @@
+"""Стоимость проверки bearer-токена на запрос: полная проверка против кеша.
+
+Полная проверка декодирует base64, пересчитывает HMAC-SHA256 и разбирает JSON;
+с кешем повторный токен находится поиском в словаре::
+
+    python -m benchmarks.bench_auth
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.cache import LRUCache  # noqa: E402
+from app.core.security import TokenPayload, create_access_token  # noqa: E402
+from app.services.auth import AdminTokenService  # noqa: E402
+
+SECRET = "bench-secret"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    token, _ = create_access_token(secret=SECRET, subject="admin", ttl_seconds=3600)
+    header = f"Bearer {token}"
+    services = {
+        "полная проверка": AdminTokenService(secret=SECRET, ttl_seconds=3600),
+        "кеш токенов": AdminTokenService(
+            secret=SECRET,
+            ttl_seconds=3600,
+            cache=LRUCache[str, TokenPayload]("auth_tokens_bench", max_entries=1024),
+        ),
+    }
+
+    results = {}
+    for label, service in services.items():
+        service.verify_bearer(header)
+        seconds = min(
+            timeit.repeat(lambda: service.verify_bearer(header), number=args.number, repeat=5)
+        )
+        results[label] = seconds / args.number * 1e6
+        print(f"{label:<20} {results[label]:8.2f} µs/запрос")
+    print(f"{'ускорение':<20} {results['полная проверка'] / results['кеш токенов']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
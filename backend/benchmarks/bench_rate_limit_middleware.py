@@ -0,0 +1,121 @@
+"""Пропускная способность приложения с прежним и новым стеком лимитера.
+
+Прежний стек: ``SlowAPIMiddleware`` на ``BaseHTTPMiddleware`` и проверка под
+глобальным ``asyncio.Lock``. Новый: ``RateLimitMiddleware`` на чистом ASGI без
+блокировки. Запросы подаются напрямую в ASGI-приложение (без сети)
+конкурентными задачами::
+
+    python -m benchmarks.bench_rate_limit_middleware
+    python -m benchmarks.bench_rate_limit_middleware --requests 20000 --concurrency 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.types import ASGIApp  # noqa: E402
+
+from slowapi import Limiter, RateLimitMiddleware, SlowAPIMiddleware  # noqa: E402
+from slowapi.util import get_remote_address  # noqa: E402
+
+# Лимит заведомо выше нагрузки, чтобы мерить только накладные расходы.
+LIMIT = "100000000/minute"
+
+
+class LockedLimiter(Limiter):
+    """Прежняя проверка: все запросы проходят через один ``asyncio.Lock``."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._lock = asyncio.Lock()
+
+    async def check_request(self, request: Request) -> None:
+        async with self._lock:
+            await super().check_request(request)
+
+
+def _build_app(middleware: Optional[type], limiter: Optional[Limiter]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping() -> dict[str, bool]:
+        return {"ok": True}
+
+    if middleware is not None:
+        app.state.limiter = limiter
+        app.add_middleware(middleware)
+    return app
+
+
+async def _drive(app: ASGIApp, requests: int, concurrency: int, clients: int) -> float:
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        return None
+
+    async def worker(offset: int) -> None:
+        for index in range(offset, requests, concurrency):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.4"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": "/api/ping",
+                "raw_path": b"/api/ping",
+                "root_path": "",
+                "query_string": b"",
+                "headers": [(b"host", b"bench")],
+                "client": (f"10.0.{index % clients >> 8 & 255}.{index % clients & 255}", 50000),
+                "server": ("bench", 80),
+            }
+            await app(scope, receive, send)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def _main(args: argparse.Namespace) -> None:
+    stacks = {
+        "без лимитера": (None, None),
+        "BaseHTTPMiddleware + lock": (
+            SlowAPIMiddleware,
+            LockedLimiter(key_func=get_remote_address, default_limits=[LIMIT]),
+        ),
+        "чистый ASGI": (
+            RateLimitMiddleware,
+            Limiter(key_func=get_remote_address, default_limits=[LIMIT]),
+        ),
+    }
+    print(f"{args.requests} запросов, конкурентность {args.concurrency}")
+    for label, (middleware, limiter) in stacks.items():
+        app = _build_app(middleware, limiter)
+        await _drive(app, min(args.requests, 1000), args.concurrency, args.clients)  # прогрев
+        elapsed = await _drive(app, args.requests, args.concurrency, args.clients)
+        print(
+            f"{label:<28} {args.requests / elapsed:9.0f} запр/с  "
+            f"{elapsed / args.requests * 1e6:7.1f} µs/запрос"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=1000, help="различных IP-адресов")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
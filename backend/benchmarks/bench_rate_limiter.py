@@ -0,0 +1,117 @@
+"""Память и задержка проверки лимита при 100 000 различных клиентов.
+
+Сравнивает прежний лимитер (``deque`` с отметками времени всех запросов на
+каждый ключ) со скользящим окном, которое хранит два счётчика на ключ::
+
+    python -m benchmarks.bench_rate_limiter
+    python -m benchmarks.bench_rate_limiter --clients 100000 --hits 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from slowapi.errors import RateLimitExceeded  # noqa: E402
+from slowapi.limiter import Limiter, RateLimit, _parse_limit  # noqa: E402
+from slowapi.storage import MemoryStorage  # noqa: E402
+
+LIMIT = "100/minute"
+
+
+class LegacyLimiter:
+    """Копия прежнего ``Limiter._enforce_limit`` на ``deque``."""
+
+    def __init__(self, limit: RateLimit) -> None:
+        self._limit = limit
+        self._hits: Dict[tuple[str, str], Deque[float]] = {}
+
+    def hit(self, key: str) -> None:
+        limit = self._limit
+        now = time.monotonic()
+        hits = self._hits.setdefault((f"default:{limit.signature}", key), deque())
+        while hits and now - hits[0] >= limit.seconds:
+            hits.popleft()
+        if len(hits) >= limit.count:
+            raise RateLimitExceeded(retry_after=limit.seconds - (now - hits[0]))
+        hits.append(now)
+
+
+class WindowLimiter:
+    """Синхронный путь ``Limiter`` с ``MemoryStorage`` без накладных расходов asyncio."""
+
+    def __init__(self, storage: MemoryStorage | None = None) -> None:
+        self.storage = storage or MemoryStorage()
+        limiter = Limiter(key_func=lambda request: "", default_limits=[LIMIT], storage=self.storage)
+        self._buckets = limiter.buckets_for(None)
+
+    def hit(self, key: str) -> None:
+        self.storage.hit(key, self._buckets)
+
+
+def _addresses(count: int) -> list[str]:
+    return [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(count)]
+
+
+def _run(limiter: object, clients: list[str], hits: int) -> float:
+    hit = limiter.hit  # type: ignore[attr-defined]
+    started = time.perf_counter()
+    for _ in range(hits):
+        for address in clients:
+            hit(address)
+    return time.perf_counter() - started
+
+
+def _measure(label: str, factory: Callable[[], object], clients: list[str], hits: int) -> None:
+    # Задержку и память меряем в разных прогонах: tracemalloc замедляет аллокации.
+    elapsed = _run(factory(), clients, hits)
+
+    gc.collect()
+    tracemalloc.start()
+    limiter = factory()
+    _run(limiter, clients, hits)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del limiter
+    checks = hits * len(clients)
+    print(
+        f"{label:<10} {current / 2**20:8.1f} МиБ  "
+        f"{current / len(clients):7.0f} Б/клиент  {elapsed / checks * 1e9:7.0f} нс/проверка"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--hits", type=int, default=20, help="запросов на клиента")
+    args = parser.parse_args()
+
+    clients = _addresses(args.clients)
+    print(f"{args.clients} клиентов × {args.hits} запросов, лимит {LIMIT}")
+    _measure("deque", lambda: LegacyLimiter(_parse_limit(LIMIT)), clients, args.hits)
+    _measure("окно", WindowLimiter, clients, args.hits)
+
+    # Все ключи простаивают дольше периода: очистка освобождает их целиком.
+    clock = [0.0]
+    limiter = WindowLimiter(MemoryStorage(clock=lambda: clock[0]))
+    for address in clients:
+        limiter.hit(address)
+    clock[0] += 60.0
+    started = time.perf_counter()
+    evicted = limiter.storage.evict_idle()
+    print(
+        f"вытеснение {evicted} простаивающих ключей: "
+        f"{(time.perf_counter() - started) * 1e3:.1f} мс, осталось {limiter.storage.tracked_keys}"
+    )
+
+
+if __name__ == "__main__":
+    main()
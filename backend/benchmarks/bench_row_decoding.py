@@ -0,0 +1,194 @@
+"""Разбор строк результата: ``dict_row`` с приведением в Python против позиционных записей.
+
+Прежний путь повторяет то, что делал репозиторий: колонки ``numeric``
+загружаются в ``Decimal``, строка собирается в словарь, а каждое поле
+проходит через ``as_float``/``_as_int``/``_coerce_date``. Новый путь —
+колонки ``float8``/``int4`` и ``args_row(Record)``, строка сразу становится
+записью. Значения подаются в загрузчики psycopg в текстовом формате протокола,
+как их присылает сервер, поэтому в замер входит и стоимость ``Decimal``::
+
+    python -m benchmarks.bench_row_decoding
+    python -m benchmarks.bench_row_decoding --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/bench")
+os.environ.setdefault("ADMIN_PASSWORD_SHA256", "a" * 64)
+
+from psycopg.adapt import Transformer  # noqa: E402
+from psycopg.postgres import types  # noqa: E402
+from psycopg.pq import ExecStatus, Format  # noqa: E402
+from psycopg.rows import args_row, dict_row  # noqa: E402
+
+from app.repositories.metrics import MonthlyMetricRecord  # noqa: E402
+
+COLUMNS = (
+    "month_start",
+    "revenue",
+    "bookings_count",
+    "lvl2p",
+    "min_booking",
+    "max_booking",
+    "avg_check",
+    "avg_stay_days",
+    "bonus_spent_sum",
+    "services_amount",
+)
+LEGACY_TYPES = ("date", "numeric", "int4", "int4", *["numeric"] * 6)
+FAST_TYPES = ("date", "float8", "int4", "int4", *["float8"] * 6)
+
+
+class _Result:
+    """Описание результата в том виде, в каком его читает ``dict_row``."""
+
+    status = ExecStatus.TUPLES_OK
+    nfields = len(COLUMNS)
+
+    def fname(self, index: int) -> bytes:
+        return COLUMNS[index].encode()
+
+
+class _Cursor:
+    """Минимум курсора, который нужен фабрикам строк psycopg."""
+
+    pgresult = _Result()
+    _encoding = "utf-8"
+
+
+def _wire_rows(count: int) -> list[tuple[bytes, ...]]:
+    rows = []
+    for index in range(count):
+        rows.append(
+            (
+                date(2020 + index // 12 % 6, index % 12 + 1, 1).isoformat().encode(),
+                f"{1250000 + index}.50".encode(),
+                str(40 + index % 50).encode(),
+                str(index % 17).encode(),
+                b"1500.00",
+                b"98000.00",
+                f"{31250 + index % 100}.1234567890123456".encode(),
+                b"2.5000000000000000",
+                b"15000.00",
+                f"{250000 + index}.75".encode(),
+            )
+        )
+    return rows
+
+
+def _loaders(type_names: Sequence[str]) -> list[Callable[[bytes], Any]]:
+    transformer = Transformer()
+    return [transformer.get_loader(types[name].oid, Format.TEXT).load for name in type_names]
+
+
+# Прежние функции приведения из app/repositories/metrics.py и app/core/numbers.py.
+def _normalize_numeric(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    if isinstance(value, str):
+        stripped = value.strip()
+        if not stripped:
+            return None
+        try:
+            return float(stripped)
+        except ValueError:
+            return None
+    return None
+
+
+def _as_float(value: Any) -> float:
+    numeric = _normalize_numeric(value)
+    return 0.0 if numeric is None else numeric
+
+
+def _as_int(value: Any) -> int:
+    numeric = _normalize_numeric(value)
+    return 0 if numeric is None else int(numeric)
+
+
+def _coerce_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return None
+
+
+def _legacy_record(row: Mapping[str, Any]) -> Optional[MonthlyMetricRecord]:
+    month_start = _coerce_date(row.get("month_start"))
+    if not month_start:
+        return None
+    return MonthlyMetricRecord(
+        month=month_start,
+        revenue=_as_float(row.get("revenue")),
+        bookings_count=_as_int(row.get("bookings_count")),
+        lvl2p=_as_int(row.get("lvl2p")),
+        min_booking=_normalize_numeric(row.get("min_booking")),
+        max_booking=_normalize_numeric(row.get("max_booking")),
+        avg_check=_as_float(row.get("avg_check")),
+        avg_stay_days=_as_float(row.get("avg_stay_days")),
+        bonus_spent_sum=_as_float(row.get("bonus_spent_sum")),
+        services_amount=_as_float(row.get("services_amount")),
+    )
+
+
+def legacy_decode(wire: list[tuple[bytes, ...]]) -> list[MonthlyMetricRecord]:
+    loaders = _loaders(LEGACY_TYPES)
+    make_row = dict_row(_Cursor())  # type: ignore[arg-type]
+    result = []
+    for raw in wire:
+        row = make_row([load(value) for load, value in zip(loaders, raw)])
+        record = _legacy_record(row)
+        if record:
+            result.append(record)
+    return result
+
+
+def fast_decode(wire: list[tuple[bytes, ...]]) -> list[MonthlyMetricRecord]:
+    loaders = _loaders(FAST_TYPES)
+    make_row = args_row(MonthlyMetricRecord)(_Cursor())  # type: ignore[arg-type]
+    return [make_row([load(value) for load, value in zip(loaders, raw)]) for raw in wire]
+
+
+def _rows_per_second(func: Callable[[], Any], rows: int) -> float:
+    return rows / min(timeit.repeat(func, number=1, repeat=5))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    wire = _wire_rows(args.rows)
+    legacy, fast = legacy_decode(wire[:100]), fast_decode(wire[:100])
+    assert [record.month for record in legacy] == [record.month for record in fast]
+    assert all(
+        abs(old.revenue - new.revenue) < 1e-6 and old.lvl2p == new.lvl2p
+        for old, new in zip(legacy, fast)
+    )
+
+    print(f"{args.rows} строк помесячного ряда, {len(COLUMNS)} колонок")
+    legacy_rate = _rows_per_second(lambda: legacy_decode(wire), args.rows)
+    fast_rate = _rows_per_second(lambda: fast_decode(wire), args.rows)
+    print(f"dict_row + приведение в Python {legacy_rate:12,.0f} строк/с")
+    print(
+        f"float8/int4 + args_row         {fast_rate:12,.0f} строк/с"
+        f"  ×{fast_rate / legacy_rate:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
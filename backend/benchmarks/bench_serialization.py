@@ -0,0 +1,157 @@
+"""CPU на сборку и сериализацию ответов помесячных эндпоинтов.
+
+Прежний путь повторяет то, что делает FastAPI 0.115 с возвращённой моделью:
+Pydantic-модель из записей, повторная валидация по ``response_model``,
+``jsonable_encoder`` и ``json.dumps``. Быстрый путь — словарь из записей
+репозитория и ``orjson.dumps``::
+
+    python -m benchmarks.bench_serialization
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/bench")
+os.environ.setdefault("ADMIN_PASSWORD_SHA256", "a" * 64)
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.repositories.metrics import MonthlyMetricRecord  # noqa: E402
+from app.schemas.enums import MonthlyMetric, MonthlyRange  # noqa: E402
+from app.schemas.responses import (  # noqa: E402
+    MonthlyMetricPoint,
+    MonthlyMetricSeries,
+    MonthlyMetricsBatchResponse,
+    MonthlyMetricsResponse,
+)
+from app.services.metrics import (  # noqa: E402
+    _aggregate_monthly,
+    _monthly_series_payload,
+    resolve_monthly_value,
+)
+
+ROWS = [
+    MonthlyMetricRecord(
+        month=date(2023 + index // 12, index % 12 + 1, 1),
+        revenue=100000.0 + index,
+        bookings_count=40 + index,
+        lvl2p=10,
+        min_booking=1000.0,
+        max_booking=9000.0,
+        avg_check=2500.0,
+        avg_stay_days=2.5,
+        bonus_spent_sum=500.0,
+        services_amount=2000.0,
+    )
+    for index in range(24)
+]
+METRIC = MonthlyMetric.revenue
+RANGE = MonthlyRange.last_12_months
+
+
+def _legacy_render(model: Any, adapter: TypeAdapter[Any]) -> bytes:
+    validated = adapter.validate_python(model, from_attributes=True)
+    content = jsonable_encoder(validated)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _legacy_series(metric: MonthlyMetric) -> MonthlyMetricSeries:
+    aggregation = _aggregate_monthly(ROWS)
+    return MonthlyMetricSeries(
+        metric=metric,
+        points=[
+            MonthlyMetricPoint(month=row.month, value=resolve_monthly_value(metric, row))
+            for row in ROWS
+        ],
+        aggregate=aggregation.finalize(metric, has_points=True),
+    )
+
+
+def legacy_monthly(adapter: TypeAdapter[Any] = TypeAdapter(MonthlyMetricsResponse)) -> bytes:
+    series = _legacy_series(METRIC)
+    model = MonthlyMetricsResponse(
+        metric=METRIC,
+        range=RANGE,
+        date_field="created_at",
+        points=series.points,
+        aggregate=series.aggregate,
+    )
+    return _legacy_render(model, adapter)
+
+
+def fast_monthly() -> bytes:
+    series = _monthly_series_payload(METRIC, ROWS, _aggregate_monthly(ROWS))
+    return orjson.dumps(
+        {
+            "metric": METRIC.value,
+            "range": RANGE.value,
+            "date_field": "created_at",
+            "points": series["points"],
+            "aggregate": series["aggregate"],
+        }
+    )
+
+
+def legacy_batch(adapter: TypeAdapter[Any] = TypeAdapter(MonthlyMetricsBatchResponse)) -> bytes:
+    model = MonthlyMetricsBatchResponse(
+        range=RANGE,
+        date_field="created_at",
+        series=[_legacy_series(metric) for metric in MonthlyMetric],
+    )
+    return _legacy_render(model, adapter)
+
+
+def fast_batch() -> bytes:
+    aggregation = _aggregate_monthly(ROWS)
+    return orjson.dumps(
+        {
+            "range": RANGE.value,
+            "date_field": "created_at",
+            "series": [
+                _monthly_series_payload(metric, ROWS, aggregation) for metric in MonthlyMetric
+            ],
+        }
+    )
+
+
+def _measure(func: Callable[[], bytes], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    assert json.loads(legacy_monthly()) == json.loads(fast_monthly())
+    assert json.loads(legacy_batch()) == json.loads(fast_batch())
+
+    print(f"{len(ROWS)} месяцев в ряду")
+    for label, legacy, fast in (
+        ("/api/metrics/monthly", legacy_monthly, fast_monthly),
+        ("/api/metrics/monthly/batch", legacy_batch, fast_batch),
+    ):
+        legacy_us = _measure(legacy, args.number)
+        fast_us = _measure(fast, args.number)
+        print(
+            f"{label:<28} Pydantic {legacy_us:8.1f} µs  orjson {fast_us:7.1f} µs  "
+            f"экономия {legacy_us - fast_us:7.1f} µs ({legacy_us / fast_us:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from .errors import RateLimitExceeded
 from .limiter import Limiter
-from .middleware import SlowAPIMiddleware
+from .middleware import RateLimitMiddleware, SlowAPIMiddleware
+from .storage import MemoryStorage, RateLimitStorage, storage_from_url
 
 
 async def _rate_limit_exceeded_handler(request, exc):
@@ -16,7 +17,11 @@ async def _rate_limit_exceeded_handler(request, exc):
 
 __all__ = [
     "Limiter",
+    "MemoryStorage",
     "RateLimitExceeded",
+    "RateLimitMiddleware",
+    "RateLimitStorage",
     "SlowAPIMiddleware",
     "_rate_limit_exceeded_handler",
+    "storage_from_url",
 ]
@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-import asyncio
 import math
-import time
-from collections import deque
 from dataclasses import dataclass
-from typing import Callable, Deque, Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
 from fastapi import Request
 from starlette.responses import JSONResponse
 
 from .errors import RateLimitExceeded
+from .storage import MemoryStorage, RateLimitStorage
 
 LimitKey = tuple[str, str]
 
@@ -58,21 +56,34 @@ def _parse_limit(limit_value: str) -> RateLimit:
 
 
 class Limiter:
-    """A lightweight in-memory request rate limiter."""
+    """A lightweight request rate limiter.
+
+    Limits are enforced with a sliding-window counter: for every
+    ``(bucket, client)`` pair only the request counts of the current and the
+    previous fixed window are stored, so memory does not depend on the
+    limit's count. A ``count/period`` limit keeps its meaning: a client gets a
+    burst of ``count`` requests and no window of length ``period`` holds more
+    than ``count`` (see :func:`~slowapi.storage.next_window`).
+
+    State lives in ``storage``: per process by default (:class:`MemoryStorage`),
+    or shared between workers with :class:`~slowapi.redis_storage.RedisStorage`.
+    """
 
     def __init__(
         self,
         *,
         key_func: Callable[[Request], str],
         default_limits: Optional[Iterable[str]] = None,
+        storage: Optional[RateLimitStorage] = None,
     ) -> None:
         self.key_func = key_func
+        self.storage: RateLimitStorage = storage or MemoryStorage()
         self._default_limits: List[RateLimit] = [
             _parse_limit(value) for value in (default_limits or [])
         ]
         self._route_limits: Dict[object, List[RateLimit]] = {}
-        self._hits: Dict[tuple[str, str], Deque[float]] = {}
-        self._lock = asyncio.Lock()
+        # endpoint -> applicable (bucket id, limit) pairs, resolved once
+        self._buckets: Dict[object | None, tuple[tuple[str, RateLimit], ...]] = {}
 
     def limit(self, limit_value: str) -> Callable[[Callable[..., object]], Callable[..., object]]:
         limit = _parse_limit(limit_value)
@@ -80,24 +91,43 @@ class Limiter:
         def decorator(func: Callable[..., object]) -> Callable[..., object]:
             limits = self._route_limits.setdefault(func, [])
             limits.append(limit)
+            self._buckets.clear()
             return func
 
         return decorator
 
+    @property
+    def limited_endpoints(self) -> tuple[object, ...]:
+        """Endpoints decorated with :meth:`limit`."""
+        return tuple(self._route_limits)
+
     async def check_request(self, request: Request) -> None:
-        key = self.key_func(request)
-        endpoint = request.scope.get("endpoint")
-        limits: List[RateLimit] = list(self._default_limits)
-        if endpoint is not None:
-            limits.extend(self._route_limits.get(endpoint, []))
+        await self.hit(self.key_func(request), request.scope.get("endpoint"))
+
+    async def hit(self, key: str, endpoint: object | None = None) -> None:
+        """Count one request from ``key`` or raise :class:`RateLimitExceeded`.
 
-        async with self._lock:
-            for limit in limits:
-                bucket_id = self._resolve_bucket_id(endpoint, limit)
-                self._enforce_limit(bucket_id, key, limit)
+        The request is recorded only if every applicable limit allows it.
+        """
+        await self.storage.acquire(key, self.buckets_for(endpoint))
+
+    def buckets_for(self, endpoint: object | None) -> tuple[tuple[str, RateLimit], ...]:
+        """``(bucket id, limit)`` pairs that apply to ``endpoint``."""
+        buckets = self._buckets.get(endpoint)
+        return buckets if buckets is not None else self._resolve_buckets(endpoint)
 
     def reset(self) -> None:
-        self._hits.clear()
+        """Forget all recorded requests of the per-process :class:`MemoryStorage`.
+
+        A shared storage needs network I/O; use :meth:`areset` for it.
+        """
+        if not isinstance(self.storage, MemoryStorage):
+            raise TypeError("reset() works with MemoryStorage only; await areset() instead")
+        self.storage.clear()
+
+    async def areset(self) -> None:
+        """Forget all recorded requests in any storage."""
+        await self.storage.reset()
 
     async def _rate_limit_exceeded_handler(
         self, request: Request, exc: RateLimitExceeded
@@ -107,25 +137,21 @@ class Limiter:
             headers["Retry-After"] = str(int(math.ceil(exc.retry_after)))
         return JSONResponse(status_code=429, content={"detail": exc.detail}, headers=headers)
 
+    def _resolve_buckets(self, endpoint: object | None) -> tuple[tuple[str, RateLimit], ...]:
+        limits: List[RateLimit] = list(self._default_limits)
+        if endpoint is not None:
+            limits.extend(self._route_limits.get(endpoint, []))
+        buckets = tuple((self._resolve_bucket_id(endpoint, limit), limit) for limit in limits)
+        self._buckets[endpoint] = buckets
+        return buckets
+
     def _resolve_bucket_id(self, endpoint: object | None, limit: RateLimit) -> str:
         if endpoint is None:
             return f"default:{limit.signature}"
-        return f"route:{id(endpoint)}:{limit.signature}"
-
-    def _enforce_limit(self, bucket_id: str, key: str, limit: RateLimit) -> None:
-        now = time.monotonic()
-        storage_key = (bucket_id, key)
-        hits = self._hits.setdefault(storage_key, deque())
-
-        while hits and now - hits[0] >= limit.seconds:
-            hits.popleft()
-
-        if len(hits) >= limit.count:
-            oldest = hits[0]
-            retry_after = max(0.0, limit.seconds - (now - oldest))
-            raise RateLimitExceeded(retry_after=retry_after)
-
-        hits.append(now)
+        # Use the name, not id(): shared storages need the same bucket in every worker.
+        name = getattr(endpoint, "__qualname__", None) or repr(endpoint)
+        module = getattr(endpoint, "__module__", None)
+        return f"route:{module}.{name}:{limit.signature}" if module else f"route:{name}:{limit.signature}"
 
 
-__all__ = ["Limiter"]
+__all__ = ["Limiter", "RateLimit"]
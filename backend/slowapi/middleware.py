@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .errors import RateLimitExceeded
 
@@ -17,4 +24,94 @@ class SlowAPIMiddleware(BaseHTTPMiddleware):
         return response
 
 
-__all__ = ["SlowAPIMiddleware"]
+@dataclass(frozen=True)
+class _LimitedRoute:
+    path_regex: re.Pattern[str]
+    methods: Optional[frozenset[str]]
+    endpoint: object
+
+
+class RateLimitMiddleware:
+    """Pure ASGI rate limiting middleware.
+
+    Unlike :class:`SlowAPIMiddleware` it does not wrap the downstream app in a
+    task and memory stream, so streaming responses pass through untouched.
+    Middleware runs before routing, so ``scope["endpoint"]`` is not known yet:
+    routes carrying ``@limiter.limit`` are looked up once, on the first request,
+    and matched by method and path; every other request uses the default
+    limits without touching the routing table.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._routes: Optional[tuple[_LimitedRoute, ...]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        application = scope.get("app")
+        limiter = getattr(getattr(application, "state", None), "limiter", None)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        routes = self._routes
+        if routes is None:
+            routes = self._routes = _resolve_limited_routes(application, limiter)
+
+        request = Request(scope, receive)
+        try:
+            await limiter.hit(limiter.key_func(request), _match_endpoint(routes, scope))
+        except RateLimitExceeded as exc:
+            response = await limiter._rate_limit_exceeded_handler(request, exc)
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def _match_endpoint(routes: tuple[_LimitedRoute, ...], scope: Scope) -> object | None:
+    if not routes:
+        return None
+    path = scope["path"]
+    method = scope["method"]
+    for route in routes:
+        if route.methods is not None and method not in route.methods:
+            continue
+        if route.path_regex.match(path):
+            return route.endpoint
+    return None
+
+
+def _resolve_limited_routes(application: Any, limiter: Any) -> tuple[_LimitedRoute, ...]:
+    limited = set(limiter.limited_endpoints)
+    resolved = []
+    for route in _iter_routes(getattr(application, "routes", ())):
+        endpoint = getattr(route, "endpoint", None)
+        path = getattr(route, "path", None)
+        if endpoint not in limited or not isinstance(path, str):
+            continue
+        path_regex, _, _ = compile_path(path)
+        methods = getattr(route, "methods", None)
+        resolved.append(
+            _LimitedRoute(
+                path_regex=path_regex,
+                methods=frozenset(methods) if methods else None,
+                endpoint=endpoint,
+            )
+        )
+    return tuple(resolved)
+
+
+def _iter_routes(routes: Iterable[Any]) -> Iterator[Any]:
+    for route in routes:
+        # Newer FastAPI versions keep included routers as lazy branches.
+        candidates = getattr(route, "effective_candidates", None)
+        if callable(candidates):
+            yield from _iter_routes(candidates())
+        else:
+            yield route
+
+
+__all__ = ["RateLimitMiddleware", "SlowAPIMiddleware"]
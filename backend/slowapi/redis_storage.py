@@ -0,0 +1,174 @@
+"""Shared rate-limit storage in Redis, built on the optional ``redis`` package.
+
+All limits of a request are checked and recorded by one Lua script, registered
+with ``register_script`` and executed with ``EVALSHA`` in a single round trip.
+The script reads the clock with ``TIME`` on the server, so workers with skewed
+clocks still agree. Concurrent requests share a bounded connection pool.
+
+If the server is unreachable or times out the request is allowed (fail open),
+so an outage of the limiter store does not take the API down. After a failure
+Redis is not contacted again until an exponentially growing backoff expires;
+the outage is logged once and its end is logged again. Any other error, such as
+``WRONGTYPE`` or ``OOM`` raised by the script, is not an outage and propagates.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Callable, Union
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from .errors import RateLimitExceeded
+from .storage import Buckets, RateLimitStorage
+
+_log = logger.bind(component="ratelimit")
+
+# KEYS: one hash per limit. ARGV: count and period (µs) per limit.
+# Returns 0 when the request is admitted, otherwise the retry delay in µs.
+# Same algorithm as ``slowapi.storage.next_window``.
+WINDOW_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000000 + tonumber(now_parts[2])
+local states = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+  local count = tonumber(ARGV[i * 2 - 1])
+  local period = tonumber(ARGV[i * 2])
+  local window = math.floor(now / period)
+  local previous, previous_until, current, current_until = 0, 0, 0, 0
+  local stored = redis.call('HMGET', key, 'w', 'p', 'pu', 'c', 'cu')
+  local stored_window = tonumber(stored[1])
+  if stored_window == window then
+    previous, previous_until = tonumber(stored[2]), tonumber(stored[3])
+    current, current_until = tonumber(stored[4]), tonumber(stored[5])
+  elseif stored_window == window - 1 then
+    previous, previous_until = tonumber(stored[4]), tonumber(stored[5])
+  end
+  local in_window = current
+  if now < previous_until then
+    in_window = in_window + previous
+  end
+  if in_window >= count then
+    local retry_at = previous_until
+    if current >= count then
+      retry_at = current_until
+    end
+    retry_after = math.max(retry_after, retry_at - now)
+  end
+  states[i] = {window, previous, previous_until, current + 1, now + period}
+end
+if retry_after > 0 then
+  return retry_after
+end
+for i, key in ipairs(KEYS) do
+  local state = states[i]
+  local values = {}
+  for j = 1, 5 do
+    values[j] = string.format('%.0f', state[j])
+  end
+  redis.call('HSET', key, 'w', values[1], 'p', values[2], 'pu', values[3],
+    'c', values[4], 'cu', values[5])
+  redis.call('PEXPIRE', key, math.max(1, math.ceil((state[5] - now) / 1000)))
+end
+return 0
+"""
+WINDOW_SCRIPT_SHA = hashlib.sha1(WINDOW_SCRIPT.encode("utf-8")).hexdigest()
+
+_DELETE_BATCH = 500
+
+
+class RedisStorage(RateLimitStorage):
+    """Sliding-window counters kept in Redis."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        prefix: str = "u4s:ratelimit:window:",
+        timeout: float = 0.5,
+        max_connections: int = 32,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        # No retries inside the client: after a failure the backoff below decides
+        # when Redis is contacted again, and the request itself is allowed.
+        self._pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            retry=Retry(NoBackoff(), 0),
+            max_connections=max_connections,
+            timeout=timeout,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        self._client = aioredis.Redis(connection_pool=self._pool)
+        self._script = self._client.register_script(WINDOW_SCRIPT)
+        self._prefix = prefix
+        self._initial_backoff = backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+    async def acquire(self, key: str, buckets: Buckets) -> None:
+        if self._backoff and self._clock() < self._retry_at:
+            return
+
+        keys = [f"{self._prefix}{bucket_id}:{key}" for bucket_id, _ in buckets]
+        args: list[int] = []
+        for _, limit in buckets:
+            args.append(limit.count)
+            args.append(round(limit.seconds * 1_000_000))
+
+        try:
+            retry_after_us = await self._script(keys=keys, args=args)
+        except (RedisConnectionError, RedisTimeoutError) as exc:
+            self._mark_unavailable(exc)
+            return
+        self._mark_available()
+
+        if isinstance(retry_after_us, int) and retry_after_us > 0:
+            raise RateLimitExceeded(retry_after=retry_after_us / 1_000_000)
+
+    async def reset(self) -> None:
+        """Delete every key under the storage prefix with ``SCAN`` and ``DEL``.
+
+        Unlike ``acquire`` this does not fail open: errors are raised.
+        """
+        batch: list[Union[str, bytes]] = []
+        pattern = _escape_glob(self._prefix) + "*"
+        async for name in self._client.scan_iter(match=pattern, count=1000):
+            batch.append(name)
+            if len(batch) >= _DELETE_BATCH:
+                await self._client.delete(*batch)
+                batch.clear()
+        if batch:
+            await self._client.delete(*batch)
+
+    async def aclose(self) -> None:
+        await self._client.aclose(close_connection_pool=True)
+
+    def _mark_unavailable(self, exc: Exception) -> None:
+        if not self._backoff:
+            _log.warning("Rate limit storage unavailable, requests allowed: {}", exc)
+        self._backoff = min(max(self._backoff * 2, self._initial_backoff), self._max_backoff)
+        self._retry_at = self._clock() + self._backoff
+
+    def _mark_available(self) -> None:
+        if self._backoff:
+            _log.info("Rate limit storage is available again")
+            self._backoff = 0.0
+
+
+def _escape_glob(value: str) -> str:
+    return "".join(f"\\{char}" if char in "*?[]\\" else char for char in value)
+
+
+__all__ = ["RedisStorage", "WINDOW_SCRIPT", "WINDOW_SCRIPT_SHA"]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence
+
+from .errors import RateLimitExceeded
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .limiter import RateLimit
+
+# (bucket id, limit) pairs that apply to a request
+Buckets = Sequence[tuple[str, "RateLimit"]]
+
+# Per-key state of one limit: index of the fixed window of the last request,
+# requests counted in the window before it and when the last of them leaves
+# the sliding window, requests in the last window and when the last of them
+# leaves the sliding window.
+WindowState = tuple[int, int, float, int, float]
+
+
+class RateLimitStorage(ABC):
+    """Where ``Limiter`` keeps sliding-window counters.
+
+    ``acquire`` must check every bucket and record the request only if all of
+    them admit it, atomically with respect to other callers sharing the store.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, buckets: Buckets) -> None:
+        """Count one request from ``key`` or raise :class:`RateLimitExceeded`."""
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Forget all recorded requests."""
+
+    async def aclose(self) -> None:
+        """Release connections held by the storage."""
+
+
+class MemoryStorage(RateLimitStorage):
+    """Per-process storage: one :data:`WindowState` per key.
+
+    A key whose requests have all left the sliding window is
+    indistinguishable from a new client, so such keys are dropped by a sweep
+    that runs at most every ``eviction_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        eviction_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        # bucket id -> client key -> window state
+        self._windows: Dict[str, Dict[str, WindowState]] = {}
+        self._eviction_interval = eviction_interval
+        self._clock = clock
+        self._next_eviction = clock() + eviction_interval
+
+    async def acquire(self, key: str, buckets: Buckets) -> None:
+        self.hit(key, buckets)
+
+    def hit(self, key: str, buckets: Buckets) -> None:
+        """Synchronous ``acquire``; there is no await point, so no lock is needed."""
+        now = self._clock()
+        if now >= self._next_eviction:
+            self.evict_idle(now)
+
+        if len(buckets) == 1:
+            bucket_id, limit = buckets[0]
+            bucket = self._bucket(bucket_id)
+            bucket[key] = next_window(bucket.get(key), now, limit)
+            return
+
+        updates = []
+        for bucket_id, limit in buckets:
+            bucket = self._bucket(bucket_id)
+            updates.append((bucket, next_window(bucket.get(key), now, limit)))
+        for bucket, state in updates:
+            bucket[key] = state
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop keys whose requests have all left the window; return how many."""
+        now = self._clock() if now is None else now
+        evicted = 0
+        for bucket in self._windows.values():
+            idle = [key for key, state in bucket.items() if state[4] <= now]
+            for key in idle:
+                del bucket[key]
+            evicted += len(idle)
+        self._next_eviction = now + self._eviction_interval
+        return evicted
+
+    @property
+    def tracked_keys(self) -> int:
+        return sum(len(bucket) for bucket in self._windows.values())
+
+    async def reset(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        """Synchronous ``reset``."""
+        self._windows.clear()
+
+    def _bucket(self, bucket_id: str) -> Dict[str, WindowState]:
+        bucket = self._windows.get(bucket_id)
+        if bucket is None:
+            bucket = self._windows[bucket_id] = {}
+        return bucket
+
+
+def next_window(state: Optional[WindowState], now: float, limit: "RateLimit") -> WindowState:
+    """Sliding-window step: the key's next state, or :class:`RateLimitExceeded`.
+
+    Requests are counted in fixed windows of ``period`` seconds. Requests of
+    the previous window count in full until ``period`` after the last of
+    them, so no window of length ``period`` ever holds more than ``count``
+    requests, and a new client still gets a burst of ``count``.
+    """
+    period = limit.seconds
+    window = int(now // period)
+    previous, previous_until, current, current_until = 0, 0.0, 0, 0.0
+    if state is not None:
+        if state[0] == window:
+            _, previous, previous_until, current, current_until = state
+        elif state[0] == window - 1:
+            previous, previous_until = state[3], state[4]
+    if current + (previous if now < previous_until else 0) >= limit.count:
+        retry_at = current_until if current >= limit.count else previous_until
+        raise RateLimitExceeded(retry_after=retry_at - now)
+    return window, previous, previous_until, current + 1, now + period
+
+
+def storage_from_url(url: Optional[str], **options: object) -> RateLimitStorage:
+    """Build a storage from ``memory://`` (the default) or ``redis://host:port/db``."""
+    if not url or url.startswith("memory://"):
+        return MemoryStorage()
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            from .redis_storage import RedisStorage
+        except ImportError as exc:
+            raise RuntimeError("Redis rate limit storage requires the redis package") from exc
+
+        return RedisStorage(url, **options)  # type: ignore[arg-type]
+    raise ValueError(f"Unsupported rate limit storage: {url}")
+
+
+__all__ = [
+    "Buckets",
+    "MemoryStorage",
+    "RateLimitStorage",
+    "WindowState",
+    "next_window",
+    "storage_from_url",
+]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from slowapi import Limiter, MemoryStorage, RateLimitMiddleware
+from slowapi.util import get_remote_address
+
+
+def _build_app() -> FastAPI:
+    limiter = Limiter(
+        key_func=get_remote_address, default_limits=["3/minute"], storage=MemoryStorage()
+    )
+    router = APIRouter(prefix="/api")
+
+    @router.post("/login")
+    @limiter.limit("1/minute")
+    async def login() -> dict[str, bool]:
+        return {"ok": True}
+
+    @router.get("/items/{item_id}")
+    async def item(item_id: int) -> dict[str, int]:
+        return {"id": item_id}
+
+    @router.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks() -> AsyncIterator[bytes]:
+            for index in range(3):
+                yield f"{index}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_middleware(RateLimitMiddleware)
+    app.include_router(router)
+    return app
+
+
+def _call(
+    app: FastAPI, method: str, path: str, client: str = "10.0.0.1"
+) -> tuple[int, dict[str, str], bytes]:
+    messages: list[dict[str, Any]] = []
+    requested = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal requested
+        if requested:
+            # Клиент не отключается, пока не получит ответ целиком.
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": (client, 50000),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return start["status"], headers, body
+
+
+def test_route_limit_is_applied_before_routing() -> None:
+    app = _build_app()
+
+    assert _call(app, "POST", "/api/login")[0] == 200
+    status, headers, _ = _call(app, "POST", "/api/login")
+
+    assert status == 429
+    assert headers["retry-after"] == "60"
+    # Лимит маршрута не расходует общий лимит других маршрутов.
+    assert _call(app, "GET", "/api/items/1")[0] == 200
+    assert _call(app, "POST", "/api/login", client="10.0.0.2")[0] == 200
+
+
+def test_default_limit_applies_to_other_routes() -> None:
+    app = _build_app()
+
+    statuses = [_call(app, "GET", f"/api/items/{index}")[0] for index in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_streaming_responses_pass_through() -> None:
+    app = _build_app()
+
+    status, headers, body = _call(app, "GET", "/api/stream")
+
+    assert status == 200
+    assert headers["content-type"].startswith("text/plain")
+    assert body == b"0\n1\n2\n"
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.core.cache import LRUCache
+from app.core.security import TokenPayload, create_access_token
+from app.services import auth as auth_service
+from app.services.auth import AdminAuthError, AdminTokenService
+
+SECRET = "secret"
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def verify_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    original = auth_service.verify_access_token
+
+    def counting_verify(*, token: str, secret: str) -> TokenPayload:
+        calls.append(token)
+        return original(token=token, secret=secret)
+
+    monkeypatch.setattr(auth_service, "verify_access_token", counting_verify)
+    return calls
+
+
+def _service(clock: _Clock) -> AdminTokenService:
+    cache = LRUCache[str, TokenPayload]("auth_tokens_test", max_entries=8, clock=clock)
+    return AdminTokenService(secret=SECRET, ttl_seconds=60, cache=cache)
+
+
+def test_repeated_token_is_verified_once(verify_calls: list[str]) -> None:
+    token, payload = create_access_token(secret=SECRET, subject="admin", ttl_seconds=60)
+    service = _service(_Clock(payload.issued_at))
+
+    first = service.verify_bearer(f"Bearer {token}")
+    second = service.verify_bearer(f"bearer  {token}")
+
+    assert first == second == payload
+    assert verify_calls == [token]
+
+
+def test_cached_token_expires_at_exp(verify_calls: list[str]) -> None:
+    token, payload = create_access_token(secret=SECRET, subject="admin", ttl_seconds=60)
+    clock = _Clock(payload.issued_at)
+    service = _service(clock)
+    service.verify_bearer(f"Bearer {token}")
+
+    clock.now = payload.expires_at
+
+    # После exp запись больше не отдаётся из кеша: токен снова проходит полную проверку.
+    assert service.cache is not None and service.cache.get(token) is None
+    service.verify_bearer(f"Bearer {token}")
+    assert verify_calls == [token, token]
+
+
+def test_invalid_tokens_are_not_cached(verify_calls: list[str]) -> None:
+    token, payload = create_access_token(secret="other", subject="admin", ttl_seconds=60)
+    service = _service(_Clock(payload.issued_at))
+
+    for _ in range(2):
+        with pytest.raises(AdminAuthError):
+            service.verify_bearer(f"Bearer {token}")
+
+    assert verify_calls == [token, token]
+    assert service.cache is not None and len(service.cache) == 0
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+from psycopg import sql
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.migrations import REQUIRED_INDEXES, discover_migrations, find_index_problems
+from app.migrations.runner import _drop_invalid_index
+from app.repositories import metrics as metrics_repository
+
+
+def _index(
+    table: str, name: str, keys: list[str], include: list[str], valid: bool = True
+) -> dict[str, Any]:
+    return {
+        "table_name": table,
+        "table_exists": True,
+        "index_name": name,
+        "is_valid": valid,
+        "key_count": len(keys),
+        "columns": keys + include,
+    }
+
+
+# Так каталог PostgreSQL описывает индексы после всех поставляемых миграций.
+SHIPPED_CATALOG = [
+    _index("guests", "guests_pkey", ["id"], []),
+    _index(
+        "guests",
+        "guests_created_at_covering_idx",
+        ["created_at"],
+        ["total_amount", "loyalty_level", "checkin_date", "bonus_spent"],
+    ),
+    _index(
+        "guests",
+        "guests_checkin_date_covering_idx",
+        ["checkin_date"],
+        ["total_amount", "loyalty_level", "created_at", "bonus_spent"],
+    ),
+    _index(
+        "uslugi_daily_mv",
+        "uslugi_daily_mv_consumption_date_covering_idx",
+        ["consumption_date"],
+        ["uslugi_type", "total_amount"],
+    ),
+    _index(
+        "uslugi_daily_mv",
+        "uslugi_daily_mv_service_type_normalized_idx",
+        [
+            "COALESCE(NULLIF(btrim(uslugi_type), ''::text), 'Без категории'::text)",
+            "consumption_date",
+        ],
+        ["total_amount"],
+    ),
+]
+
+
+def test_shipped_migrations_change_indexes_concurrently() -> None:
+    migrations = discover_migrations()
+    assert [migration.version for migration in migrations] == ["0001", "0002"]
+    statements = [statement for migration in migrations for statement in migration.statements]
+    created = [
+        statement
+        for statement in statements
+        if statement.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS")
+    ]
+    assert len(created) == len(REQUIRED_INDEXES) + 1
+    assert all(
+        statement in created or statement.startswith("DROP INDEX CONCURRENTLY IF EXISTS")
+        for statement in statements
+    )
+
+
+def test_service_type_index_matches_query_expression() -> None:
+    fragment = metrics_repository._SERVICE_TYPE.as_string(None)
+    # Фильтр помесячного ряда и группировка по услугам — одно и то же выражение.
+    assert f"AND {fragment} = %(service_type)s" in metrics_repository._monthly_services_query().text
+    assert f"GROUP BY {fragment}" in metrics_repository._services_totals_query(True, True).text
+
+    expression = fragment.replace("u.uslugi_type", "uslugi_type")
+    assert REQUIRED_INDEXES[-1].columns[0] == expression
+    assert expression in discover_migrations()[-1].text
+
+
+def test_shipped_indexes_satisfy_requirements() -> None:
+    assert find_index_problems(REQUIRED_INDEXES, SHIPPED_CATALOG) == []
+
+
+def test_audit_reports_missing_invalid_and_uncovered_indexes() -> None:
+    catalog = [
+        _index("guests", "guests_created_at_idx", ["created_at"], []),
+        _index(
+            "guests",
+            "guests_checkin_date_covering_idx",
+            ["checkin_date"],
+            ["total_amount", "loyalty_level", "created_at", "bonus_spent"],
+            valid=False,
+        ),
+        {
+            "table_name": "uslugi_daily_mv",
+            "table_exists": False,
+            "index_name": None,
+            "is_valid": None,
+            "key_count": None,
+            "columns": [],
+        },
+    ]
+
+    problems = find_index_problems(REQUIRED_INDEXES, catalog)
+
+    found = [(item.requirement.table, item.problem, item.index_name) for item in problems]
+    assert found == [
+        ("guests", "not_covering", "guests_created_at_idx"),
+        ("guests", "invalid", "guests_checkin_date_covering_idx"),
+        ("uslugi_daily_mv", "missing_table", None),
+        ("uslugi_daily_mv", "missing_table", None),
+    ]
+
+
+def test_index_with_other_leading_column_does_not_count() -> None:
+    catalog = [
+        _index(
+            "guests",
+            "guests_loyalty_created_idx",
+            ["loyalty_level", "created_at"],
+            ["total_amount", "checkin_date", "bonus_spent"],
+        )
+    ]
+
+    problems = find_index_problems(REQUIRED_INDEXES[:1], catalog)
+
+    assert [problem.problem for problem in problems] == ["missing"]
+
+
+def test_invalid_index_hint_suggests_reindex() -> None:
+    invalid, missing = find_index_problems(
+        REQUIRED_INDEXES[:2],
+        [
+            _index("guests", "guests_pkey", ["id"], []),
+            _index(
+                "guests",
+                "guests_created_at_covering_idx",
+                ["created_at"],
+                ["total_amount", "loyalty_level", "checkin_date", "bonus_spent"],
+                valid=False,
+            ),
+        ],
+    )
+
+    assert invalid.hint == "REINDEX INDEX CONCURRENTLY guests_created_at_covering_idx"
+    assert missing.hint == "python -m app.migrations upgrade"
+
+
+class _Cursor:
+    def __init__(self, row: Optional[tuple[str, str]]) -> None:
+        self.row = row
+
+    async def fetchone(self) -> Optional[tuple[str, str]]:
+        return self.row
+
+
+class _Connection:
+    def __init__(self, invalid: set[str]) -> None:
+        self.invalid = invalid
+        self.executed: list[str] = []
+
+    async def execute(self, query: Any, params: Optional[tuple[Any, ...]] = None) -> _Cursor:
+        if params is not None:
+            name = params[0]
+            return _Cursor(("public", name) if name in self.invalid else None)
+        self.executed.append(query.as_string(None) if isinstance(query, sql.Composable) else query)
+        return _Cursor(None)
+
+
+def test_invalid_index_is_dropped_before_create() -> None:
+    statements = discover_migrations()[0].statements
+    conn = _Connection({"guests_checkin_date_covering_idx"})
+
+    async def scenario() -> None:
+        for statement in statements[:2]:
+            await _drop_invalid_index(conn, statement)  # type: ignore[arg-type]
+
+    asyncio.run(scenario())
+
+    assert conn.executed == [
+        'DROP INDEX CONCURRENTLY IF EXISTS "public"."guests_checkin_date_covering_idx"'
+    ]
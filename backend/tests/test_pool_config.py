@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+
+import pytest
+from prometheus_client import REGISTRY
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import app.db as db
+from app.db.pool_metrics import PoolStatsCollector
+
+POOL_OPTIONS = {"timeout": 30.0, "max_waiting": 0, "max_lifetime": 3600.0, "max_idle": 300.0}
+
+
+@pytest.fixture(autouse=True)
+def _restore_pool_config() -> Iterator[None]:
+    saved = dict(db._pool_config)
+    try:
+        yield
+    finally:
+        db._pool_config.clear()
+        db._pool_config.update(saved)
+
+
+@pytest.mark.parametrize(("min_size", "max_size"), [(-1, 5), (0, 0), (6, 5)])
+def test_configure_pool_rejects_invalid_sizes(min_size: int, max_size: int) -> None:
+    before = dict(db._pool_config)
+    with pytest.raises(ValueError):
+        db.configure_pool(min_size=min_size, max_size=max_size, **POOL_OPTIONS)
+    assert db._pool_config == before
+
+
+def test_configure_pool_accepts_lazy_pool() -> None:
+    db.configure_pool(min_size=0, max_size=4, **POOL_OPTIONS)
+    assert db._pool_config["min_size"] == 0 and db._pool_config["max_size"] == 4
+
+
+class _FakePool:
+    def __init__(self, name: str, stats: dict[str, int], delay: float = 0.0) -> None:
+        self.name = name
+        self._stats = stats
+        self._delay = delay
+
+    def get_stats(self) -> dict[str, int]:
+        return self._stats
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[object]:
+        await asyncio.sleep(self._delay)
+        yield object()
+
+
+def test_collector_publishes_pool_stats() -> None:
+    pool = _FakePool(
+        "primary:5432/db",
+        {
+            "pool_min": 2,
+            "pool_max": 10,
+            "pool_size": 5,
+            "pool_available": 2,
+            "requests_num": 7,
+            "requests_wait_ms": 1500,
+        },
+    )
+    samples = {
+        (sample.name, sample.labels["pool"]): sample.value
+        for family in PoolStatsCollector(lambda: [pool]).collect()
+        for sample in family.samples
+    }
+
+    assert samples[("u4s_db_pool_max_size", pool.name)] == 10
+    assert samples[("u4s_db_pool_size", pool.name)] == 5
+    assert samples[("u4s_db_pool_in_use", pool.name)] == 3
+    assert samples[("u4s_db_pool_requests_total", pool.name)] == 7
+    assert samples[("u4s_db_pool_requests_wait_seconds_total", pool.name)] == 1.5
+    # Ключей, которых нет в get_stats(), пул ещё не наблюдал — публикуется ноль.
+    assert samples[("u4s_db_pool_connections_lost_total", pool.name)] == 0
+
+
+def test_get_conn_observes_pool_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    pool = _FakePool("wait-test/db", {}, delay=0.02)
+
+    async def fake_get_or_create_pool(dsn: str, **_: Any) -> _FakePool:
+        return pool
+
+    monkeypatch.setattr(db, "_get_or_create_pool", fake_get_or_create_pool)
+    labels = {"pool": pool.name}
+
+    def observed() -> tuple[float, float]:
+        count = REGISTRY.get_sample_value("u4s_db_pool_wait_seconds_count", labels) or 0.0
+        total = REGISTRY.get_sample_value("u4s_db_pool_wait_seconds_sum", labels) or 0.0
+        return count, total
+
+    count_before, sum_before = observed()
+
+    async def scenario() -> None:
+        async with db.get_conn("postgresql://wait-test/db"):
+            pass
+
+    asyncio.run(scenario())
+
+    count_after, sum_after = observed()
+    assert count_after == count_before + 1
+    assert sum_after - sum_before >= 0.02
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("redis")
+
+from redis.exceptions import ResponseError
+
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from slowapi.limiter import RateLimit
+from slowapi.redis_storage import WINDOW_SCRIPT, WINDOW_SCRIPT_SHA, RedisStorage
+from slowapi.storage import next_window
+
+
+class _RespStandIn:
+    """Минимальный сервер с протоколом Redis для тестов.
+
+    Понимает ``HELLO``, ``AUTH``, ``SELECT``, ``CLIENT``, ``SCRIPT LOAD``, ``EVALSHA``,
+    ``SCAN`` и ``DEL``;
+    сам Lua-скрипт заменён функцией :func:`~slowapi.storage.next_window` с
+    управляемыми часами. Скрипт как таковой проверяют тесты с ``redis-server``.
+    """
+
+    def __init__(self) -> None:
+        self.now_us = 1_700_000_000_000_000
+        self.values: dict[bytes, tuple[Any, int]] = {}
+        self.scripts: set[str] = set()
+        self.commands: list[bytes] = []
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"redis://:secret@{host}:{port}/2"
+
+    async def stop(self) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                args = await self._read_command(reader)
+                self.commands.append(args[0].upper())
+                writer.write(self._dispatch(args))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> list[bytes]:
+        header = await reader.readuntil(b"\r\n")
+        assert header.startswith(b"*")
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _dispatch(self, args: list[bytes]) -> bytes:
+        command = args[0].upper()
+        if command == b"AUTH" or (command == b"HELLO" and b"AUTH" in args):
+            if args[-1] != b"secret":
+                return b"-WRONGPASS invalid password\r\n"
+        if command == b"AUTH":
+            return b"+OK\r\n"
+        if command == b"HELLO":
+            # Используемые ответы в RESP3 выглядят так же, как в RESP2.
+            return b"%%1\r\n$5\r\nproto\r\n:%s\r\n" % args[1]
+        if command in (b"SELECT", b"CLIENT"):
+            return b"+OK\r\n"
+        if command == b"SCRIPT" and args[1].upper() == b"LOAD":
+            sha = hashlib.sha1(args[2]).hexdigest()
+            self.scripts.add(sha)
+            return b"$%d\r\n%s\r\n" % (len(sha), sha.encode())
+        if command == b"EVALSHA":
+            sha = args[1].decode()
+            if sha not in self.scripts:
+                return b"-NOSCRIPT No matching script. Please use EVAL.\r\n"
+            return self._run_window(sha, args[2:])
+        if command == b"SCAN":
+            # Вся выборка одной страницей; шаблон — префикс и «*».
+            prefix = args[3].replace(b"\\", b"")[:-1]
+            keys = [key for key in self.values if key.startswith(prefix)]
+            items = b"".join(b"$%d\r\n%s\r\n" % (len(key), key) for key in keys)
+            return b"*2\r\n$1\r\n0\r\n*%d\r\n%s" % (len(keys), items)
+        if command == b"DEL":
+            deleted = sum(1 for key in args[1:] if self.values.pop(key, None) is not None)
+            return b":%d\r\n" % deleted
+        return b"-ERR unknown command\r\n"
+
+    def _run_window(self, sha: str, args: list[bytes]) -> bytes:
+        assert sha == WINDOW_SCRIPT_SHA
+        numkeys = int(args[0])
+        keys, argv = args[1 : 1 + numkeys], [int(value) for value in args[1 + numkeys :]]
+        now = self.now_us
+        states, retry_after = [], 0
+        for index, key in enumerate(keys):
+            limit = RateLimit(count=argv[index * 2], seconds=argv[index * 2 + 1])
+            stored = self.values.get(key)
+            if stored is not None and not isinstance(stored[0], tuple):
+                return b"-WRONGTYPE Operation against a key holding the wrong kind of value\r\n"
+            state = stored[0] if stored is not None and stored[1] > now else None
+            try:
+                states.append(next_window(state, now, limit))
+            except RateLimitExceeded as exc:
+                retry_after = max(retry_after, round(exc.retry_after or 0))
+        if retry_after > 0:
+            return b":%d\r\n" % retry_after
+        for key, state in zip(keys, states):
+            self.values[key] = (state, state[4])
+        return b":0\r\n"
+
+
+def _run_with_stand_in(scenario: Callable[[_RespStandIn, str], Awaitable[Any]]) -> Any:
+    async def runner() -> Any:
+        server = _RespStandIn()
+        url = await server.start()
+        try:
+            return await scenario(server, url)
+        finally:
+            await server.stop()
+
+    return asyncio.run(runner())
+
+
+def test_script_sha_matches_script() -> None:
+    assert WINDOW_SCRIPT_SHA == hashlib.sha1(WINDOW_SCRIPT.encode()).hexdigest()
+
+
+def test_limit_is_shared_between_workers() -> None:
+    async def scenario(server: _RespStandIn, url: str) -> None:
+        def login() -> None:
+            return None
+
+        workers = []
+        for _ in range(2):
+            limiter = Limiter(key_func=lambda request: "", storage=RedisStorage(url))
+            limiter.limit("5/minute")(login)
+            workers.append(limiter)
+
+        try:
+            for attempt in range(5):
+                await workers[attempt % 2].hit("10.0.0.1", login)
+            with pytest.raises(RateLimitExceeded) as exc_info:
+                await workers[1].hit("10.0.0.1", login)
+            assert exc_info.value.retry_after == pytest.approx(60.0)
+
+            # Через минуту запросы вышли из окна: снова доступен всплеск из пяти.
+            server.now_us += 60_000_000
+            for attempt in range(5):
+                await workers[attempt % 2].hit("10.0.0.1", login)
+            with pytest.raises(RateLimitExceeded):
+                await workers[0].hit("10.0.0.1", login)
+        finally:
+            for limiter in workers:
+                await limiter.storage.aclose()
+
+    _run_with_stand_in(scenario)
+
+
+def test_one_round_trip_per_request_after_script_is_cached() -> None:
+    async def scenario(server: _RespStandIn, url: str) -> None:
+        storage = RedisStorage(url, max_connections=4)
+        limiter = Limiter(
+            key_func=lambda request: "", default_limits=["100/minute", "1000/hour"], storage=storage
+        )
+        try:
+            await limiter.hit("client-0")
+            assert server.commands[-3:] == [b"EVALSHA", b"SCRIPT", b"EVALSHA"]
+            server.commands.clear()
+
+            await asyncio.gather(*(limiter.hit(f"client-{i}") for i in range(1, 51)))
+        finally:
+            await storage.aclose()
+
+        evalsha = [command for command in server.commands if command == b"EVALSHA"]
+        assert len(evalsha) == 50
+        assert b"SCRIPT" not in server.commands
+        # Пул ограничен: одновременные запросы ждут соединение, а не открывают новые.
+        assert server.connections <= 4
+
+    _run_with_stand_in(scenario)
+
+
+def test_reset_deletes_only_prefixed_keys() -> None:
+    async def scenario(server: _RespStandIn, url: str) -> None:
+        storage = RedisStorage(url)
+        limiter = Limiter(key_func=lambda request: "", default_limits=["1/minute"], storage=storage)
+        server.values[b"other:key"] = (0, server.now_us + 60_000_000)
+        try:
+            await limiter.hit("client")
+            with pytest.raises(RateLimitExceeded):
+                await limiter.hit("client")
+
+            await limiter.areset()
+
+            assert list(server.values) == [b"other:key"]
+            await limiter.hit("client")
+        finally:
+            await storage.aclose()
+
+    _run_with_stand_in(scenario)
+
+
+def test_unreachable_storage_fails_open_and_backs_off() -> None:
+    async def scenario() -> None:
+        attempts = 0
+
+        def refuse(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            nonlocal attempts
+            attempts += 1
+            writer.close()
+
+        server = await asyncio.start_server(refuse, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        now = [100.0]
+        storage = RedisStorage(
+            f"redis://127.0.0.1:{port}/0", timeout=0.2, backoff=1.0, clock=lambda: now[0]
+        )
+        limiter = Limiter(key_func=lambda request: "", default_limits=["1/minute"], storage=storage)
+        try:
+            for _ in range(5):
+                await limiter.hit("client")
+            # Пока не истекла пауза, Redis не опрашивается на каждом запросе.
+            assert attempts == 1
+
+            now[0] += 1.0
+            await limiter.hit("client")
+            assert attempts == 2
+
+            # Пауза удваивается: через секунду повторной попытки ещё нет.
+            now[0] += 1.0
+            await limiter.hit("client")
+            assert attempts == 2
+        finally:
+            await storage.aclose()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_script_errors_are_not_treated_as_outage() -> None:
+    async def scenario(server: _RespStandIn, url: str) -> None:
+        storage = RedisStorage(url)
+        limiter = Limiter(key_func=lambda request: "", default_limits=["1/minute"], storage=storage)
+        server.values[b"u4s:ratelimit:window:default:1:60:client"] = (b"1", server.now_us + 1)
+        try:
+            with pytest.raises(ResponseError, match="WRONGTYPE"):
+                await limiter.hit("client")
+            # Ошибка скрипта не включает режим пропуска запросов.
+            with pytest.raises(ResponseError, match="WRONGTYPE"):
+                await limiter.hit("client")
+        finally:
+            await storage.aclose()
+
+    _run_with_stand_in(scenario)
+
+
+@pytest.fixture
+def redis_url(tmp_path: Path) -> Iterator[str]:
+    """Настоящий ``redis-server`` на свободном порту; без него тесты пропускаются."""
+    binary = shutil.which("redis-server")
+    if binary is None:
+        pytest.skip("redis-server is not installed")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [binary, "--port", str(port), "--bind", "127.0.0.1", "--save", "", "--appendonly", "no"],
+        cwd=tmp_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 5.0
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    pytest.skip("redis-server did not start")
+                time.sleep(0.05)
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+def test_lua_script_enforces_burst_and_retry_after(redis_url: str) -> None:
+    async def scenario() -> None:
+        storage = RedisStorage(redis_url, timeout=2.0)
+        limiter = Limiter(key_func=lambda request: "", default_limits=["5/minute"], storage=storage)
+        try:
+            for _ in range(5):
+                await limiter.hit("10.0.0.1")
+            with pytest.raises(RateLimitExceeded) as exc_info:
+                await limiter.hit("10.0.0.1")
+            assert 59.0 < exc_info.value.retry_after <= 60.0
+            await limiter.hit("10.0.0.2")
+        finally:
+            await storage.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_lua_script_records_nothing_when_any_limit_rejects(redis_url: str) -> None:
+    async def scenario() -> None:
+        storage = RedisStorage(redis_url, timeout=2.0)
+        limiter = Limiter(
+            key_func=lambda request: "", default_limits=["2/minute", "100/hour"], storage=storage
+        )
+        try:
+            for _ in range(2):
+                await limiter.hit("client")
+            for _ in range(3):
+                with pytest.raises(RateLimitExceeded):
+                    await limiter.hit("client")
+            client = storage._client
+            prefix = "u4s:ratelimit:window:default"
+            hourly = await client.hget(f"{prefix}:100:3600:client", "c")
+            minutely = await client.pttl(f"{prefix}:2:60:client")
+            # В часовом лимите учтены только два принятых запроса.
+            assert hourly == b"2"
+            assert isinstance(minutely, int) and 0 < minutely <= 60_000
+        finally:
+            await storage.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_reset_clears_keys_on_redis(redis_url: str) -> None:
+    async def scenario() -> None:
+        storage = RedisStorage(redis_url, timeout=2.0)
+        limiter = Limiter(key_func=lambda request: "", default_limits=["1/minute"], storage=storage)
+        try:
+            client = storage._client
+            await client.set("unrelated", "1")
+            for index in range(1500):
+                await limiter.hit(f"client-{index}")
+            with pytest.raises(RateLimitExceeded):
+                await limiter.hit("client-0")
+
+            await limiter.areset()
+
+            assert await client.dbsize() == 1
+            await limiter.hit("client-0")
+        finally:
+            await storage.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_lua_script_error_propagates(redis_url: str) -> None:
+    async def scenario() -> None:
+        storage = RedisStorage(redis_url, timeout=2.0)
+        limiter = Limiter(key_func=lambda request: "", default_limits=["1/minute"], storage=storage)
+        try:
+            await storage._client.set("u4s:ratelimit:window:default:1:60:client", "1")
+            with pytest.raises(ResponseError, match="WRONGTYPE"):
+                await limiter.hit("client")
+        finally:
+            await storage.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import re
+import sys
+from dataclasses import fields
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.metrics import (
+    MetricsSummaryRecord,
+    MonthlyMetricRecord,
+    MonthlyServiceRecord,
+    ServiceDailyUsageRecord,
+    ServiceUsageRecord,
+)
+
+
+def _names(record: type, *, month: str = "month") -> list[str]:
+    # В шаблонах месяц называется month_start.
+    return ["month_start" if field.name == month else field.name for field in fields(record)]
+
+
+SUMMARY = _names(MetricsSummaryRecord)
+
+# Строки собираются позиционно, поэтому порядок колонок шаблона обязан
+# совпадать с порядком полей записи.
+TEMPLATE_COLUMNS = {
+    "metrics_summary.sql": SUMMARY,
+    "metrics_summary_rollup.sql": SUMMARY,
+    "metrics_summary_batch.sql": SUMMARY,
+    "metrics_summary_batch_rollup.sql": SUMMARY,
+    "metrics_summary_compare.sql": [*SUMMARY, *(f"compare_{name}" for name in SUMMARY)],
+    "metrics_summary_compare_rollup.sql": [*SUMMARY, *(f"compare_{name}" for name in SUMMARY)],
+    "metrics_summary_guests.sql": SUMMARY[:-1],
+    "metrics_summary_guests_rollup.sql": SUMMARY[:-1],
+    "services_summary.sql": SUMMARY[-1:],
+    "metrics_monthly.sql": _names(MonthlyMetricRecord),
+    "metrics_monthly_rollup.sql": _names(MonthlyMetricRecord),
+    "services_monthly.sql": _names(MonthlyServiceRecord),
+    "services_totals.sql": _names(ServiceUsageRecord),
+    "services_export_totals.sql": _names(ServiceUsageRecord),
+    "services_export_daily.sql": _names(ServiceDailyUsageRecord),
+    "services_listing.sql": [
+        *_names(ServiceUsageRecord),
+        "total_items",
+        "overall_amount",
+        "is_summary",
+        "page_offset",
+    ],
+}
+
+
+def _outer_select_columns(text: str) -> list[str]:
+    start = [match.end() for match in re.finditer(r"^SELECT\b", text, re.MULTILINE)][-1]
+    body = text[start : re.compile(r"^FROM\b", re.MULTILINE).search(text, start).start()]
+    columns, depth, current = [], 0, ""
+    for char in body:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            columns.append(current)
+            current = ""
+        else:
+            current += char
+    columns.append(current)
+    names = []
+    for column in columns:
+        alias = re.search(r"\bAS\s+(\w+)\s*$", column.strip())
+        names.append(alias.group(1) if alias else column.strip().split(".")[-1])
+    return names
+
+
+@pytest.mark.parametrize("template", sorted(TEMPLATE_COLUMNS))
+def test_template_columns_follow_record_fields(template: str) -> None:
+    text = resources.files("app.sql").joinpath(template).read_text(encoding="utf-8")
+    assert _outer_select_columns(text) == TEMPLATE_COLUMNS[template]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.core.singleflight import SingleFlight, coalesce
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    executions: list[int] = []
+
+    @coalesce("test_shared")
+    async def load(*, value: int) -> list[int]:
+        executions.append(value)
+        await asyncio.sleep(0.01)
+        return [value]
+
+    async def scenario() -> list[list[int]]:
+        return await asyncio.gather(*(load(value=1) for _ in range(5)), load(value=2))
+
+    results = asyncio.run(scenario())
+
+    assert results == [[1]] * 5 + [[2]]
+    assert sorted(executions) == [1, 2]
+
+
+def test_sequential_calls_execute_again() -> None:
+    executions: list[int] = []
+
+    @coalesce("test_sequential")
+    async def load(*, value: int) -> int:
+        executions.append(value)
+        return value
+
+    async def scenario() -> None:
+        await load(value=1)
+        await load(value=1)
+
+    asyncio.run(scenario())
+    assert executions == [1, 1]
+
+
+def test_errors_are_propagated_to_all_waiters() -> None:
+    flight = SingleFlight("test_errors")
+
+    async def failing() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario() -> list[object]:
+        return await asyncio.gather(
+            flight.run("key", failing), flight.run("key", failing), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    flight = SingleFlight("test_cancel")
+
+    async def slow() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario() -> str:
+        first = asyncio.ensure_future(flight.run("key", slow))
+        second = asyncio.ensure_future(flight.run("key", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"